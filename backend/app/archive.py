@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta
+from typing import Iterable, List
+import time
+
+from sqlalchemy import delete, insert, literal, select
+from sqlalchemy.orm import Session
+
+from .models import Booking, BookingArchive
+
+# Colonnes communes aux deux tables, dans le même ordre
+ARCHIVED_COLUMNS = [column.name for column in Booking.__table__.columns]
+
+
+class ArchiveService:
+    """
+    Déplacement des réservations terminées et anciennes de bookings vers bookings_archive.
+    Les agrégats analytics (booking_rollups) ne bougent pas : ils couvrent déjà l'archive.
+    """
+
+    @staticmethod
+    def archive_batch(db: Session, cutoff: datetime, statuses: Iterable[str], batch_size: int) -> int:
+        """Archive un lot dans une transaction courte ; retourne le nombre de réservations déplacées"""
+        ids: List[str] = db.scalars(
+            select(Booking.id)
+            .where(Booking.status.in_(list(statuses)), Booking.check_out < cutoff)
+            .limit(batch_size)
+        ).all()
+        if not ids:
+            return 0
+
+        archive_table = BookingArchive.__table__
+        db.execute(
+            insert(archive_table).from_select(
+                ARCHIVED_COLUMNS + ["archived_at"],
+                select(
+                    *[Booking.__table__.c[name] for name in ARCHIVED_COLUMNS],
+                    literal(datetime.utcnow(), BookingArchive.archived_at.type)
+                )
+                .where(Booking.id.in_(ids))
+            )
+        )
+        db.execute(delete(Booking).where(Booking.id.in_(ids)).execution_options(synchronize_session=False))
+        db.commit()
+        return len(ids)
+
+    @staticmethod
+    def archive(
+        db: Session,
+        older_than_days: int,
+        statuses: Iterable[str],
+        batch_size: int = 1000,
+        pause_ms: float = 0,
+        max_batches: int = 0
+    ) -> int:
+        """
+        Archive par lots les réservations dont le départ date de plus de older_than_days jours.
+        Chaque lot est validé séparément : le verrou d'écriture SQLite n'est tenu que le temps
+        d'un lot, et pause_ms laisse passer les réservations en cours entre deux lots.
+        Lancé par app.manage dans son propre processus, l'archivage ne peut pas passer par le
+        writer de l'API : il partage le verrou SQLite avec lui, lot par lot.
+        """
+        cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+        statuses = list(statuses)
+        total = batches = 0
+        while True:
+            moved = ArchiveService.archive_batch(db, cutoff, statuses, batch_size)
+            total += moved
+            batches += 1
+            if moved < batch_size or (max_batches and batches >= max_batches):
+                return total
+            if pause_ms:
+                time.sleep(pause_ms / 1000)
@@ -0,0 +1,236 @@
+from dataclasses import dataclass, asdict, field
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import hashlib
+import json
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .models import RoomType, PricingConfig, RatePlan
+from .rates import CachedRatePlan, RateChange, RateTable, compile_rate_tables
+from .shared_catalog import SharedCatalogStore, default_snapshot_path
+
+# ==================== CATALOGUE EN MÉMOIRE ====================
+
+@dataclass(frozen=True)
+class CachedRoomType:
+    """Copie figée d'un type de chambre, indépendante de la session SQLAlchemy"""
+    id: str
+    name: str
+    description: Optional[str]
+    price_per_night: float
+    available_rooms: int
+    amenities: Optional[list]
+    images: Optional[list]
+    is_active: bool
+
+    @classmethod
+    def from_model(cls, room: RoomType) -> "CachedRoomType":
+        return cls(
+            id=room.id,
+            name=room.name,
+            description=room.description,
+            price_per_night=room.price_per_night,
+            available_rooms=room.available_rooms,
+            amenities=room.amenities,
+            images=room.images,
+            is_active=room.is_active
+        )
+
+
+@dataclass(frozen=True)
+class CachedPricingConfig:
+    """Copie figée de la configuration des prix"""
+    id: str
+    single_supplement: float
+    pool_view_supplement: float
+    child_discount_2_4: float
+    child_discount_4_12: float
+    tax_per_night: float
+
+    @classmethod
+    def from_model(cls, config: PricingConfig) -> "CachedPricingConfig":
+        return cls(
+            id=config.id,
+            single_supplement=config.single_supplement,
+            pool_view_supplement=config.pool_view_supplement,
+            child_discount_2_4=config.child_discount_2_4,
+            child_discount_4_12=config.child_discount_4_12,
+            tax_per_night=config.tax_per_night
+        )
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """État du catalogue à une version donnée"""
+    version: int
+    rooms: Dict[str, CachedRoomType]
+    pricing_config: Optional[CachedPricingConfig]
+    # Réponse GET /rooms déjà sérialisée, et son ETag (empreinte du contenu)
+    rooms_json: bytes = b""
+    rooms_etag: str = ""
+    # Plans tarifaires actifs et prix par nuit précalculés, par id de type de chambre
+    rate_plans: Tuple[CachedRatePlan, ...] = ()
+    rates: Dict[str, RateTable] = field(default_factory=dict)
+
+    def get_room(self, room_type_id: str) -> Optional[CachedRoomType]:
+        return self.rooms.get(room_type_id)
+
+    def get_room_by_name(self, name: str) -> Optional[CachedRoomType]:
+        return next((room for room in self.rooms.values() if room.name == name), None)
+
+
+class CatalogCache:
+    """
+    Cache des types de chambres actifs et de la configuration des prix.
+    Rechargé à la demande puis mis à jour par les routes admin qui modifient le catalogue.
+    Avec un SharedCatalogStore, le catalogue est publié dans un fichier partagé par
+    tous les workers : chacun ne le relit que lorsque la version publiée change.
+    """
+
+    def __init__(self, store: Optional[SharedCatalogStore] = None):
+        self._lock = asyncio.Lock()
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._version = 0
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+        self.shared_reloads = 0
+
+    def _is_current(self, snapshot: Optional[CatalogSnapshot]) -> bool:
+        if snapshot is None:
+            return False
+        # Lecture du compteur mappé en mémoire : pas d'appel système
+        return self.store is None or self.store.version() == snapshot.version
+
+    async def get(self, db: AsyncSession) -> CatalogSnapshot:
+        """Retourne le catalogue courant, chargé depuis la base si nécessaire"""
+        snapshot = self._snapshot
+        if self._is_current(snapshot):
+            self.hits += 1
+            return snapshot
+
+        async with self._lock:
+            if self._is_current(self._snapshot):
+                self.hits += 1
+                return self._snapshot
+            self.misses += 1
+            self._snapshot = self._read_shared() or await db.run_sync(self.load)
+            return self._snapshot
+
+    async def refresh(self, db: AsyncSession, rate_changes: Optional[List[RateChange]] = None) -> CatalogSnapshot:
+        """
+        Recharge le catalogue après une modification (write-through) et le publie aux autres workers.
+        rate_changes : périodes touchées par un plan tarifaire, seules recompilées dans ce worker.
+        """
+        async with self._lock:
+            self._snapshot = await db.run_sync(self.load, rate_changes)
+            return self._snapshot
+
+    def invalidate(self):
+        """Force un rechargement à la prochaine lecture"""
+        self._snapshot = None
+
+    def stats(self) -> dict:
+        snapshot = self._snapshot
+        total = self.hits + self.misses
+        return {
+            "version": snapshot.version if snapshot else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0,
+            "room_types": len(snapshot.rooms) if snapshot else 0,
+            "rate_plans": len(snapshot.rate_plans) if snapshot else 0,
+            "shared_path": self.store.path if self.store else None,
+            "shared_reloads": self.shared_reloads
+        }
+
+    def load(self, db: Session, rate_changes: Optional[List[RateChange]] = None) -> CatalogSnapshot:
+        """
+        Lit le catalogue en base, le publie dans le fichier partagé et le garde localement.
+        Un catalogue identique à celui déjà publié (chargement de démarrage des autres workers,
+        modification sans effet) garde la version publiée : aucun worker n'a à le relire.
+        """
+        # populate_existing : relire les valeurs en base même si les objets sont déjà dans la session
+        rooms = db.query(RoomType).filter(RoomType.is_active == True).populate_existing().all()
+        config = db.query(PricingConfig).populate_existing().first()
+        plans = db.query(RatePlan).filter(RatePlan.is_active == True).populate_existing().all()
+
+        cached_rooms = [CachedRoomType.from_model(room) for room in rooms]
+        cached_config = CachedPricingConfig.from_model(config) if config else None
+        cached_plans = [CachedRatePlan.from_model(plan) for plan in plans]
+        if self.store is not None:
+            version = self.store.publish({
+                "rooms": [asdict(room) for room in cached_rooms],
+                "pricing_config": asdict(cached_config) if cached_config else None,
+                "rate_plans": [plan.to_payload() for plan in cached_plans]
+            })
+        else:
+            self._version += 1
+            version = self._version
+
+        # Même version que le catalogue local : contenu identique, rien à recompiler
+        if self._snapshot is not None and self._snapshot.version == version:
+            return self._snapshot
+
+        # Recompilation limitée aux périodes modifiées quand le catalogue précédent est connu
+        previous = self._snapshot.rates if self._snapshot and rate_changes is not None else None
+        self._snapshot = build_snapshot(
+            version, cached_rooms, cached_config, cached_plans, previous, rate_changes
+        )
+        return self._snapshot
+
+    def _read_shared(self) -> Optional[CatalogSnapshot]:
+        """Catalogue publié par un worker, None s'il faut le charger depuis la base"""
+        if self.store is None or self.store.version() == 0:
+            return None
+        published = self.store.read()
+        if published is None:
+            return None
+        version, payload = published
+        self.shared_reloads += 1
+        config = payload.get("pricing_config")
+        return build_snapshot(
+            version,
+            [CachedRoomType(**room) for room in payload["rooms"]],
+            CachedPricingConfig(**config) if config else None,
+            [CachedRatePlan.from_payload(plan) for plan in payload.get("rate_plans", [])]
+        )
+
+
+def build_snapshot(
+    version: int,
+    rooms: List[CachedRoomType],
+    pricing_config: Optional[CachedPricingConfig],
+    rate_plans: Optional[List[CachedRatePlan]] = None,
+    previous_rates: Optional[Dict[str, RateTable]] = None,
+    rate_changes: Optional[List[RateChange]] = None
+) -> CatalogSnapshot:
+    # Même encodage que JSONResponse, fait une fois par version du catalogue
+    rooms_json = json.dumps(
+        {"count": len(rooms), "rooms": [asdict(room) for room in rooms]},
+        ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+    return CatalogSnapshot(
+        version=version,
+        rooms={room.id: room for room in rooms},
+        pricing_config=pricing_config,
+        rooms_json=rooms_json,
+        rooms_etag=f'"{hashlib.sha256(rooms_json).hexdigest()[:32]}"',
+        rate_plans=tuple(rate_plans or ()),
+        rates=compile_rate_tables(rooms, list(rate_plans or ()), previous_rates, rate_changes)
+    )
+
+
+def _shared_store() -> Optional[SharedCatalogStore]:
+    path = settings.CATALOG_SNAPSHOT_PATH
+    if path.lower() == "off":
+        return None
+    path = path or default_snapshot_path(settings.DATABASE_URL)
+    return SharedCatalogStore(path) if path else None
+
+
+# Instance globale du catalogue
+catalog = CatalogCache(store=_shared_store())
@@ -12,6 +12,17 @@ class Settings:
     
     # ==================== BASE DE DONNÉES ====================
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./hotel.db")
+    SQLITE_JOURNAL_MODE: str = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_CACHE_SIZE_KB: int = int(os.getenv("SQLITE_CACHE_SIZE_KB", "20000"))
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    
+    # File d'écriture des réservations (group commit)
+    BOOKING_WRITER_MAX_BATCH: int = int(os.getenv("BOOKING_WRITER_MAX_BATCH", "64"))
+    BOOKING_WRITER_MAX_DELAY_MS: float = float(os.getenv("BOOKING_WRITER_MAX_DELAY_MS", "2"))
+    
+    # Import groupé des allotements tour-opérateurs
+    BULK_BOOKING_MAX_ROWS: int = int(os.getenv("BULK_BOOKING_MAX_ROWS", "5000"))
     
     # ==================== ADMIN PAR DÉFAUT ====================
     ADMIN_USERNAME: str = os.getenv("ADMIN_USERNAME", "admin")
@@ -30,6 +41,39 @@ class Settings:
     CHILD_DISCOUNT_2_4: float = float(os.getenv("CHILD_DISCOUNT_2_4", "0.3"))
     CHILD_DISCOUNT_4_12: float = float(os.getenv("CHILD_DISCOUNT_4_12", "0.2"))
     TAX_PER_NIGHT: float = float(os.getenv("TAX_PER_NIGHT", "3.0"))
+    QUOTE_BATCH_MAX_SIZE: int = int(os.getenv("QUOTE_BATCH_MAX_SIZE", "1000"))
+    # Plans tarifaires : jours précalculés à partir d'aujourd'hui, nuits de week-end (lundi = 0)
+    RATE_TABLE_DAYS: int = int(os.getenv("RATE_TABLE_DAYS", "730"))
+    RATE_WEEKEND_DAYS: str = os.getenv("RATE_WEEKEND_DAYS", "4,5")
+
+    # ==================== CACHES ====================
+    # Catalogue partagé entre workers : vide = à côté de la base SQLite, "off" = désactivé
+    CATALOG_SNAPSHOT_PATH: str = os.getenv("CATALOG_SNAPSHOT_PATH", "")
+    ROOMS_CACHE_MAX_AGE_SECONDS: int = int(os.getenv("ROOMS_CACHE_MAX_AGE_SECONDS", "60"))
+    DASHBOARD_CACHE_TTL_SECONDS: float = float(os.getenv("DASHBOARD_CACHE_TTL_SECONDS", "5"))
+    ADMIN_TOKEN_CACHE_SIZE: int = int(os.getenv("ADMIN_TOKEN_CACHE_SIZE", "1024"))
+    ADMIN_TOKEN_CACHE_TTL_SECONDS: float = float(os.getenv("ADMIN_TOKEN_CACHE_TTL_SECONDS", "300"))
+    PRICE_CALENDAR_CACHE_SIZE: int = int(os.getenv("PRICE_CALENDAR_CACHE_SIZE", "256"))
+    PRICE_CALENDAR_CACHE_TTL_SECONDS: float = float(os.getenv("PRICE_CALENDAR_CACHE_TTL_SECONDS", "86400"))
+    
+    # ==================== ÉVÉNEMENTS ADMIN (SSE) ====================
+    EVENTS_BUFFER_SIZE: int = int(os.getenv("EVENTS_BUFFER_SIZE", "1000"))
+    EVENTS_HEARTBEAT_SECONDS: float = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+    # Journal partagé par les workers : lu toutes les EVENTS_POLL_SECONDS, EVENTS_LOG_SIZE lignes gardées
+    EVENTS_POLL_SECONDS: float = float(os.getenv("EVENTS_POLL_SECONDS", "0.5"))
+    EVENTS_LOG_SIZE: int = int(os.getenv("EVENTS_LOG_SIZE", "10000"))
+    # Ticket d'ouverture du flux : court et à usage unique (il passe dans l'URL)
+    EVENTS_TICKET_TTL_SECONDS: int = int(os.getenv("EVENTS_TICKET_TTL_SECONDS", "30"))
+    
+    # ==================== ARCHIVAGE ====================
+    ARCHIVE_AFTER_DAYS: int = int(os.getenv("ARCHIVE_AFTER_DAYS", "365"))
+    ARCHIVE_STATUSES: str = os.getenv("ARCHIVE_STATUSES", "checked-out,cancelled")
+    ARCHIVE_BATCH_SIZE: int = int(os.getenv("ARCHIVE_BATCH_SIZE", "1000"))
+    ARCHIVE_PAUSE_MS: float = float(os.getenv("ARCHIVE_PAUSE_MS", "50"))
+    
+    # ==================== DISPONIBILITÉS ====================
+    AVAILABILITY_MAX_NIGHTS: int = int(os.getenv("AVAILABILITY_MAX_NIGHTS", "366"))
+    OCCUPANCY_MAX_DAYS: int = int(os.getenv("OCCUPANCY_MAX_DAYS", "3660"))
 
 # Instance globale des paramètres
 settings = Settings()
\ No newline at end of file
@@ -1,18 +1,94 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./hotel.db"
+from .config import settings
+from .metrics import instrument_engine
 
+SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
+ASYNC_SQLALCHEMY_DATABASE_URL = SQLALCHEMY_DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1)
+IS_SQLITE = SQLALCHEMY_DATABASE_URL.startswith("sqlite")
+
+# Moteur synchrone : création des tables et commandes de maintenance
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False} if IS_SQLITE else {}
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Moteur asynchrone : utilisé par les routes pour ne pas bloquer la boucle d'événements
+async_engine = create_async_engine(ASYNC_SQLALCHEMY_DATABASE_URL)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+# Sessions du writer : sous SQLite, verrou d'écriture pris dès le BEGIN (voir _begin_sqlite_transaction)
+WriterSessionLocal = async_sessionmaker(
+    bind=async_engine.execution_options(sqlite_begin_immediate=True),
+    class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
 Base = declarative_base()
 
+# ==================== MODE SQLITE ====================
+
+def _configure_sqlite_connection(dbapi_connection, connection_record):
+    """Applique les pragmas de concurrence à chaque nouvelle connexion SQLite"""
+    # Transactions gérées par SQLAlchemy (nécessaire pour les SAVEPOINT)
+    dbapi_connection.isolation_level = None
+
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA busy_timeout = {settings.SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA journal_mode = {settings.SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous = {settings.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA cache_size = -{settings.SQLITE_CACHE_SIZE_KB}")
+    cursor.close()
+
+def _begin_sqlite_transaction(connection):
+    """
+    BEGIN différé par défaut. Le writer commence par BEGIN IMMEDIATE : une transaction qui lit
+    avant d'écrire échouerait sinon aussitôt ("database is locked", sans attente du busy_timeout)
+    si une autre connexion (autre worker, app.manage) a validé entre sa lecture et sa première écriture.
+    """
+    if connection.get_execution_options().get("sqlite_begin_immediate"):
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+    else:
+        connection.exec_driver_sql("BEGIN")
+
+if IS_SQLITE:
+    for sqlite_engine in (engine, async_engine.sync_engine):
+        event.listen(sqlite_engine, "connect", _configure_sqlite_connection)
+        event.listen(sqlite_engine, "begin", _begin_sqlite_transaction)
+
+# Temps SQL par requête HTTP, exposé sur /metrics
+for instrumented_engine in (engine, async_engine.sync_engine):
+    instrument_engine(instrumented_engine)
+
+def create_missing_indexes(metadata, bind=engine) -> list:
+    """
+    Crée les index déclarés sur les modèles qui n'existent pas encore en base.
+    create_all ne touche pas aux tables existantes : c'est la migration des anciens hotel.db.
+    """
+    created = []
+    with bind.begin() as connection:
+        inspector = inspect(connection)
+        for table in metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing:
+                    index.create(bind=connection)
+                    created.append(index.name)
+    return created
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,163 @@
+from collections import deque
+from datetime import date, datetime
+from typing import List, Optional, Tuple
+import asyncio
+import contextvars
+import json
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import settings
+from .database import AsyncSessionLocal
+from .models import BookingEvent
+
+
+class BookingEventBus:
+    """
+    Diffusion des changements de réservation vers les flux SSE admin.
+    Les événements sont écrits dans booking_events par le writer, dans la transaction de la
+    modification : chaque worker lit ce journal (toutes les EVENTS_POLL_SECONDS, ou aussitôt
+    après une écriture locale), si bien qu'un flux voit aussi les réservations des autres workers.
+    Les derniers événements lus sont gardés dans un tampon circulaire borné pour permettre
+    la reprise d'un flux (Last-Event-ID, numéro du journal) sans recharger toute la liste.
+    """
+
+    def __init__(self, maxlen: int, poll_seconds: float, log_size: int):
+        self.poll_seconds = poll_seconds
+        self.log_size = log_size
+        self._events: deque = deque(maxlen=maxlen)
+        self._seq = 0
+        self._changed: Optional[asyncio.Event] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.published = 0
+        self.polls = 0
+
+    @property
+    def changed(self) -> asyncio.Event:
+        """Événement déclenché à la prochaine lecture de nouveaux événements (à récupérer avant de lire le tampon)"""
+        if self._changed is None:
+            self._changed = asyncio.Event()
+        return self._changed
+
+    async def record(self, db: AsyncSession, event_type: str, data: dict):
+        """Ajoute un événement au journal ; à appeler dans un job du writer (même commit que la modification)"""
+        payload = json.dumps(data, default=_json_default, ensure_ascii=False, separators=(",", ":"))
+        db.add(BookingEvent(event_type=event_type, payload=payload))
+        # Journal borné : les plus anciens événements sortent (les flux en retard reçoivent "reset")
+        newest = select(func.max(BookingEvent.seq)).scalar_subquery()
+        await db.execute(delete(BookingEvent).where(BookingEvent.seq <= newest - self.log_size))
+        self.published += 1
+
+    def notify(self):
+        """Après le commit d'un événement dans ce worker : lire le journal sans attendre le prochain tour"""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def ensure_polling(self):
+        """Démarre la lecture du journal dans ce worker ; le premier appel attend le chargement du tampon"""
+        loop = asyncio.get_running_loop()
+        if self._task is not None and not self._task.done() and self._loop is loop:
+            return
+        self._loop = loop
+        self._wake = asyncio.Event()
+        self._changed = None
+        await self._poll()
+        # Contexte vierge : la tâche de fond ne doit pas hériter de celui de la requête qui l'a démarrée
+        self._task = contextvars.Context().run(loop.create_task, self._run())
+
+    async def stop(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+        self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self._poll()
+            except Exception:
+                # Base momentanément indisponible : nouvel essai au tour suivant
+                continue
+
+    async def _poll(self):
+        async with AsyncSessionLocal() as db:
+            query = select(BookingEvent.seq, BookingEvent.event_type, BookingEvent.payload)
+            if self._seq:
+                query = query.where(BookingEvent.seq > self._seq).order_by(BookingEvent.seq)
+                rows = (await db.execute(query.limit(self._events.maxlen))).all()
+            else:
+                # Premier chargement : les derniers événements seulement, pour les reprises
+                query = query.order_by(BookingEvent.seq.desc()).limit(self._events.maxlen)
+                rows = list(reversed((await db.execute(query)).all()))
+        self.polls += 1
+        if not rows:
+            return
+        for seq, event_type, payload in rows:
+            self._events.append((seq, format_sse(str(seq), event_type, payload)))
+        self._seq = rows[-1][0]
+
+        # Réveiller les flux en attente puis préparer l'attente suivante
+        if self._changed is not None:
+            self._changed.set()
+            self._changed = None
+
+    def last_seq(self) -> int:
+        return self._seq
+
+    async def latest_seq(self, db: AsyncSession) -> int:
+        """Dernier numéro du journal en base, toutes écritures de tous les workers comprises"""
+        return await db.scalar(select(func.max(BookingEvent.seq))) or 0
+
+    def parse_event_id(self, event_id: Optional[str]) -> Optional[int]:
+        """Numéro du journal d'un Last-Event-ID, None s'il n'en est pas un"""
+        if not event_id or not event_id.isdigit():
+            return None
+        return int(event_id)
+
+    def since(self, seq: int) -> Tuple[List[Tuple[int, str]], bool]:
+        """
+        Événements lus après seq, et un indicateur de trou : True si des événements
+        sont déjà sortis du tampon (le client doit alors tout recharger).
+        """
+        if seq >= self._seq:
+            return [], False
+        oldest = self._events[0][0] if self._events else self._seq + 1
+        missed = seq + 1 < oldest
+        return [event for event in self._events if event[0] > seq], missed
+
+    def stats(self) -> dict:
+        return {
+            "published": self.published,
+            "polls": self.polls,
+            "buffered": len(self._events),
+            "maxlen": self._events.maxlen,
+            "last_event_id": str(self._seq) if self._seq else None
+        }
+
+
+def format_sse(event_id: Optional[str], event_type: str, payload: str) -> str:
+    lines = [f"id: {event_id}"] if event_id else []
+    lines.append(f"event: {event_type}")
+    lines.append(f"data: {payload}")
+    return "\n".join(lines) + "\n\n"
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} non sérialisable")
+
+
+# Instance globale du bus d'événements
+booking_events = BookingEventBus(
+    maxlen=settings.EVENTS_BUFFER_SIZE,
+    poll_seconds=settings.EVENTS_POLL_SECONDS,
+    log_size=settings.EVENTS_LOG_SIZE
+)
@@ -0,0 +1,191 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import false, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from .models import Booking, RoomNight
+
+# Statuts qui occupent une chambre dans le calendrier
+HOLDING_STATUSES = {"pending", "confirmed", "checked-in"}
+
+
+class OverbookingError(Exception):
+    """Levée quand une nuit du séjour n'a plus de chambre disponible"""
+
+
+def _as_date(value) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+def stay_nights(check_in, check_out) -> List[date]:
+    """Liste des nuits d'un séjour (check_out exclu)"""
+    start, end = _as_date(check_in), _as_date(check_out)
+    return [start + timedelta(days=i) for i in range((end - start).days)]
+
+
+def holds_inventory(status: Optional[str]) -> bool:
+    return (status or "pending") in HOLDING_STATUSES
+
+
+class InventoryService:
+    """Calendrier des chambres vendues par type de chambre et par nuit"""
+
+    @staticmethod
+    def reserve(db: Session, room_type: str, capacity: int, check_in, check_out):
+        """
+        Réserve une chambre pour chaque nuit du séjour.
+        Lève OverbookingError si une nuit est complète ; l'appelant doit alors annuler la transaction.
+        """
+        nights = stay_nights(check_in, check_out)
+        if not nights:
+            return
+
+        # Créer les nuits manquantes du calendrier
+        db.execute(
+            insert(RoomNight)
+            .values([{"room_type": room_type, "night": night, "sold": 0} for night in nights])
+            .on_conflict_do_nothing()
+        )
+
+        # Incrément conditionnel : seules les nuits non complètes sont mises à jour
+        result = db.execute(
+            update(RoomNight)
+            .where(
+                RoomNight.room_type == room_type,
+                RoomNight.night >= nights[0],
+                RoomNight.night <= nights[-1],
+                RoomNight.sold < capacity
+            )
+            .values(sold=RoomNight.sold + 1)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != len(nights):
+            raise OverbookingError(f"Plus de chambre '{room_type}' disponible pour ces dates")
+
+    @staticmethod
+    def reserve_many(db: Session, stays: List[tuple], all_or_nothing: bool = False) -> List[Optional[str]]:
+        """
+        Réserve un lot de séjours (room_type, capacity, check_in, check_out) en une passe :
+        une lecture du calendrier, une vérification en mémoire dans l'ordre du lot,
+        puis un seul executemany d'incréments.
+        Retourne pour chaque séjour None (réservé) ou le motif du refus ; avec all_or_nothing,
+        rien n'est écrit dès qu'un séjour est refusé.
+        Le verrou d'écriture est pris avant la lecture : aucune autre connexion (autre worker,
+        app.manage) ne peut vendre une nuit entre la vérification et les incréments.
+        """
+        # Sous SQLite, une mise à jour vide réserve la base (sans effet si la transaction
+        # a commencé par BEGIN IMMEDIATE, comme celle du writer)
+        db.execute(
+            update(RoomNight).where(false()).values(sold=RoomNight.sold)
+            .execution_options(synchronize_session=False)
+        )
+
+        nights_by_stay = [stay_nights(check_in, check_out) for _, _, check_in, check_out in stays]
+
+        # Nuits déjà vendues sur l'étendue du lot, par type de chambre
+        bounds = {}
+        for (room_type, _, _, _), nights in zip(stays, nights_by_stay):
+            if nights:
+                low, high = bounds.get(room_type, (nights[0], nights[-1]))
+                bounds[room_type] = (min(low, nights[0]), max(high, nights[-1]))
+        sold = defaultdict(int)
+        for room_type, (low, high) in bounds.items():
+            rows = db.query(RoomNight.night, RoomNight.sold).filter(
+                RoomNight.room_type == room_type,
+                RoomNight.night >= low,
+                RoomNight.night <= high
+            )
+            for night, count in rows:
+                sold[(room_type, night)] = count
+
+        added = defaultdict(int)
+        errors = []
+        for (room_type, capacity, _, _), nights in zip(stays, nights_by_stay):
+            keys = [(room_type, night) for night in nights]
+            if any(sold[key] + added[key] >= capacity for key in keys):
+                errors.append(f"Plus de chambre '{room_type}' disponible pour ces dates")
+                continue
+            for key in keys:
+                added[key] += 1
+            errors.append(None)
+
+        if not added or (all_or_nothing and any(errors)):
+            return errors
+
+        statement = insert(RoomNight)
+        db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[RoomNight.room_type, RoomNight.night],
+                set_={"sold": RoomNight.sold + statement.excluded.sold}
+            ),
+            [{"room_type": room_type, "night": night, "sold": count} for (room_type, night), count in added.items()]
+        )
+        return errors
+
+    @staticmethod
+    def release(db: Session, room_type: str, check_in, check_out):
+        """Libère une chambre pour chaque nuit du séjour"""
+        nights = stay_nights(check_in, check_out)
+        if not nights:
+            return
+
+        db.execute(
+            update(RoomNight)
+            .where(
+                RoomNight.room_type == room_type,
+                RoomNight.night >= nights[0],
+                RoomNight.night <= nights[-1],
+                RoomNight.sold > 0
+            )
+            .values(sold=RoomNight.sold - 1)
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def apply_status_change(db: Session, booking: Booking, old_status: str, new_status: str, capacity: int):
+        """Met à jour le calendrier quand une réservation change de statut"""
+        was_holding, now_holding = holds_inventory(old_status), holds_inventory(new_status)
+        if was_holding and not now_holding:
+            InventoryService.release(db, booking.room_type, booking.check_in, booking.check_out)
+        elif now_holding and not was_holding:
+            InventoryService.reserve(db, booking.room_type, capacity, booking.check_in, booking.check_out)
+
+    @staticmethod
+    def get_calendar(db: Session, start: date, end: date) -> Dict[str, Dict[date, int]]:
+        """Chambres vendues par type de chambre et par nuit sur [start, end)"""
+        rows = db.query(RoomNight).filter(
+            RoomNight.night >= start,
+            RoomNight.night < end
+        ).all()
+
+        calendar = defaultdict(dict)
+        for row in rows:
+            calendar[row.room_type][row.night] = row.sold
+        return calendar
+
+    @staticmethod
+    def rebuild(db: Session) -> int:
+        """Reconstruit le calendrier à partir des réservations existantes"""
+        sold = defaultdict(int)
+        bookings = db.query(Booking.room_type, Booking.check_in, Booking.check_out, Booking.status).yield_per(1000)
+        for room_type, check_in, check_out, status in bookings:
+            if holds_inventory(status):
+                for night in stay_nights(check_in, check_out):
+                    sold[(room_type, night)] += 1
+
+        db.query(RoomNight).delete()
+        db.bulk_insert_mappings(RoomNight, [
+            {"room_type": room_type, "night": night, "sold": count}
+            for (room_type, night), count in sold.items()
+        ])
+        db.commit()
+        return len(sold)
+
+    @staticmethod
+    def ensure_built(db: Session):
+        """Initialise le calendrier pour une base existante qui n'en a pas encore"""
+        if db.query(RoomNight).first() is None and db.query(Booking).first() is not None:
+            InventoryService.rebuild(db)
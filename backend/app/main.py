@@ -1,12 +1,27 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from .database import engine, Base
+from .database import engine, Base, SessionLocal, create_missing_indexes
 from .routes import router
 from .config import settings
 from .models import *
+from .inventory import InventoryService
+from .rollups import RollupService
+from .writer import booking_writer
+from .events import booking_events
+from .catalog import catalog
+from .metrics import metrics, MetricsMiddleware
 
 # Créer les tables
 Base.metadata.create_all(bind=engine)
+create_missing_indexes(Base.metadata)
+
+# Initialiser le calendrier d'inventaire et les agrégats des bases existantes, puis charger
+# le catalogue : le premier worker le publie, les suivants retrouvent la version publiée
+with SessionLocal() as db:
+    InventoryService.ensure_built(db)
+    RollupService.ensure_built(db)
+    catalog.load(db)
 
 app = FastAPI(
     title=settings.HOTEL_NAME,  
@@ -28,9 +43,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Latences par route, requêtes en cours et temps base de données (exposés sur /metrics)
+app.add_middleware(MetricsMiddleware)
+
 # Routes
 app.include_router(router)
 
+@app.on_event("shutdown")
+async def stop_booking_writer():
+    await booking_writer.stop()
+    await booking_events.stop()
+
 @app.get("/")
 async def root():
     return {
@@ -50,4 +73,8 @@ async def health_check():
         "status": "healthy", 
         "service": settings.HOTEL_NAME,
         "timestamp": datetime.utcnow().isoformat()
-    }
\ No newline at end of file
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
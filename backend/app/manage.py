@@ -0,0 +1,87 @@
+"""
+Commandes de maintenance de la base de données.
+
+Usage (depuis le dossier backend) :
+    python -m app.manage migrate
+    python -m app.manage rebuild-inventory
+    python -m app.manage rebuild-rollups
+    python -m app.manage archive-bookings --older-than-days 365
+"""
+import argparse
+
+from .database import engine, Base, SessionLocal, create_missing_indexes
+from .models import *
+from .inventory import InventoryService
+from .rollups import RollupService
+from .archive import ArchiveService
+from .config import settings
+
+
+def migrate(args):
+    created = create_missing_indexes(Base.metadata)
+    print(f"Index créés: {', '.join(created) if created else 'aucun (base à jour)'}")
+
+
+def rebuild_inventory(args):
+    with SessionLocal() as db:
+        count = InventoryService.rebuild(db)
+    print(f"Calendrier d'inventaire reconstruit: {count} nuits")
+
+
+def rebuild_rollups(args):
+    with SessionLocal() as db:
+        count = RollupService.rebuild(db)
+    print(f"Agrégats analytics reconstruits: {count} lignes")
+
+
+def archive_bookings(args):
+    statuses = [status.strip() for status in args.statuses.split(",") if status.strip()]
+    with SessionLocal() as db:
+        count = ArchiveService.archive(
+            db,
+            older_than_days=args.older_than_days,
+            statuses=statuses,
+            batch_size=args.batch_size,
+            pause_ms=args.pause_ms,
+            max_batches=args.max_batches
+        )
+    print(f"Réservations archivées: {count} (statuts {', '.join(statuses)}, départ > {args.older_than_days} jours)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintenance de la base de l'hôtel")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser(
+        "migrate",
+        help="Crée les index manquants sur une base existante"
+    ).set_defaults(func=migrate)
+
+    subparsers.add_parser(
+        "rebuild-inventory",
+        help="Reconstruit le calendrier des chambres vendues depuis les réservations"
+    ).set_defaults(func=rebuild_inventory)
+
+    subparsers.add_parser(
+        "rebuild-rollups",
+        help="Recalcule les agrégats analytics (mois, type de chambre, statut) depuis les réservations"
+    ).set_defaults(func=rebuild_rollups)
+
+    archive_parser = subparsers.add_parser(
+        "archive-bookings",
+        help="Déplace par lots les réservations terminées anciennes vers bookings_archive"
+    )
+    archive_parser.add_argument("--older-than-days", type=int, default=settings.ARCHIVE_AFTER_DAYS)
+    archive_parser.add_argument("--statuses", default=settings.ARCHIVE_STATUSES)
+    archive_parser.add_argument("--batch-size", type=int, default=settings.ARCHIVE_BATCH_SIZE)
+    archive_parser.add_argument("--pause-ms", type=float, default=settings.ARCHIVE_PAUSE_MS)
+    archive_parser.add_argument("--max-batches", type=int, default=0, help="0 = jusqu'à épuisement")
+    archive_parser.set_defaults(func=archive_bookings)
+
+    args = parser.parse_args()
+    Base.metadata.create_all(bind=engine)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
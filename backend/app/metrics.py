@@ -0,0 +1,175 @@
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+import threading
+import time
+
+from sqlalchemy import event
+
+# Bornes des histogrammes de latence, en secondes
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Temps base de données cumulé de la requête HTTP en cours (liste à un élément, mutable)
+_request_db_time: ContextVar[Optional[list]] = ContextVar("request_db_time", default=None)
+
+
+class Histogram:
+    """Histogramme cumulatif au format Prometheus (compteurs par borne, somme, total)"""
+
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """
+    Métriques HTTP et base de données tenues en mémoire, exposées sur /metrics.
+    Chaque observation est une poignée d'additions sous un verrou : coût négligeable.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests: Dict[Tuple[str, str, str], int] = {}
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.db_latency: Dict[Tuple[str, str], Histogram] = {}
+        self.in_flight: Dict[str, int] = {}
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.started_at = time.time()
+
+    def request_started(self, method: str):
+        with self._lock:
+            self.in_flight[method] = self.in_flight.get(method, 0) + 1
+
+    def request_finished(self, method: str, route: str, status: int, duration: float, db_time: float):
+        key = (method, route)
+        with self._lock:
+            self.in_flight[method] -= 1
+            status_key = (method, route, str(status))
+            self.requests[status_key] = self.requests.get(status_key, 0) + 1
+            self.latency.setdefault(key, Histogram()).observe(duration)
+            self.db_latency.setdefault(key, Histogram()).observe(db_time)
+
+    def query_executed(self, duration: float):
+        with self._lock:
+            self.db_queries += 1
+            self.db_seconds += duration
+
+    def render(self) -> str:
+        """Sérialise toutes les métriques au format texte Prometheus (version 0.0.4)"""
+        lines = []
+        with self._lock:
+            lines += [
+                "# HELP hotel_http_requests_total Requêtes HTTP traitées, par route et code de statut.",
+                "# TYPE hotel_http_requests_total counter",
+            ]
+            for (method, route, status), count in sorted(self.requests.items()):
+                lines.append(f'hotel_http_requests_total{{method="{method}",route="{route}",status="{status}"}} {count}')
+
+            lines += [
+                "# HELP hotel_http_requests_in_flight Requêtes HTTP en cours de traitement.",
+                "# TYPE hotel_http_requests_in_flight gauge",
+            ]
+            for method, count in sorted(self.in_flight.items()):
+                lines.append(f'hotel_http_requests_in_flight{{method="{method}"}} {count}')
+
+            lines += _render_histograms(
+                "hotel_http_request_duration_seconds", "Durée des requêtes HTTP.", self.latency
+            )
+            lines += _render_histograms(
+                "hotel_http_request_db_seconds", "Temps passé en base de données par requête HTTP.", self.db_latency
+            )
+
+            lines += [
+                "# HELP hotel_db_queries_total Requêtes SQL exécutées (HTTP et tâches de fond).",
+                "# TYPE hotel_db_queries_total counter",
+                f"hotel_db_queries_total {self.db_queries}",
+                "# HELP hotel_db_query_seconds_total Temps cumulé d'exécution des requêtes SQL.",
+                "# TYPE hotel_db_query_seconds_total counter",
+                f"hotel_db_query_seconds_total {self.db_seconds:.6f}",
+                "# HELP hotel_process_start_time_seconds Démarrage du processus (epoch).",
+                "# TYPE hotel_process_start_time_seconds gauge",
+                f"hotel_process_start_time_seconds {self.started_at:.3f}",
+            ]
+        return "\n".join(lines) + "\n"
+
+
+def _render_histograms(name: str, help_text: str, histograms: Dict[Tuple[str, str], Histogram]) -> list:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for (method, route), histogram in sorted(histograms.items()):
+        labels = f'method="{method}",route="{route}"'
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS, histogram.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+        lines.append(f"{name}_sum{{{labels}}} {histogram.sum:.6f}")
+        lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+    return lines
+
+
+metrics = MetricsRegistry()
+
+# ==================== TEMPS BASE DE DONNÉES ====================
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_start"].pop()
+    metrics.query_executed(duration)
+    db_time = _request_db_time.get()
+    if db_time is not None:
+        db_time[0] += duration
+
+def instrument_engine(engine):
+    """Branche la mesure du temps SQL sur un moteur synchrone (ou le sync_engine d'un moteur async)"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+# ==================== MIDDLEWARE ====================
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI pur : chronomètre chaque requête HTTP et l'attribue au gabarit
+    de la route (/admin/bookings/{booking_id}/status) plutôt qu'au chemin réel,
+    pour garder un nombre de séries borné.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = [500]
+        db_time = [0.0]
+        token = _request_db_time.set(db_time)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_code[0] = message["status"]
+            await send(message)
+
+        metrics.request_started(method)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - started
+            _request_db_time.reset(token)
+            route = scope.get("route")
+            metrics.request_finished(
+                method, getattr(route, "path", "unmatched"), status_code[0], duration, db_time[0]
+            )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Float, Boolean, Text, DateTime, JSON
+from sqlalchemy import Column, String, Integer, Float, Boolean, Text, DateTime, Date, JSON, Index
 from sqlalchemy.ext.declarative import declarative_base
 import uuid
 from datetime import datetime
@@ -20,6 +20,42 @@ class Booking(Base):
     status = Column(String(20), default="pending")
     special_requests = Column(Text, nullable=True)  
     created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        # Liste admin : tri (created_at, id), filtres statut / type de chambre
+        Index("ix_bookings_created_at_id", "created_at", "id"),
+        Index("ix_bookings_status_created_at", "status", "created_at", "id"),
+        Index("ix_bookings_room_type_created_at", "room_type", "created_at", "id"),
+        # Recherche de séjours par période (disponibilités, occupation)
+        Index("ix_bookings_check_in_check_out", "check_in", "check_out"),
+        # Occupation : index couvrant, les séjours sont lus sans toucher à la table
+        Index("ix_bookings_occupancy", "status", "check_out", "check_in", "room_type", "total_price"),
+    )
+
+# === ARCHIVE DES RÉSERVATIONS ===
+class BookingArchive(Base):
+    """Réservations terminées (départ ou annulation anciens) sorties de la table bookings"""
+    __tablename__ = "bookings_archive"
+
+    id = Column(String(36), primary_key=True)
+    guest_name = Column(String(100), nullable=False)
+    guest_email = Column(String(100), nullable=False)
+    guest_phone = Column(String(20), nullable=False)
+    check_in = Column(DateTime, nullable=False)
+    check_out = Column(DateTime, nullable=False)
+    room_type = Column(String(50), nullable=False)
+    guests = Column(Integer, nullable=False)
+    total_price = Column(Float, nullable=False)
+    status = Column(String(20))
+    special_requests = Column(Text, nullable=True)
+    created_at = Column(DateTime)
+    archived_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Liste admin des archives : même tri que la table chaude
+        Index("ix_bookings_archive_created_at_id", "created_at", "id"),
+        Index("ix_bookings_archive_occupancy", "status", "check_out", "check_in", "room_type", "total_price"),
+    )
 
 class RoomType(Base):
     __tablename__ = "room_types"
@@ -33,6 +69,67 @@ class RoomType(Base):
     images = Column(JSON)
     is_active = Column(Boolean, default=True)
 
+# === PLANS TARIFAIRES ===
+class RatePlan(Base):
+    """Tarif saisonnier, majoration week-end et séjour minimum sur une période"""
+    __tablename__ = "rate_plans"
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    # Type de chambre concerné (vide : tous les types de chambre)
+    room_type_id = Column(String(36), nullable=True)
+    name = Column(String(100), nullable=False)
+    # Nuits couvertes, dates incluses
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=False)
+    # Champs optionnels : un plan ne remplace que ce qu'il définit
+    price_per_night = Column(Float, nullable=True)
+    weekend_uplift = Column(Float, nullable=True)  # 0.15 = +15 % les nuits de week-end
+    min_stay = Column(Integer, nullable=True)  # nuits minimum pour une arrivée sur la période
+    # En cas de chevauchement, le plan de priorité la plus haute l'emporte
+    priority = Column(Integer, nullable=False, default=0)
+    is_active = Column(Boolean, default=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+# === CALENDRIER D'INVENTAIRE ===
+class RoomNight(Base):
+    __tablename__ = "room_inventory"
+    
+    # Nom du type de chambre, comme dans Booking.room_type
+    room_type = Column(String(50), primary_key=True)
+    night = Column(Date, primary_key=True)
+    sold = Column(Integer, nullable=False, default=0)
+    
+    __table_args__ = (
+        # Calendrier de toutes les chambres sur une période
+        Index("ix_room_inventory_night", "night"),
+    )
+
+
+# === AGRÉGATS ANALYTICS ===
+class BookingRollup(Base):
+    __tablename__ = "booking_rollups"
+    
+    # Mois de création (YYYY-MM), type de chambre et statut
+    month = Column(String(7), primary_key=True)
+    room_type = Column(String(50), primary_key=True)
+    status = Column(String(20), primary_key=True)
+    booking_count = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
+
+
+# === JOURNAL DES ÉVÉNEMENTS ===
+class BookingEvent(Base):
+    """Changements de réservation, écrits par le writer et lus par les flux SSE de tous les workers"""
+    __tablename__ = "booking_events"
+    
+    # Croissant et jamais réutilisé : c'est l'identifiant SSE (Last-Event-ID)
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    event_type = Column(String(50), nullable=False)
+    payload = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = {"sqlite_autoincrement": True}
+
 
 class AdminUser(Base):
     __tablename__ = "admin_users"
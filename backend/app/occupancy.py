@@ -0,0 +1,155 @@
+from datetime import date
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from sqlalchemy import func, select, union_all
+from sqlalchemy.orm import Session
+
+from .models import Booking, BookingArchive
+
+# Statuts qui vendent réellement une chambre (pending s'ajoute sur demande)
+OCCUPIED_STATUSES = ["confirmed", "checked-in", "checked-out"]
+
+
+def _ratio(numerator: float, denominator: float, scale: float = 1.0) -> float:
+    return round(numerator / denominator * scale, 2) if denominator else 0.0
+
+
+class OccupancyService:
+    """
+    Occupation nuit par nuit et par type de chambre, par tableau de différences :
+    chaque séjour ajoute +1 à sa nuit d'arrivée et -1 à son départ, une somme cumulée
+    donne les chambres vendues de chaque nuit. Le chiffre d'affaires suit le même
+    chemin, chaque séjour pesant son prix total réparti sur ses nuits.
+    """
+
+    @staticmethod
+    def load_stays(db: Session, start: date, end: date, statuses: Iterable[str]) -> list:
+        """
+        Séjours (table chaude et archive) qui chevauchent [start, end) :
+        (type de chambre, jour julien d'arrivée, jour julien de départ, prix total).
+        """
+        statuses = list(statuses)
+        selects = [
+            select(
+                table.room_type,
+                func.julianday(func.date(table.check_in)),
+                func.julianday(func.date(table.check_out)),
+                table.total_price
+            ).where(
+                table.check_in < end,
+                table.check_out > start,
+                table.status.in_(statuses)
+            )
+            for table in (Booking, BookingArchive)
+        ]
+        return db.execute(union_all(*selects)).all()
+
+    @staticmethod
+    def compute(
+        stays: list,
+        start: date,
+        end: date,
+        capacities: Dict[str, int]
+    ) -> dict:
+        """Séries journalières (vendues, CA, taux, ADR, RevPAR) et synthèse par type de chambre"""
+        days = (end - start).days
+        room_types = list(capacities)
+        room_index = {name: index for index, name in enumerate(room_types)}
+        width = days + 1
+
+        # Séjours en colonnes ; les types de chambre inconnus (inactifs) sont ignorés
+        if stays:
+            names, check_ins, check_outs, prices = zip(*stays)
+            rooms = np.array([room_index.get(name, -1) for name in names], dtype=np.int64)
+            start_jd = date_to_julian(start)
+            arrival = np.asarray(check_ins, dtype=np.float64) - start_jd
+            departure = np.asarray(check_outs, dtype=np.float64) - start_jd
+            prices = np.asarray(prices, dtype=np.float64)
+        else:
+            rooms = np.zeros(0, dtype=np.int64)
+            arrival = departure = prices = np.zeros(0)
+
+        # Prix d'une nuit de chaque séjour, puis bornage du séjour à la période
+        nights = np.maximum(departure - arrival, 1)
+        nightly_revenue = prices / nights
+        first = np.clip(arrival, 0, days).astype(np.int64)
+        last = np.clip(departure, 0, days).astype(np.int64)
+        keep = (last > first) & (rooms >= 0)
+        rooms, first, last, nightly_revenue = rooms[keep], first[keep], last[keep], nightly_revenue[keep]
+
+        # Tableaux de différences (types de chambre x nuits), aplatis pour bincount
+        size = len(room_types) * width
+        starts, ends = rooms * width + first, rooms * width + last
+        sold = (np.bincount(starts, minlength=size) - np.bincount(ends, minlength=size)).reshape(-1, width)
+        revenue = (
+            np.bincount(starts, weights=nightly_revenue, minlength=size)
+            - np.bincount(ends, weights=nightly_revenue, minlength=size)
+        ).reshape(-1, width)
+        sold = np.cumsum(sold, axis=1)[:, :days]
+        revenue = np.cumsum(revenue, axis=1)[:, :days]
+
+        capacity = np.array([capacities[name] for name in room_types], dtype=np.int64)
+        daily_sold = sold.sum(axis=0)
+        daily_revenue = revenue.sum(axis=0)
+        daily_capacity = int(capacity.sum())
+
+        # Indicateurs journaliers calculés en colonnes (0 quand il n'y a rien à diviser)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            occupancy_rate = np.where(daily_capacity, daily_sold / max(daily_capacity, 1) * 100, 0.0)
+            adr = np.where(daily_sold > 0, daily_revenue / np.maximum(daily_sold, 1), 0.0)
+            revpar = np.where(daily_capacity, daily_revenue / max(daily_capacity, 1), 0.0)
+        dates = np.arange(np.datetime64(start), np.datetime64(end)).astype(str).tolist()
+        daily = [
+            {
+                "date": day,
+                "rooms_sold": rooms_sold,
+                "rooms_available": daily_capacity,
+                "occupancy_rate": rate,
+                "revenue": night_revenue,
+                "adr": night_adr,
+                "revpar": night_revpar
+            }
+            for day, rooms_sold, rate, night_revenue, night_adr, night_revpar in zip(
+                dates, daily_sold.tolist(), np.round(occupancy_rate, 2).tolist(),
+                np.round(daily_revenue, 2).tolist(), np.round(adr, 2).tolist(), np.round(revpar, 2).tolist()
+            )
+        ]
+
+        by_room_type = {
+            name: OccupancyService.summarize(
+                int(sold[index].sum()), float(revenue[index].sum()), int(capacity[index]) * days
+            )
+            for index, name in enumerate(room_types)
+        }
+        summary = OccupancyService.summarize(
+            int(daily_sold.sum()), float(daily_revenue.sum()), daily_capacity * days
+        )
+        return {"summary": summary, "room_types": by_room_type, "daily": daily}
+
+    @staticmethod
+    def summarize(room_nights_sold: int, revenue: float, room_nights_available: int) -> dict:
+        return {
+            "room_nights_available": room_nights_available,
+            "room_nights_sold": room_nights_sold,
+            "occupancy_rate": _ratio(room_nights_sold, room_nights_available, 100),
+            "revenue": round(revenue, 2),
+            "adr": _ratio(revenue, room_nights_sold),
+            "revpar": _ratio(revenue, room_nights_available)
+        }
+
+    @staticmethod
+    def occupancy(
+        db: Session,
+        start: date,
+        end: date,
+        capacities: Dict[str, int],
+        statuses: Optional[List[str]] = None
+    ) -> dict:
+        stays = OccupancyService.load_stays(db, start, end, statuses or OCCUPIED_STATUSES)
+        return OccupancyService.compute(stays, start, end, capacities)
+
+
+def date_to_julian(day: date) -> float:
+    """Jour julien de minuit, comme julianday(date(...)) dans SQLite"""
+    return day.toordinal() + 1721424.5
@@ -0,0 +1,230 @@
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .config import settings
+from .models import RatePlan
+
+# ==================== PLANS TARIFAIRES ====================
+
+@dataclass(frozen=True)
+class CachedRatePlan:
+    """Copie figée d'un plan tarifaire, indépendante de la session SQLAlchemy"""
+    id: str
+    room_type_id: Optional[str]
+    name: str
+    start_date: date
+    end_date: date
+    price_per_night: Optional[float]
+    weekend_uplift: Optional[float]
+    min_stay: Optional[int]
+    priority: int
+
+    @classmethod
+    def from_model(cls, plan: RatePlan) -> "CachedRatePlan":
+        return cls(
+            id=plan.id,
+            room_type_id=plan.room_type_id,
+            name=plan.name,
+            start_date=plan.start_date,
+            end_date=plan.end_date,
+            price_per_night=plan.price_per_night,
+            weekend_uplift=plan.weekend_uplift,
+            min_stay=plan.min_stay,
+            priority=plan.priority or 0
+        )
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> "CachedRatePlan":
+        return cls(**{
+            **payload,
+            "start_date": date.fromisoformat(payload["start_date"]),
+            "end_date": date.fromisoformat(payload["end_date"])
+        })
+
+    def to_payload(self) -> dict:
+        """Version JSON (catalogue partagé, réponses admin)"""
+        return {
+            "id": self.id,
+            "room_type_id": self.room_type_id,
+            "name": self.name,
+            "start_date": self.start_date.isoformat(),
+            "end_date": self.end_date.isoformat(),
+            "price_per_night": self.price_per_night,
+            "weekend_uplift": self.weekend_uplift,
+            "min_stay": self.min_stay,
+            "priority": self.priority
+        }
+
+    def applies_to(self, room_type_id: str) -> bool:
+        return self.room_type_id is None or self.room_type_id == room_type_id
+
+
+@dataclass(frozen=True)
+class RateChange:
+    """Nuits [start, end] (incluses) d'un type de chambre (None : tous) dont le tarif a changé"""
+    room_type_id: Optional[str]
+    start: date
+    end: date
+
+    @classmethod
+    def from_plan(cls, plan: RatePlan) -> "RateChange":
+        return cls(plan.room_type_id, plan.start_date, plan.end_date)
+
+
+def weekend_days() -> List[int]:
+    """Jours de la semaine (lundi = 0) dont la nuit est majorée le week-end"""
+    return [int(day) for day in settings.RATE_WEEKEND_DAYS.split(",") if day.strip()]
+
+
+def compile_rates(
+    base_price: float,
+    plans: Iterable[CachedRatePlan],
+    origin: date,
+    days: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Prix et séjour minimum de chaque nuit de [origin, origin + days).
+    Les plans sont appliqués par priorité croissante, chacun sur une tranche du tableau :
+    le coût dépend du nombre de plans, pas du nombre de nuits à tarifer.
+    """
+    prices = np.full(days, base_price, dtype=np.float64)
+    uplift = np.zeros(days)
+    min_stay = np.ones(days, dtype=np.int32)
+
+    for plan in sorted(plans, key=lambda plan: (plan.priority, plan.start_date, plan.id)):
+        first = max((plan.start_date - origin).days, 0)
+        last = min((plan.end_date - origin).days + 1, days)
+        if last <= first:
+            continue
+        if plan.price_per_night is not None:
+            prices[first:last] = plan.price_per_night
+        if plan.weekend_uplift is not None:
+            uplift[first:last] = plan.weekend_uplift
+        if plan.min_stay is not None:
+            min_stay[first:last] = plan.min_stay
+
+    weekdays = (origin.weekday() + np.arange(days)) % 7
+    weekend = np.isin(weekdays, weekend_days())
+    rates = np.where(weekend & (uplift != 0), prices * (1 + uplift), prices)
+    return rates, min_stay
+
+
+class RateTable:
+    """
+    Prix par nuit précalculés d'un type de chambre sur [origin, origin + days).
+    Un séjour lit une tranche du tableau : aucune recherche des plans qui couvrent chaque nuit.
+    Les nuits hors de la période précalculée sont compilées à la demande avec les mêmes plans.
+    """
+
+    def __init__(
+        self,
+        room_type_id: str,
+        base_price: float,
+        plans: Tuple[CachedRatePlan, ...],
+        origin: date,
+        rates: np.ndarray,
+        min_stay: np.ndarray
+    ):
+        self.room_type_id = room_type_id
+        self.base_price = base_price
+        self.plans = plans
+        self.origin = origin
+        self.rates = rates
+        self.min_stay = min_stay
+        self.rates.flags.writeable = False
+        self.min_stay.flags.writeable = False
+        # Nombre cumulé de nuits dont le prix diffère du prix de base
+        self._adjusted = np.concatenate(([0], np.cumsum(rates != base_price)))
+
+    @classmethod
+    def compile(
+        cls,
+        room_type_id: str,
+        base_price: float,
+        plans: Iterable[CachedRatePlan],
+        origin: date,
+        days: int
+    ) -> "RateTable":
+        plans = tuple(plans)
+        rates, min_stay = compile_rates(base_price, plans, origin, days)
+        return cls(room_type_id, base_price, plans, origin, rates, min_stay)
+
+    @property
+    def days(self) -> int:
+        return len(self.rates)
+
+    def recompile(self, plans: Iterable[CachedRatePlan], start: date, end: date) -> "RateTable":
+        """Nouvelle table où seules les nuits [start, end] sont recompilées avec les plans à jour"""
+        plans = tuple(plans)
+        first = max((start - self.origin).days, 0)
+        last = min((end - self.origin).days + 1, self.days)
+        rates, min_stay = self.rates.copy(), self.min_stay.copy()
+        if last > first:
+            window_origin = self.origin + timedelta(days=first)
+            rates[first:last], min_stay[first:last] = compile_rates(
+                self.base_price, plans, window_origin, last - first
+            )
+        return RateTable(self.room_type_id, self.base_price, plans, self.origin, rates, min_stay)
+
+    def window(self, start: date, end: date) -> Tuple[np.ndarray, np.ndarray]:
+        """Prix et séjour minimum des nuits [start, end)"""
+        first = (start - self.origin).days
+        last = (end - self.origin).days
+        if 0 <= first and last <= self.days:
+            return self.rates[first:last], self.min_stay[first:last]
+        return compile_rates(self.base_price, self.plans, start, last - first)
+
+    def stay_total(self, check_in: date, check_out: date) -> Optional[float]:
+        """Somme des prix par nuit du séjour, None si toutes les nuits sont au prix de base"""
+        first = (check_in - self.origin).days
+        last = (check_out - self.origin).days
+        if 0 <= first and last <= self.days:
+            if self._adjusted[last] == self._adjusted[first]:
+                return None
+            return float(self.rates[first:last].sum())
+        rates, _ = self.window(check_in, check_out)
+        if not (rates != self.base_price).any():
+            return None
+        return float(rates.sum())
+
+    def check_min_stay(self, check_in: date, nights: int):
+        """Le séjour minimum est celui de la nuit d'arrivée"""
+        required = int(self.window(check_in, check_in + timedelta(days=1))[1][0])
+        if nights < required:
+            raise ValueError(
+                f"Séjour minimum de {required} nuits pour une arrivée le {check_in.isoformat()}"
+            )
+
+
+def compile_rate_tables(
+    rooms: Iterable,
+    plans: List[CachedRatePlan],
+    previous: Optional[Dict[str, RateTable]] = None,
+    changes: Optional[List[RateChange]] = None
+) -> Dict[str, RateTable]:
+    """
+    Tables de prix de tous les types de chambre.
+    Avec les tables précédentes et la liste des périodes modifiées, seules ces périodes
+    sont recompilées ; les autres tables sont reprises telles quelles.
+    """
+    origin = date.today()
+    tables = {}
+    for room in rooms:
+        room_plans = tuple(plan for plan in plans if plan.applies_to(room.id))
+        table = (previous or {}).get(room.id)
+        if (
+            changes is None or table is None
+            or table.origin != origin or table.base_price != room.price_per_night
+        ):
+            tables[room.id] = RateTable.compile(
+                room.id, room.price_per_night, room_plans, origin, settings.RATE_TABLE_DAYS
+            )
+            continue
+        for change in changes:
+            if change.room_type_id is None or change.room_type_id == room.id:
+                table = table.recompile(room_plans, change.start, change.end)
+        tables[room.id] = table
+    return tables
@@ -0,0 +1,120 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import func, select, union_all
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from .models import Booking, BookingArchive, BookingRollup
+
+# Statuts comptés comme séjours confirmés dans les analytics
+CONFIRMED_STATUSES = {"confirmed", "checked-in"}
+
+
+def rollup_month(created_at) -> str:
+    return (created_at or datetime.utcnow()).strftime("%Y-%m")
+
+
+class RollupService:
+    """Agrégats des réservations par mois, type de chambre et statut, tenus à jour à chaque écriture"""
+
+    @staticmethod
+    def add(db: Session, month: str, room_type: str, status: str, count: int, revenue: float):
+        """Ajoute (ou retire si négatif) des réservations à une cellule d'agrégat"""
+        statement = insert(BookingRollup).values(
+            month=month, room_type=room_type, status=status,
+            booking_count=count, revenue=revenue
+        )
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[BookingRollup.month, BookingRollup.room_type, BookingRollup.status],
+            set_={
+                "booking_count": BookingRollup.booking_count + statement.excluded.booking_count,
+                "revenue": BookingRollup.revenue + statement.excluded.revenue
+            }
+        ))
+
+    @staticmethod
+    def booking_created(db: Session, booking: Booking):
+        RollupService.add(
+            db, rollup_month(booking.created_at), booking.room_type,
+            booking.status or "pending", 1, booking.total_price
+        )
+
+    @staticmethod
+    def status_changed(db: Session, booking: Booking, old_status: str, new_status: str):
+        if (old_status or "pending") == new_status:
+            return
+        month = rollup_month(booking.created_at)
+        RollupService.add(db, month, booking.room_type, old_status or "pending", -1, -booking.total_price)
+        RollupService.add(db, month, booking.room_type, new_status, 1, booking.total_price)
+
+    @staticmethod
+    def get_rows(db: Session) -> List[BookingRollup]:
+        return db.query(BookingRollup).filter(BookingRollup.booking_count != 0).all()
+
+    @staticmethod
+    def summarize(rows: List[BookingRollup]) -> dict:
+        """Construit les tendances mensuelles et la performance des chambres depuis les agrégats"""
+        monthly_trends = defaultdict(int)
+        room_performance = {}
+        total_bookings = confirmed_bookings = 0
+        total_revenue = 0.0
+
+        for row in rows:
+            monthly_trends[row.month] += row.booking_count
+            performance = room_performance.setdefault(row.room_type, {
+                "total_revenue": 0,
+                "booking_count": 0,
+                "average_rate": 0
+            })
+            performance["total_revenue"] += row.revenue
+            performance["booking_count"] += row.booking_count
+
+            total_bookings += row.booking_count
+            total_revenue += row.revenue
+            if row.status in CONFIRMED_STATUSES:
+                confirmed_bookings += row.booking_count
+
+        for data in room_performance.values():
+            data["total_revenue"] = round(data["total_revenue"], 2)
+            data["average_rate"] = round(data["total_revenue"] / data["booking_count"], 2) if data["booking_count"] > 0 else 0
+
+        return {
+            "monthly_trends": dict(sorted(monthly_trends.items())),
+            "room_performance": room_performance,
+            "total_bookings": total_bookings,
+            "confirmed_bookings": confirmed_bookings,
+            "total_revenue": total_revenue
+        }
+
+    @staticmethod
+    def rebuild(db: Session) -> int:
+        """Recalcule tous les agrégats à partir des réservations (table chaude et archive)"""
+        bookings = union_all(*[
+            select(table.created_at, table.room_type, table.status, table.total_price)
+            for table in (Booking, BookingArchive)
+        ]).subquery()
+        month = func.strftime("%Y-%m", bookings.c.created_at)
+        status = func.coalesce(bookings.c.status, "pending")
+        rows = db.execute(
+            select(
+                month, bookings.c.room_type, status,
+                func.count(), func.coalesce(func.sum(bookings.c.total_price), 0.0)
+            ).group_by(month, bookings.c.room_type, status)
+        ).all()
+
+        db.query(BookingRollup).delete()
+        db.bulk_insert_mappings(BookingRollup, [
+            {"month": row[0], "room_type": row[1], "status": row[2], "booking_count": row[3], "revenue": row[4]}
+            for row in rows
+        ])
+        db.commit()
+        return len(rows)
+
+    @staticmethod
+    def ensure_built(db: Session):
+        """Initialise les agrégats pour une base existante qui n'en a pas encore"""
+        has_bookings = db.query(Booking).first() is not None or db.query(BookingArchive).first() is not None
+        if db.query(BookingRollup).first() is None and has_bookings:
+            RollupService.rebuild(db)
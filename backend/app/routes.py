@@ -1,16 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from datetime import datetime, timedelta, date
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select, insert, or_, case
+from datetime import datetime, timedelta, date, timezone
 from jose import JWTError, jwt
-from typing import List
+from dataclasses import dataclass
+from typing import List, Dict, Optional
+import asyncio
+import base64
+import csv
 import hashlib
+import io
+import json
 import secrets
+import time
+import uuid
+import numpy as np
 
-from .database import get_db
-from .models import Booking, RoomType, AdminUser, PricingConfig
+from .database import get_async_db, AsyncSessionLocal
+from .models import Booking, BookingArchive, RoomType, AdminUser, PricingConfig, BookingRollup, RatePlan
 from .config import settings
+from .catalog import catalog
+from .rates import CachedRatePlan, RateChange, RateTable
+from .inventory import InventoryService, OverbookingError
+from .writer import booking_writer
+from .rollups import RollupService, rollup_month
+from .cache import TTLCache
+from .events import booking_events, format_sse
+from .occupancy import OccupancyService, OCCUPIED_STATUSES
 
 router = APIRouter()
 
@@ -21,6 +39,25 @@ ALGORITHM = settings.ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 security = HTTPBearer()
 
+# Admins authentifiés par token (clé : empreinte SHA-256 du token)
+admin_token_cache = TTLCache(
+    maxsize=settings.ADMIN_TOKEN_CACHE_SIZE, ttl=settings.ADMIN_TOKEN_CACHE_TTL_SECONDS
+)
+
+# Vue d'ensemble du dashboard par dernier numéro du journal booking_events : toute écriture
+# de réservation, quel que soit le worker, change la clé
+dashboard_cache = TTLCache(maxsize=1, ttl=settings.DASHBOARD_CACHE_TTL_SECONDS)
+
+# Calendriers de prix par (version du catalogue, période, composition) : périmés dès que les prix changent
+price_calendar_cache = TTLCache(
+    maxsize=settings.PRICE_CALENDAR_CACHE_SIZE, ttl=settings.PRICE_CALENDAR_CACHE_TTL_SECONDS
+)
+
+# Tickets du flux SSE déjà utilisés (jti), gardés jusqu'à leur expiration
+used_events_tickets = TTLCache(maxsize=10000, ttl=settings.EVENTS_TICKET_TTL_SECONDS)
+
+EVENTS_TICKET_SCOPE = "events"
+
 # ==================== FONCTIONS UTILITAIRES ====================
 
 def hash_password(password: str, salt: str) -> str:
@@ -46,24 +83,87 @@ def create_access_token(data: dict) -> str:
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
+def create_events_ticket(username: str) -> str:
+    """Ticket signé pour ouvrir un flux SSE : quelques secondes de validité, une seule connexion"""
+    expire = datetime.utcnow() + timedelta(seconds=settings.EVENTS_TICKET_TTL_SECONDS)
+    return jwt.encode(
+        {"sub": username, "scope": EVENTS_TICKET_SCOPE, "jti": uuid.uuid4().hex, "exp": expire},
+        SECRET_KEY, algorithm=ALGORITHM
+    )
+
+def consume_events_ticket(ticket: str) -> str:
+    """Vérifie un ticket de flux, le marque comme utilisé et retourne le nom de l'admin"""
+    try:
+        payload = jwt.decode(ticket, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        raise HTTPException(status_code=401, detail="Ticket invalide ou expiré")
+    jti = payload.get("jti")
+    if payload.get("scope") != EVENTS_TICKET_SCOPE or not jti or not payload.get("sub"):
+        raise HTTPException(status_code=401, detail="Ticket invalide")
+    if used_events_tickets.get(jti) is not None:
+        raise HTTPException(status_code=401, detail="Ticket déjà utilisé")
+    used_events_tickets.set(jti, True)
+    return payload["sub"]
+
+@dataclass(frozen=True)
+class AdminPrincipal:
+    """Admin authentifié, détaché de la session pour pouvoir être mis en cache"""
+    id: str
+    username: str
+    email: str
+    role: str
+    is_active: bool
+
+    @classmethod
+    def from_model(cls, admin: AdminUser) -> "AdminPrincipal":
+        return cls(
+            id=admin.id,
+            username=admin.username,
+            email=admin.email,
+            role=admin.role,
+            is_active=admin.is_active
+        )
+
+def invalidate_admin_tokens(username: str) -> int:
+    """Retire du cache tous les tokens d'un admin (désactivation, changement de rôle)"""
+    return admin_token_cache.pop_matching(lambda principal: principal.username == username)
+
 async def get_current_admin(
     credentials: HTTPAuthorizationCredentials = Depends(security), 
-    db: Session = Depends(get_db)
-) -> AdminUser:
+    db: AsyncSession = Depends(get_async_db)
+) -> AdminPrincipal:
     """Vérifie le token JWT et retourne l'admin connecté"""
+    return await authenticate_admin_token(credentials.credentials, db)
+
+async def authenticate_admin_token(token: str, db: AsyncSession) -> AdminPrincipal:
+    """Vérification d'un token JWT admin, avec cache des tokens déjà validés"""
+    cache_key = hashlib.sha256(token.encode()).hexdigest()
+    principal = admin_token_cache.get(cache_key)
+    if principal is not None:
+        return principal
+    
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
-        if not username:
+        # Un ticket de flux SSE n'est pas un token d'API
+        if not username or payload.get("scope"):
             raise HTTPException(status_code=401, detail="Token invalide")
     except JWTError:
         raise HTTPException(status_code=401, detail="Token invalide ou expiré")
     
-    admin = db.query(AdminUser).filter(AdminUser.username == username).first()
+    admin = await db.scalar(select(AdminUser).where(AdminUser.username == username))
     if not admin or not admin.is_active:
         raise HTTPException(status_code=401, detail="Admin non trouvé ou inactif")
     
-    return admin
+    # Le token n'est jamais gardé en cache au-delà de son expiration
+    principal = AdminPrincipal.from_model(admin)
+    ttl = settings.ADMIN_TOKEN_CACHE_TTL_SECONDS
+    if payload.get("exp"):
+        ttl = min(ttl, payload["exp"] - datetime.now(timezone.utc).timestamp())
+    if ttl > 0:
+        admin_token_cache.set(cache_key, principal, ttl=ttl)
+    
+    return principal
 
 # ==================== SERVICE DE CALCUL DE PRIX ====================
 
@@ -79,10 +179,13 @@ class PricingService:
         children: List[int], 
         pricing_config: PricingConfig,
         is_single: bool = False, 
-        has_pool_view: bool = False
+        has_pool_view: bool = False,
+        rate_table: Optional[RateTable] = None
     ) -> dict:
         """
-        Calcule le prix total selon la grille tarifaire de l'hôtel
+        Calcule le prix total selon la grille tarifaire de l'hôtel.
+        Avec une table de prix (plans tarifaires), le prix de chaque nuit est lu dans la table ;
+        un séjour dont toutes les nuits sont au prix de base garde le calcul forfaitaire.
         """
         # Validation des dates
         if check_out <= check_in:
@@ -92,8 +195,17 @@ class PricingService:
         if nights <= 0:
             raise ValueError("Nombre de nuits invalide")
 
+        # Prix des nuits selon les plans tarifaires (None : prix de base sur tout le séjour)
+        nightly_total = None
+        if rate_table is not None:
+            rate_table.check_min_stay(check_in, nights)
+            nightly_total = rate_table.stay_total(check_in, check_out)
+
         # Prix de base
-        base_price = room_type.price_per_night * adults * nights
+        if nightly_total is None:
+            base_price = room_type.price_per_night * adults * nights
+        else:
+            base_price = nightly_total * adults
         
         # Suppléments
         supplements = 0
@@ -112,7 +224,10 @@ class PricingService:
             else:
                 continue  
             
-            children_discount += room_type.price_per_night * discount_rate * nights
+            if nightly_total is None:
+                children_discount += room_type.price_per_night * discount_rate * nights
+            else:
+                children_discount += nightly_total * discount_rate
         
         # Taxe de séjour
         tax_total = pricing_config.tax_per_night * (adults + len(children)) * nights
@@ -127,9 +242,164 @@ class PricingService:
             "tax_total": round(tax_total, 2),
             "total": round(total, 2),
             "nights": nights,
-            "price_per_night": room_type.price_per_night
+            "price_per_night": (
+                room_type.price_per_night if nightly_total is None else round(nightly_total / nights, 2)
+            )
         }
 
+    @staticmethod
+    def calculate_batch_prices(
+        room_types: Dict[str, RoomType],
+        stays: List[dict],
+        pricing_config: PricingConfig,
+        rate_tables: Optional[Dict[str, RateTable]] = None
+    ) -> List[dict]:
+        """
+        Calcule les prix de plusieurs séjours en une seule passe vectorisée.
+        Les opérations sont faites dans le même ordre que calculate_booking_price
+        pour obtenir exactement les mêmes montants.
+        """
+        results = [None] * len(stays)
+        valid = []
+        nightly_totals = []
+        
+        # Validation ligne par ligne
+        for index, stay in enumerate(stays):
+            try:
+                room_type = room_types.get(stay["room_type_id"])
+                if not room_type:
+                    raise LookupError("Type de chambre non trouvé")
+                
+                check_in = datetime.strptime(stay["check_in"], "%Y-%m-%d").date()
+                check_out = datetime.strptime(stay["check_out"], "%Y-%m-%d").date()
+                if check_out <= check_in:
+                    raise ValueError("La date de départ doit être après la date d'arrivée")
+                
+                # Nombres contrôlés ici : la partie vectorisée ne reçoit que des lignes propres
+                adults = stay["adults"]
+                if isinstance(adults, bool) or not isinstance(adults, int) or adults < 1:
+                    raise ValueError("Nombre d'adultes invalide")
+                child_ages = stay.get("children") or []
+                if not isinstance(child_ages, list) or any(
+                    isinstance(age, bool) or not isinstance(age, (int, float)) or not 0 <= age < 150
+                    for age in child_ages
+                ):
+                    raise ValueError("Âges des enfants invalides")
+                
+                # Somme des prix par nuit (NaN : prix de base sur tout le séjour)
+                nightly_total = None
+                rate_table = (rate_tables or {}).get(room_type.id)
+                if rate_table is not None:
+                    rate_table.check_min_stay(check_in, (check_out - check_in).days)
+                    nightly_total = rate_table.stay_total(check_in, check_out)
+                
+                valid.append((index, room_type, (check_out - check_in).days, stay, adults, child_ages))
+                nightly_totals.append(np.nan if nightly_total is None else nightly_total)
+            except KeyError as e:
+                results[index] = {"index": index, "error": f"Champ manquant: {e.args[0]}"}
+            except (LookupError, ValueError) as e:
+                results[index] = {"index": index, "error": str(e)}
+            except (TypeError, AttributeError):
+                results[index] = {"index": index, "error": "Séjour invalide"}
+        
+        if not valid:
+            return results
+        
+        # Colonnes des séjours valides
+        prices = np.array([room_type.price_per_night for _, room_type, _, _, _, _ in valid], dtype=np.float64)
+        nights = np.array([n for _, _, n, _, _, _ in valid], dtype=np.int64)
+        adults = np.array([a for _, _, _, _, a, _ in valid], dtype=np.int64)
+        is_single = np.array([bool(stay.get("is_single", False)) for _, _, _, stay, _, _ in valid])
+        has_pool_view = np.array([bool(stay.get("has_pool_view", False)) for _, _, _, stay, _, _ in valid])
+        nightly_totals = np.array(nightly_totals, dtype=np.float64)
+        rated = ~np.isnan(nightly_totals)
+        
+        children = [child_ages for _, _, _, _, _, child_ages in valid]
+        children_count = np.array([len(c) for c in children], dtype=np.int64)
+        ages = np.full((len(valid), int(children_count.max(initial=0))), -1.0)
+        for row, child_ages in enumerate(children):
+            ages[row, :len(child_ages)] = child_ages
+        
+        # Prix de base
+        base_price = np.where(rated, nightly_totals * adults, prices * adults * nights)
+        
+        # Suppléments
+        supplements = np.where(is_single, pricing_config.single_supplement * nights, 0.0)
+        supplements = supplements + np.where(has_pool_view, pricing_config.pool_view_supplement * nights, 0.0)
+        
+        # Réductions enfants (colonne par colonne pour garder l'ordre de sommation)
+        children_discount = np.zeros(len(valid))
+        for column in ages.T:
+            discount_rate = np.select(
+                [(column >= 2) & (column < 4), (column >= 4) & (column < 12)],
+                [pricing_config.child_discount_2_4, pricing_config.child_discount_4_12],
+                default=0.0
+            )
+            eligible = discount_rate > 0
+            discount = np.where(rated, nightly_totals * discount_rate, prices * discount_rate * nights)
+            children_discount = children_discount + np.where(eligible, discount, 0.0)
+        
+        # Taxe de séjour
+        tax_total = pricing_config.tax_per_night * (adults + children_count) * nights
+        
+        # Total final
+        total = base_price + supplements - children_discount + tax_total
+        
+        columns = zip(
+            base_price.tolist(), supplements.tolist(), children_discount.tolist(),
+            tax_total.tolist(), total.tolist(), nights.tolist(), prices.tolist(), nightly_totals.tolist()
+        )
+        for (index, _, _, stay, _, _), (base, supp, discount, tax, tot, n, price, nightly) in zip(valid, columns):
+            results[index] = {
+                "index": index,
+                "room_type_id": stay["room_type_id"],
+                "price_breakdown": {
+                    "base_price": round(base, 2),
+                    "supplements": round(supp, 2),
+                    "children_discount": round(discount, 2),
+                    "tax_total": round(tax, 2),
+                    "total": round(tot, 2),
+                    "nights": n,
+                    "price_per_night": price if np.isnan(nightly) else round(nightly / n, 2)
+                }
+            }
+        
+        return results
+
+    @staticmethod
+    def calculate_nightly_totals(
+        nightly_rates: np.ndarray,
+        adults: int,
+        children: List[int],
+        pricing_config: PricingConfig
+    ) -> List[List[float]]:
+        """
+        Total d'une nuit (arrivée le jour J, départ J+1) pour chaque type de chambre et chaque jour.
+        nightly_rates : matrice (types de chambre x jours) des prix par nuit.
+        Même ordre d'opérations que calculate_booking_price avec nights=1.
+        """
+        # Prix de base
+        base_price = nightly_rates * adults * 1
+
+        # Réductions enfants
+        children_discount = np.zeros_like(nightly_rates)
+        for child_age in children:
+            if 2 <= child_age < 4:
+                discount_rate = pricing_config.child_discount_2_4
+            elif 4 <= child_age < 12:
+                discount_rate = pricing_config.child_discount_4_12
+            else:
+                continue
+            children_discount = children_discount + nightly_rates * discount_rate * 1
+
+        # Taxe de séjour
+        tax_total = pricing_config.tax_per_night * (adults + len(children)) * 1
+
+        # Total final (sans supplément)
+        total = base_price + 0 - children_discount + tax_total
+
+        return [[round(value, 2) for value in row] for row in total.tolist()]
+
 # ==================== ROUTES PUBLIQUES ====================
 
 @router.get("/")
@@ -140,24 +410,144 @@ async def root():
 async def health_check():
     return {"status": "healthy", "timestamp": datetime.utcnow().isoformat()}
 
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparaison faible de If-None-Match (liste d'ETags ou *) avec l'ETag courant"""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in (candidate.removeprefix("W/") for candidate in candidates)
+
 @router.get("/rooms")
-async def get_rooms(db: Session = Depends(get_db)):
-    rooms = db.query(RoomType).filter(RoomType.is_active == True).all()
-    return {"count": len(rooms), "rooms": rooms}
+async def get_rooms(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    Catalogue des chambres, sérialisé une fois par version du catalogue.
+    Les requêtes conditionnelles (If-None-Match) reçoivent 304 tant qu'il n'a pas changé.
+    """
+    snapshot = await catalog.get(db)
+    headers = {
+        "ETag": snapshot.rooms_etag,
+        "Cache-Control": f"public, max-age={settings.ROOMS_CACHE_MAX_AGE_SECONDS}"
+    }
+    if etag_matches(request.headers.get("if-none-match"), snapshot.rooms_etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=snapshot.rooms_json, media_type="application/json", headers=headers)
+
+def parse_children_ages(children: Optional[str]) -> List[int]:
+    """Âges des enfants passés en query string : children=3,8"""
+    if not children:
+        return []
+    try:
+        ages = [int(age) for age in children.split(",") if age.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Âges des enfants invalides")
+    if any(age < 0 or age > 17 for age in ages):
+        raise HTTPException(status_code=400, detail="Âges des enfants invalides")
+    return ages
+
+@router.get("/rooms/price-calendar")
+async def get_price_calendar(
+    month: Optional[str] = None,
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to"),
+    adults: int = Query(2, ge=1, le=10),
+    children: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Prix d'une nuit par type de chambre pour chaque jour d'un mois (month=YYYY-MM)
+    ou d'une période [from, to), pour une composition donnée (adults, children=3,8).
+    Calculé en une passe vectorisée et mis en cache jusqu'au prochain changement de prix.
+    """
+    if month:
+        try:
+            start = datetime.strptime(month, "%Y-%m").date()
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Mois invalide (format YYYY-MM)")
+        end = (start + timedelta(days=32)).replace(day=1)
+    elif from_date and to_date:
+        start, end = from_date, to_date
+    else:
+        raise HTTPException(status_code=400, detail="Paramètre month ou from/to requis")
+    
+    nights = (end - start).days
+    if nights <= 0:
+        raise HTTPException(status_code=400, detail="La date de fin doit être après la date de début")
+    if nights > settings.AVAILABILITY_MAX_NIGHTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Période limitée à {settings.AVAILABILITY_MAX_NIGHTS} nuits"
+        )
+    ages = sorted(parse_children_ages(children))
+    
+    snapshot = await catalog.get(db)
+    if not snapshot.pricing_config:
+        raise HTTPException(status_code=500, detail="Configuration des prix manquante")
+    
+    cache_key = (snapshot.version, start, end, adults, tuple(ages))
+    cached = price_calendar_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    rooms = list(snapshot.rooms.values())
+    days = [(start + timedelta(days=i)).isoformat() for i in range(nights)]
+    # Matrice (types de chambre x jours) des prix par nuit, lue dans les tables des plans tarifaires
+    windows = [snapshot.rates[room.id].window(start, end) for room in rooms]
+    nightly_rates = np.array([rates for rates, _ in windows], dtype=np.float64).reshape(len(rooms), nights)
+    totals = PricingService.calculate_nightly_totals(nightly_rates, adults, ages, snapshot.pricing_config)
+    
+    result = {
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        "adults": adults,
+        "children": ages,
+        "currency": "TND",
+        "room_types": [
+            {
+                "room_type_id": room.id,
+                "name": room.name,
+                "min_total": min(row),
+                "nights": [
+                    {"date": day, "total": total, "min_stay": stay}
+                    for day, total, stay in zip(days, row, min_stay.tolist())
+                ]
+            }
+            for room, row, (_, min_stay) in zip(rooms, totals, windows)
+        ],
+        # Prix "à partir de" affiché sur chaque jour du calendrier
+        "from_prices": [
+            {"date": day, "total": min(column)} for day, column in zip(days, zip(*totals))
+        ] if rooms else []
+    }
+    price_calendar_cache.set(cache_key, result)
+    return result
+
+def booking_event_data(booking: Booking) -> dict:
+    """Contenu d'un événement booking.created : la ligne telle qu'affichée dans la liste admin"""
+    return {
+        "booking_id": booking.id,
+        "guest_name": booking.guest_name,
+        "room_type": booking.room_type,
+        "check_in": booking.check_in,
+        "check_out": booking.check_out,
+        "guests": booking.guests,
+        "total_price": booking.total_price,
+        "status": booking.status,
+        "created_at": booking.created_at
+    }
 
 @router.post("/bookings")
-async def create_booking(booking_data: dict, db: Session = Depends(get_db)):
+async def create_booking(booking_data: dict, db: AsyncSession = Depends(get_async_db)):
     """
     Crée une nouvelle réservation avec calcul automatique du prix
     """
     try:
-        # Récupérer configuration
-        pricing_config = db.query(PricingConfig).first()
+        # Récupérer configuration et chambre depuis le catalogue
+        snapshot = await catalog.get(db)
+        pricing_config = snapshot.pricing_config
         if not pricing_config:
             raise HTTPException(status_code=500, detail="Configuration des prix manquante")
         
-        # Récupérer chambre
-        room_type = db.query(RoomType).filter(RoomType.id == booking_data["room_type_id"]).first()
+        room_type = snapshot.get_room(booking_data["room_type_id"])
         if not room_type:
             raise HTTPException(status_code=404, detail="Type de chambre non trouvé")
         
@@ -174,11 +564,13 @@ async def create_booking(booking_data: dict, db: Session = Depends(get_db)):
             children=booking_data.get("children", []),
             pricing_config=pricing_config,
             is_single=booking_data.get("is_single", False),
-            has_pool_view=booking_data.get("has_pool_view", False)
+            has_pool_view=booking_data.get("has_pool_view", False),
+            rate_table=snapshot.rates.get(room_type.id)
         )
         
         # Créer réservation
         booking = Booking(
+            id=str(uuid.uuid4()),
             guest_name=booking_data["guest_name"],
             guest_email=booking_data["guest_email"],
             guest_phone=booking_data["guest_phone"],
@@ -188,12 +580,22 @@ async def create_booking(booking_data: dict, db: Session = Depends(get_db)):
             guests=booking_data["adults"] + len(booking_data.get("children", [])),
             total_price=price_details["total"],
             status="pending",
-            special_requests=booking_data.get("special_requests")
+            special_requests=booking_data.get("special_requests"),
+            created_at=datetime.utcnow()
         )
         
-        db.add(booking)
-        db.commit()
-        db.refresh(booking)
+        async def write_booking(writer_db: AsyncSession):
+            # Bloquer une chambre pour chaque nuit du séjour
+            await writer_db.run_sync(
+                InventoryService.reserve, room_type.name, room_type.available_rooms, check_in, check_out
+            )
+            writer_db.add(booking)
+            await writer_db.run_sync(RollupService.booking_created, booking)
+            await booking_events.record(writer_db, "booking.created", booking_event_data(booking))
+        
+        # Écriture via la file unique (commit groupé avec les autres réservations)
+        await booking_writer.submit(write_booking)
+        booking_events.notify()
         
         return {
             "message": "Réservation créée avec succès",
@@ -202,15 +604,92 @@ async def create_booking(booking_data: dict, db: Session = Depends(get_db)):
             "status": "pending"
         }
         
+    except HTTPException:
+        raise
+    except OverbookingError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur lors de la création: {str(e)}")
 
+@router.get("/availability")
+async def get_availability(
+    from_date: date = Query(..., alias="from"),
+    to_date: date = Query(..., alias="to"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Disponibilités par type de chambre et par nuit sur [from, to)
+    """
+    nights = (to_date - from_date).days
+    if nights <= 0:
+        raise HTTPException(status_code=400, detail="La date de fin doit être après la date de début")
+    if nights > settings.AVAILABILITY_MAX_NIGHTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Période limitée à {settings.AVAILABILITY_MAX_NIGHTS} nuits"
+        )
+    
+    calendar = await db.run_sync(InventoryService.get_calendar, from_date, to_date)
+    days = [from_date + timedelta(days=i) for i in range(nights)]
+    
+    room_types = []
+    for room in (await catalog.get(db)).rooms.values():
+        sold_by_night = calendar.get(room.name, {})
+        availability = [
+            {
+                "date": day.isoformat(),
+                "sold": sold_by_night.get(day, 0),
+                "available": max(room.available_rooms - sold_by_night.get(day, 0), 0)
+            }
+            for day in days
+        ]
+        room_types.append({
+            "room_type_id": room.id,
+            "name": room.name,
+            "total_rooms": room.available_rooms,
+            "min_available": min(night["available"] for night in availability),
+            "nights": availability
+        })
+    
+    return {
+        "from": from_date.isoformat(),
+        "to": to_date.isoformat(),
+        "room_types": room_types
+    }
+
+@router.post("/quotes/batch")
+async def batch_quotes(quote_data: dict, db: AsyncSession = Depends(get_async_db)):
+    """
+    Calcule les prix de plusieurs séjours en une seule requête
+    """
+    stays = quote_data.get("stays")
+    if not isinstance(stays, list) or not stays:
+        raise HTTPException(status_code=400, detail="Liste de séjours requise")
+    if len(stays) > settings.QUOTE_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Maximum {settings.QUOTE_BATCH_MAX_SIZE} séjours par requête"
+        )
+    
+    snapshot = await catalog.get(db)
+    if not snapshot.pricing_config:
+        raise HTTPException(status_code=500, detail="Configuration des prix manquante")
+    
+    try:
+        quotes = PricingService.calculate_batch_prices(
+            snapshot.rooms, stays, snapshot.pricing_config, snapshot.rates
+        )
+    except (TypeError, ValueError, AttributeError) as e:
+        raise HTTPException(status_code=400, detail=f"Séjours invalides: {str(e)}")
+    
+    return {"count": len(quotes), "quotes": quotes}
+
 # ==================== ROUTES ADMIN ====================
 
 @router.post("/admin/login")
-async def admin_login(login_data: dict, db: Session = Depends(get_db)):
+async def admin_login(login_data: dict, db: AsyncSession = Depends(get_async_db)):
     """Authentification admin"""
     username = login_data.get("username")
     password = login_data.get("password")
@@ -218,7 +697,7 @@ async def admin_login(login_data: dict, db: Session = Depends(get_db)):
     if not username or not password:
         raise HTTPException(status_code=400, detail="Username et password requis")
     
-    admin = db.query(AdminUser).filter(AdminUser.username == username).first()
+    admin = await db.scalar(select(AdminUser).where(AdminUser.username == username))
     if not admin or not verify_password(password, admin.hashed_password):
         raise HTTPException(status_code=401, detail="Identifiants incorrects")
     
@@ -235,69 +714,316 @@ async def admin_login(login_data: dict, db: Session = Depends(get_db)):
         }
     }
 
+def encode_cursor(created_at: datetime, booking_id: str) -> str:
+    """Curseur opaque de pagination (created_at, id)"""
+    raw = json.dumps([created_at.isoformat(), booking_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str):
+    try:
+        created_at, booking_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at), booking_id
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Curseur invalide")
+
+def build_bookings_page_query(
+    columns: list,
+    table=Booking.__table__,
+    status: Optional[str] = None,
+    room_type: Optional[str] = None,
+    check_in_from: Optional[date] = None,
+    check_in_to: Optional[date] = None,
+    after: Optional[tuple] = None,
+    limit: int = 50
+):
+    """
+    Requête d'une page de réservations, triée par (created_at, id) décroissants.
+    table : bookings (par défaut) ou bookings_archive.
+    """
+    c = table.c
+    query = select(*columns)
+    if status:
+        query = query.where(c.status == status)
+    if room_type:
+        query = query.where(c.room_type == room_type)
+    if check_in_from:
+        query = query.where(c.check_in >= check_in_from)
+    if check_in_to:
+        query = query.where(c.check_in < check_in_to)
+    if after:
+        # Borne simple sur created_at pour que SQLite parcoure l'index à partir du curseur
+        after_created_at, after_id = after
+        query = query.where(
+            c.created_at <= after_created_at,
+            or_(c.created_at < after_created_at, c.id < after_id)
+        )
+    
+    return query.order_by(c.created_at.desc(), c.id.desc()).limit(limit)
+
 @router.get("/admin/bookings")
 async def get_all_bookings(
-    db: Session = Depends(get_db),
-    current_admin: AdminUser = Depends(get_current_admin)
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    room_type: Optional[str] = None,
+    check_in_from: Optional[date] = None,
+    check_in_to: Optional[date] = None,
+    fields: Optional[str] = None,
+    archived: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_admin: AdminPrincipal = Depends(get_current_admin)
+):
+    """
+    Liste paginée des réservations (les plus récentes d'abord).
+    Pagination par curseur sur (created_at, id), filtres optionnels et
+    projection des colonnes avec fields=guest_name,status,...
+    Par défaut seule la table chaude est lue ; archived=true liste les réservations archivées.
+    """
+    table = BookingArchive.__table__ if archived else Booking.__table__
+    booking_columns = table.columns
+    if fields:
+        requested = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = [name for name in requested if name not in booking_columns]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Champs inconnus: {', '.join(unknown)}")
+        # id et created_at sont toujours nécessaires pour le curseur
+        names = ["id", "created_at"] + [name for name in requested if name not in ("id", "created_at")]
+    else:
+        names = [column.name for column in booking_columns]
+    
+    query = build_bookings_page_query(
+        columns=[booking_columns[name] for name in names],
+        table=table,
+        status=status,
+        room_type=room_type,
+        check_in_from=check_in_from,
+        check_in_to=check_in_to,
+        after=decode_cursor(cursor) if cursor else None,
+        limit=limit + 1
+    )
+    rows = (await db.execute(query)).mappings().all()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+    
+    return {
+        "count": len(rows),
+        "bookings": [dict(row) for row in rows],
+        "next_cursor": next_cursor
+    }
+
+BULK_TRUE_VALUES = {"1", "true", "oui", "yes", "y"}
+
+def parse_bulk_csv(text: str) -> List[dict]:
+    """
+    Lit un fichier CSV d'allotement (une réservation par ligne, en-têtes = champs JSON).
+    Les âges des enfants sont séparés par des points-virgules : "3;8".
+    """
+    rows = []
+    for line in csv.DictReader(io.StringIO(text)):
+        row = {key.strip(): (value or "").strip() for key, value in line.items() if key}
+        children = row.get("children", "")
+        row["children"] = [int(age) for age in children.replace(",", ";").split(";") if age.strip()]
+        row["adults"] = int(row["adults"]) if row.get("adults") else 0
+        for flag in ("is_single", "has_pool_view"):
+            row[flag] = row.get(flag, "").lower() in BULK_TRUE_VALUES
+        rows.append(row)
+    return rows
+
+async def read_bulk_payload(request: Request) -> List[dict]:
+    """Réservations du corps de la requête : JSON (liste ou {"bookings": [...]}) ou CSV"""
+    content_type = request.headers.get("content-type", "")
+    body = await request.body()
+    try:
+        if "csv" in content_type or "text/plain" in content_type:
+            return parse_bulk_csv(body.decode("utf-8-sig"))
+        payload = json.loads(body)
+    except (UnicodeDecodeError, ValueError, KeyError) as e:
+        raise HTTPException(status_code=400, detail=f"Fichier illisible: {str(e)}")
+
+    rows = payload.get("bookings") if isinstance(payload, dict) else payload
+    if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        raise HTTPException(status_code=400, detail="Liste de réservations requise")
+    return rows
+
+@router.post("/admin/bookings/bulk")
+async def bulk_create_bookings(
+    request: Request,
+    all_or_nothing: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_admin: AdminPrincipal = Depends(get_current_admin)
 ):
-    """Récupère toutes les réservations"""
-    bookings = db.query(Booking).order_by(Booking.created_at.desc()).all()
-    return {"count": len(bookings), "bookings": bookings}
+    """
+    Import groupé d'un allotement tour-opérateur (JSON ou CSV).
+    Tous les prix sont calculés en une passe, l'inventaire est vérifié pour tout le lot
+    et les réservations acceptées sont insérées par un seul executemany, dans une transaction.
+    Avec all_or_nothing=true, une seule ligne refusée annule tout le lot.
+    """
+    started = time.perf_counter()
+    rows = await read_bulk_payload(request)
+    if not rows:
+        raise HTTPException(status_code=400, detail="Aucune réservation à importer")
+    if len(rows) > settings.BULK_BOOKING_MAX_ROWS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Maximum {settings.BULK_BOOKING_MAX_ROWS} réservations par import"
+        )
+
+    snapshot = await catalog.get(db)
+    if not snapshot.pricing_config:
+        raise HTTPException(status_code=500, detail="Configuration des prix manquante")
+
+    # Le type de chambre peut être donné par son id ou par son nom
+    for row in rows:
+        if not row.get("room_type_id") and row.get("room_type"):
+            room = snapshot.get_room_by_name(row["room_type"])
+            row["room_type_id"] = room.id if room else row["room_type"]
+
+    try:
+        quotes = PricingService.calculate_batch_prices(
+            snapshot.rooms, rows, snapshot.pricing_config, snapshot.rates
+        )
+    except (TypeError, ValueError, AttributeError) as e:
+        raise HTTPException(status_code=400, detail=f"Réservations invalides: {str(e)}")
+
+    results = []
+    candidates = []
+    created_at = datetime.utcnow()
+    for index, (row, quote) in enumerate(zip(rows, quotes)):
+        missing = [field for field in ("guest_name", "guest_email", "guest_phone") if not row.get(field)]
+        if "error" in quote or missing:
+            error = quote.get("error") or f"Champ manquant: {missing[0]}"
+            results.append({"index": index, "status": "rejected", "error": error})
+            continue
+
+        room = snapshot.get_room(row["room_type_id"])
+        check_in = datetime.strptime(row["check_in"], "%Y-%m-%d").date()
+        check_out = datetime.strptime(row["check_out"], "%Y-%m-%d").date()
+        candidates.append((index, room, {
+            "id": str(uuid.uuid4()),
+            "guest_name": row["guest_name"],
+            "guest_email": row["guest_email"],
+            "guest_phone": row["guest_phone"],
+            "check_in": check_in,
+            "check_out": check_out,
+            "room_type": room.name,
+            "guests": row["adults"] + len(row.get("children", [])),
+            "total_price": quote["price_breakdown"]["total"],
+            "status": "pending",
+            "special_requests": row.get("special_requests") or None,
+            "created_at": created_at
+        }))
+        results.append(None)
+
+    rejected_early = any(result is not None for result in results)
+
+    async def write_bulk(writer_db: AsyncSession) -> List[Optional[str]]:
+        if not candidates or (all_or_nothing and rejected_early):
+            return [None] * len(candidates)
+        errors = await writer_db.run_sync(
+            InventoryService.reserve_many,
+            [(room.name, room.available_rooms, values["check_in"], values["check_out"])
+             for _, room, values in candidates],
+            all_or_nothing
+        )
+        if all_or_nothing and any(errors):
+            return errors
+
+        accepted = [values for (_, _, values), error in zip(candidates, errors) if error is None]
+        if accepted:
+            await writer_db.execute(insert(Booking), accepted)
+
+            # Agrégats analytics : une mise à jour par (mois, type de chambre)
+            totals = {}
+            for values in accepted:
+                key = (rollup_month(values["created_at"]), values["room_type"])
+                count, revenue = totals.get(key, (0, 0.0))
+                totals[key] = (count + 1, revenue + values["total_price"])
+            for (month, room_type), (count, revenue) in totals.items():
+                await writer_db.run_sync(RollupService.add, month, room_type, "pending", count, revenue)
+
+            await booking_events.record(writer_db, "bookings.imported", {
+                "count": len(accepted),
+                "booking_ids": [values["id"] for values in accepted],
+                "imported_by": current_admin.username
+            })
+        return errors
+
+    # Une seule écriture dans la file : le lot entier est validé ou annulé ensemble
+    inventory_errors = await booking_writer.submit(write_bulk)
+    batch_refused = all_or_nothing and (rejected_early or any(inventory_errors))
+
+    created = 0
+    for (index, _, values), error in zip(candidates, inventory_errors):
+        if error:
+            results[index] = {"index": index, "status": "rejected", "error": error}
+        elif batch_refused:
+            results[index] = {"index": index, "status": "skipped", "error": "Lot annulé (all_or_nothing)"}
+        else:
+            created += 1
+            results[index] = {
+                "index": index,
+                "status": "created",
+                "booking_id": values["id"],
+                "total_price": values["total_price"]
+            }
+    if created:
+        booking_events.notify()
+
+    elapsed = time.perf_counter() - started
+    return {
+        "message": f"{created} réservation(s) importée(s) sur {len(rows)}",
+        "received": len(rows),
+        "created": created,
+        "rejected": len(rows) - created,
+        "elapsed_ms": round(elapsed * 1000, 2),
+        "rows_per_second": round(len(rows) / elapsed, 1) if elapsed else None,
+        "results": results
+    }
+
 @router.get("/admin/analytics/advanced")
 async def get_advanced_analytics(
-    db: Session = Depends(get_db),
-    current_admin: AdminUser = Depends(get_current_admin)
+    db: AsyncSession = Depends(get_async_db),
+    current_admin: AdminPrincipal = Depends(get_current_admin)
 ):
     """Analytics avancées pour le dashboard AI"""
     try:
-        bookings = db.query(Booking).all()
+        # Lecture des agrégats précalculés (mis à jour à chaque écriture)
+        summary = RollupService.summarize(await db.run_sync(RollupService.get_rows))
+        total_bookings = summary["total_bookings"]
         
-        if not bookings:
+        if not total_bookings:
             return {
                 "message": "Pas assez de données pour l'analyse",
                 "total_bookings": 0,
                 "analysis_timestamp": datetime.utcnow().isoformat()
             }
         
-        # Tendances mensuelles
-        monthly_trends = {}
-        for booking in bookings:
-            month = booking.created_at.strftime("%Y-%m")
-            monthly_trends[month] = monthly_trends.get(month, 0) + 1
-        
-        # Performance des chambres
-        room_performance = {}
-        for booking in bookings:
-            if booking.room_type not in room_performance:
-                room_performance[booking.room_type] = {
-                    "total_revenue": 0,
-                    "booking_count": 0,
-                    "average_rate": 0
-                }
-            room_performance[booking.room_type]["total_revenue"] += booking.total_price
-            room_performance[booking.room_type]["booking_count"] += 1
-        
-        # Calcul des taux moyens
-        for room_type, data in room_performance.items():
-            data["average_rate"] = round(data["total_revenue"] / data["booking_count"], 2) if data["booking_count"] > 0 else 0
-        
-        # Statistiques avancées
-        total_revenue = sum(booking.total_price for booking in bookings)
-        confirmed_bookings = [b for b in bookings if b.status in ['confirmed', 'checked-in']]
-        occupancy_rate = round((len(confirmed_bookings) / len(bookings)) * 100, 2) if bookings else 0
+        monthly_trends = summary["monthly_trends"]
+        room_performance = summary["room_performance"]
+        confirmed_bookings = summary["confirmed_bookings"]
+        occupancy_rate = round((confirmed_bookings / total_bookings) * 100, 2)
         
         # Chambre la plus populaire
         popular_room = max(room_performance.items(), key=lambda x: x[1]["booking_count"])[0] if room_performance else "N/A"
         
+        # Occupation réelle (nuits vendues / nuits disponibles) des 30 derniers jours
+        today = date.today()
+        capacities = {room.name: room.available_rooms for room in (await catalog.get(db)).rooms.values()}
+        recent = await db.run_sync(OccupancyService.occupancy, today - timedelta(days=30), today, capacities)
+        
         return {
             "monthly_trends": monthly_trends,
             "room_performance": room_performance,
             "advanced_metrics": {
-                "total_revenue": round(total_revenue, 2),
+                "total_revenue": round(summary["total_revenue"], 2),
                 "occupancy_rate": occupancy_rate,
+                "occupancy_rate_30d": recent["summary"]["occupancy_rate"],
                 "popular_room": popular_room,
-                "total_bookings": len(bookings),
-                "confirmed_bookings": len(confirmed_bookings)
+                "total_bookings": total_bookings,
+                "confirmed_bookings": confirmed_bookings
             },
             "analysis_timestamp": datetime.utcnow().isoformat()
         }
@@ -305,25 +1031,89 @@ async def get_advanced_analytics(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur lors de l'analyse: {str(e)}")
 
+@router.get("/admin/analytics/occupancy")
+async def get_occupancy(
+    from_date: date = Query(..., alias="from"),
+    to_date: date = Query(..., alias="to"),
+    room_type: Optional[str] = None,
+    include_pending: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_admin: AdminPrincipal = Depends(get_current_admin)
+):
+    """
+    Occupation réelle nuit par nuit sur [from, to) : chambres vendues / chambres disponibles,
+    chiffre d'affaires, ADR (revenu par chambre vendue) et RevPAR (revenu par chambre disponible).
+    Le revenu d'un séjour (total_price, taxe de séjour incluse) est réparti sur ses nuits.
+    """
+    days = (to_date - from_date).days
+    if days <= 0:
+        raise HTTPException(status_code=400, detail="La date de fin doit être après la date de début")
+    if days > settings.OCCUPANCY_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"Période limitée à {settings.OCCUPANCY_MAX_DAYS} jours")
+    
+    capacities = {room.name: room.available_rooms for room in (await catalog.get(db)).rooms.values()}
+    if room_type:
+        if room_type not in capacities:
+            raise HTTPException(status_code=404, detail="Type de chambre non trouvé")
+        capacities = {room_type: capacities[room_type]}
+    
+    statuses = OCCUPIED_STATUSES + (["pending"] if include_pending else [])
+    started = time.perf_counter()
+    result = await db.run_sync(OccupancyService.occupancy, from_date, to_date, capacities, statuses)
+    
+    return {
+        "from": from_date.isoformat(),
+        "to": to_date.isoformat(),
+        "statuses": statuses,
+        **result,
+        "computed_in_ms": round((time.perf_counter() - started) * 1000, 2)
+    }
+
 @router.put("/admin/bookings/{booking_id}/status")
 async def update_booking_status(
     booking_id: str,
     status_data: dict,
-    db: Session = Depends(get_db),
-    current_admin: AdminUser = Depends(get_current_admin)
+    db: AsyncSession = Depends(get_async_db),
+    current_admin: AdminPrincipal = Depends(get_current_admin)
 ):
     """Met à jour le statut d'une réservation"""
-    booking = db.query(Booking).filter(Booking.id == booking_id).first()
-    if not booking:
-        raise HTTPException(status_code=404, detail="Réservation non trouvée")
-    
     new_status = status_data.get("status")
     if new_status not in ["pending", "confirmed", "cancelled", "checked-in", "checked-out"]:
         raise HTTPException(status_code=400, detail="Statut invalide")
     
-    booking.status = new_status
-    db.commit()
-    db.refresh(booking)
+    snapshot = await catalog.get(db)
+    
+    async def write_status(writer_db: AsyncSession):
+        booking = await writer_db.get(Booking, booking_id)
+        if not booking:
+            raise HTTPException(status_code=404, detail="Réservation non trouvée")
+        old_status = booking.status or "pending"
+        
+        room = snapshot.get_room_by_name(booking.room_type) or \
+            await writer_db.scalar(select(RoomType).where(RoomType.name == booking.room_type))
+        capacity = room.available_rooms if room else 0
+        
+        await writer_db.run_sync(
+            InventoryService.apply_status_change, booking, booking.status, new_status, capacity
+        )
+        await writer_db.run_sync(RollupService.status_changed, booking, booking.status, new_status)
+        booking.status = new_status
+        if old_status != new_status:
+            await booking_events.record(writer_db, "booking.status_changed", {
+                "booking_id": booking.id,
+                "room_type": booking.room_type,
+                "old_status": old_status,
+                "new_status": new_status,
+                "changed_by": current_admin.username
+            })
+        return booking, old_status
+    
+    try:
+        booking, old_status = await booking_writer.submit(write_status)
+    except OverbookingError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if old_status != new_status:
+        booking_events.notify()
     
     return {
         "message": f"Statut de la réservation mis à jour vers '{new_status}'",
@@ -335,20 +1125,23 @@ async def update_booking_status(
 async def update_room_price(
     room_id: str, 
     price_data: dict,
-    db: Session = Depends(get_db),
-    current_admin: AdminUser = Depends(get_current_admin)
+    db: AsyncSession = Depends(get_async_db),
+    current_admin: AdminPrincipal = Depends(get_current_admin)
 ):
     """Modifie le prix d'une chambre"""
-    room = db.query(RoomType).filter(RoomType.id == room_id).first()
-    if not room:
-        raise HTTPException(status_code=404, detail="Chambre non trouvée")
-    
     new_price = price_data.get("new_price")
     if not new_price or new_price <= 0:
         raise HTTPException(status_code=400, detail="Prix invalide")
     
-    room.price_per_night = new_price
-    db.commit()
+    async def write_price(writer_db: AsyncSession):
+        room = await writer_db.get(RoomType, room_id)
+        if not room:
+            raise HTTPException(status_code=404, detail="Chambre non trouvée")
+        room.price_per_night = new_price
+        return room
+    
+    room = await booking_writer.submit(write_price)
+    await refresh_catalog(db)
     
     return {
         "message": "Prix mis à jour avec succès",
@@ -360,47 +1153,172 @@ async def update_room_price(
 @router.put("/admin/pricing-config")
 async def update_pricing_config(
     config_data: dict, 
-    db: Session = Depends(get_db),
-    current_admin: AdminUser = Depends(get_current_admin)
+    db: AsyncSession = Depends(get_async_db),
+    current_admin: AdminPrincipal = Depends(get_current_admin)
 ):
     """Modifie la configuration des prix"""
-    pricing_config = db.query(PricingConfig).first() or PricingConfig()
-    if not db.query(PricingConfig).first():
-        db.add(pricing_config)
-    
-    updated_fields = []
-    for key, value in config_data.items():
-        if hasattr(pricing_config, key) and value is not None:
-            setattr(pricing_config, key, value)
-            updated_fields.append(key)
+    async def write_config(writer_db: AsyncSession):
+        pricing_config = await writer_db.scalar(select(PricingConfig))
+        if not pricing_config:
+            pricing_config = PricingConfig()
+            writer_db.add(pricing_config)
+        
+        updated_fields = []
+        for key, value in config_data.items():
+            if hasattr(pricing_config, key) and value is not None:
+                setattr(pricing_config, key, value)
+                updated_fields.append(key)
+        return updated_fields
     
-    db.commit()
+    updated_fields = await booking_writer.submit(write_config)
+    await refresh_catalog(db)
     
     return {
         "message": "Configuration des prix mise à jour",
         "updated_fields": updated_fields
     }
 
+async def refresh_catalog(db: AsyncSession, rate_changes: Optional[List[RateChange]] = None):
+    """
+    Recharge le catalogue après un commit du writer. La transaction de lecture de la requête
+    (ouverte par l'authentification) est d'abord close pour que le rechargement voie ce commit.
+    """
+    await db.rollback()
+    return await catalog.refresh(db, rate_changes=rate_changes)
+
+RATE_PLAN_FIELDS = ("room_type_id", "name", "start_date", "end_date", "price_per_night", "weekend_uplift", "min_stay", "priority", "is_active")
+
+async def apply_rate_plan_data(plan: RatePlan, plan_data: dict, db: AsyncSession):
+    """Valide les champs reçus et les copie dans le plan (création ou modification)"""
+    values = {key: plan_data[key] for key in RATE_PLAN_FIELDS if key in plan_data}
+    try:
+        for key in ("start_date", "end_date"):
+            if key in values:
+                values[key] = date.fromisoformat(values[key])
+        for key, cast in (("price_per_night", float), ("weekend_uplift", float), ("min_stay", int), ("priority", int)):
+            if values.get(key) is not None:
+                values[key] = cast(values[key])
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Plan tarifaire invalide (dates YYYY-MM-DD, nombres)")
+    if "priority" in values:
+        values["priority"] = values["priority"] or 0
+    for key, value in values.items():
+        setattr(plan, key, value)
+    
+    if not plan.name or not plan.start_date or not plan.end_date:
+        raise HTTPException(status_code=400, detail="name, start_date et end_date requis")
+    if plan.end_date < plan.start_date:
+        raise HTTPException(status_code=400, detail="La date de fin doit être après la date de début")
+    if plan.price_per_night is not None and plan.price_per_night <= 0:
+        raise HTTPException(status_code=400, detail="Prix invalide")
+    if plan.weekend_uplift is not None and plan.weekend_uplift <= -1:
+        raise HTTPException(status_code=400, detail="Majoration week-end invalide")
+    if plan.min_stay is not None and plan.min_stay < 1:
+        raise HTTPException(status_code=400, detail="Séjour minimum invalide")
+    if plan.room_type_id and not await db.get(RoomType, plan.room_type_id):
+        raise HTTPException(status_code=404, detail="Type de chambre non trouvé")
+
+@router.get("/admin/rate-plans")
+async def get_rate_plans(
+    db: AsyncSession = Depends(get_async_db),
+    current_admin: AdminPrincipal = Depends(get_current_admin)
+):
+    """Plans tarifaires actifs, tels qu'utilisés par le calcul des prix"""
+    snapshot = await catalog.get(db)
+    plans = sorted(snapshot.rate_plans, key=lambda plan: (plan.start_date, -plan.priority))
+    return {"count": len(plans), "rate_plans": [plan.to_payload() for plan in plans]}
+
+@router.post("/admin/rate-plans")
+async def create_rate_plan(
+    plan_data: dict,
+    db: AsyncSession = Depends(get_async_db),
+    current_admin: AdminPrincipal = Depends(get_current_admin)
+):
+    """Crée un plan tarifaire (prix saisonnier, majoration week-end, séjour minimum)"""
+    async def write_plan(writer_db: AsyncSession):
+        plan = RatePlan(priority=0, is_active=True)
+        await apply_rate_plan_data(plan, plan_data, writer_db)
+        writer_db.add(plan)
+        await writer_db.flush()
+        return plan
+    
+    plan = await booking_writer.submit(write_plan)
+    await refresh_catalog(db, rate_changes=[RateChange.from_plan(plan)])
+    
+    return {"message": "Plan tarifaire créé", "rate_plan": CachedRatePlan.from_model(plan).to_payload()}
+
+@router.put("/admin/rate-plans/{plan_id}")
+async def update_rate_plan(
+    plan_id: str,
+    plan_data: dict,
+    db: AsyncSession = Depends(get_async_db),
+    current_admin: AdminPrincipal = Depends(get_current_admin)
+):
+    """Modifie un plan tarifaire ; seules ses anciennes et nouvelles périodes sont recompilées"""
+    async def write_plan(writer_db: AsyncSession):
+        plan = await writer_db.get(RatePlan, plan_id)
+        if not plan:
+            raise HTTPException(status_code=404, detail="Plan tarifaire non trouvé")
+        previous = RateChange.from_plan(plan)
+        await apply_rate_plan_data(plan, plan_data, writer_db)
+        return plan, previous
+    
+    plan, previous = await booking_writer.submit(write_plan)
+    await refresh_catalog(db, rate_changes=[previous, RateChange.from_plan(plan)])
+    
+    return {"message": "Plan tarifaire mis à jour", "rate_plan": CachedRatePlan.from_model(plan).to_payload()}
+
+@router.delete("/admin/rate-plans/{plan_id}")
+async def delete_rate_plan(
+    plan_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_admin: AdminPrincipal = Depends(get_current_admin)
+):
+    """Supprime un plan tarifaire"""
+    async def delete_plan(writer_db: AsyncSession):
+        plan = await writer_db.get(RatePlan, plan_id)
+        if not plan:
+            raise HTTPException(status_code=404, detail="Plan tarifaire non trouvé")
+        change = RateChange.from_plan(plan)
+        await writer_db.delete(plan)
+        return change
+    
+    change = await booking_writer.submit(delete_plan)
+    await refresh_catalog(db, rate_changes=[change])
+    
+    return {"message": "Plan tarifaire supprimé", "rate_plan_id": plan_id}
+
+def build_dashboard_query(current_month: str):
+    """Une seule requête d'agrégats conditionnels sur les rollups (statut et mois)"""
+    count = BookingRollup.booking_count
+    return select(
+        func.coalesce(func.sum(count), 0),
+        func.coalesce(func.sum(BookingRollup.revenue), 0),
+        func.coalesce(func.sum(case((BookingRollup.month == current_month, BookingRollup.revenue), else_=0)), 0),
+        func.coalesce(func.sum(case((BookingRollup.status == "pending", count), else_=0)), 0),
+        func.coalesce(func.sum(case((BookingRollup.status == "confirmed", count), else_=0)), 0)
+    )
+
 @router.get("/admin/dashboard")
 async def get_dashboard(
-    db: Session = Depends(get_db),
-    current_admin: AdminUser = Depends(get_current_admin)
+    db: AsyncSession = Depends(get_async_db),
+    current_admin: AdminPrincipal = Depends(get_current_admin)
 ):
-    """Dashboard admin avec statistiques"""
-    total_bookings = db.query(Booking).count()
-    total_revenue = db.query(func.sum(Booking.total_price)).scalar() or 0
-    pending_bookings = db.query(Booking).filter(Booking.status == "pending").count()
-    confirmed_bookings = db.query(Booking).filter(Booking.status == "confirmed").count()
-    
-    # Revenu du mois en cours
-    current_month = datetime.utcnow().month
-    current_year = datetime.utcnow().year
-    monthly_revenue = db.query(func.sum(Booking.total_price)).filter(
-        func.extract('month', Booking.created_at) == current_month,
-        func.extract('year', Booking.created_at) == current_year
-    ).scalar() or 0
+    """
+    Dashboard admin avec statistiques. Le cache est indexé par le dernier numéro du journal
+    booking_events, écrit dans la même transaction que les agrégats : une réservation faite
+    sur un autre worker est visible dès la requête suivante. Seules les modifications hors
+    API (manage.py rebuild-rollups) attendent l'expiration, DASHBOARD_CACHE_TTL_SECONDS au plus.
+    """
+    version = await booking_events.latest_seq(db)
+    dashboard = dashboard_cache.get(("overview", version))
+    if dashboard is not None:
+        return dashboard
     
-    return {
+    overview = (await db.execute(build_dashboard_query(datetime.utcnow().strftime("%Y-%m")))).one()
+    total_bookings, total_revenue, monthly_revenue, pending_bookings, confirmed_bookings = overview
+    
+    dashboard = {
         "overview": {
             "total_bookings": total_bookings,
             "total_revenue": round(total_revenue, 2),
@@ -410,54 +1328,181 @@ async def get_dashboard(
         },
         "timestamp": datetime.utcnow().isoformat()
     }
+    dashboard_cache.set(("overview", version), dashboard)
+    return dashboard
+
+@router.post("/admin/events/ticket")
+async def create_booking_events_ticket(current_admin: AdminPrincipal = Depends(get_current_admin)):
+    """
+    Ticket d'ouverture du flux SSE. EventSource ne pouvant pas envoyer d'en-tête Authorization,
+    le client passe ce ticket en query string plutôt que son token : il expire après
+    EVENTS_TICKET_TTL_SECONDS secondes et n'ouvre qu'une connexion.
+    """
+    return {
+        "ticket": create_events_ticket(current_admin.username),
+        "expires_in": settings.EVENTS_TICKET_TTL_SECONDS
+    }
+
+@router.get("/admin/events")
+async def stream_booking_events(
+    request: Request,
+    ticket: Optional[str] = None,
+    last_event_id: Optional[str] = None
+):
+    """
+    Flux SSE des changements de réservation (booking.created, booking.status_changed,
+    bookings.imported). Authentification par en-tête Authorization (token admin) ou par
+    ?ticket= obtenu sur POST /admin/events/ticket ; le ticket étant à usage unique, le client
+    en redemande un avant chaque reconnexion et passe son dernier identifiant en ?last_event_id=.
+    À la reconnexion, les événements manqués sont rejoués depuis Last-Event-ID ; s'ils
+    ne sont plus dans le tampon, un événement "reset" demande un rechargement complet.
+    Les identifiants sont les numéros du journal booking_events, communs à tous les workers :
+    le client peut se reconnecter sur n'importe lequel.
+    """
+    authorization = request.headers.get("authorization", "")
+    # Session courte : le flux ne doit pas garder une connexion (et sa transaction) ouverte
+    if authorization.lower().startswith("bearer "):
+        async with AsyncSessionLocal() as db:
+            await authenticate_admin_token(authorization[7:], db)
+    elif ticket:
+        username = consume_events_ticket(ticket)
+        async with AsyncSessionLocal() as db:
+            admin = await db.scalar(select(AdminUser).where(AdminUser.username == username))
+        if not admin or not admin.is_active:
+            raise HTTPException(status_code=401, detail="Admin non trouvé ou inactif")
+    else:
+        raise HTTPException(status_code=401, detail="Token ou ticket requis")
+    
+    resume_from = request.headers.get("last-event-id") or last_event_id
+    cursor = booking_events.parse_event_id(resume_from)
+    await booking_events.ensure_polling()
+    
+    async def event_stream():
+        position = cursor
+        yield "retry: 3000\n\n"
+        if position is None:
+            position = booking_events.last_seq()
+            if resume_from:
+                # Identifiant qui n'est pas un numéro du journal : repartir d'ici
+                reset_id = str(position) if position else None
+                yield format_sse(reset_id, "reset", json.dumps({"reason": "Last-Event-ID inconnu"}, ensure_ascii=False))
+        
+        while True:
+            # Récupérer le signal avant de lire le tampon pour ne rien manquer entre les deux
+            changed = booking_events.changed
+            events, missed = booking_events.since(position)
+            if missed:
+                yield format_sse(None, "reset", json.dumps({"reason": "Événements sortis du tampon"}, ensure_ascii=False))
+            for position, message in events:
+                yield message
+            if events:
+                continue
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=settings.EVENTS_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+
+@router.get("/admin/cache/stats")
+async def get_cache_stats(current_admin: AdminPrincipal = Depends(get_current_admin)):
+    """Statistiques des caches en mémoire (hits / misses)"""
+    return {
+        "catalog": catalog.stats(),
+        "dashboard": dashboard_cache.stats(),
+        "price_calendar": price_calendar_cache.stats(),
+        "events": booking_events.stats(),
+        "admin_tokens": admin_token_cache.stats()
+    }
+
+@router.put("/admin/users/{admin_id}/status")
+async def update_admin_status(
+    admin_id: str,
+    status_data: dict,
+    db: AsyncSession = Depends(get_async_db),
+    current_admin: AdminPrincipal = Depends(get_current_admin)
+):
+    """Active ou désactive un compte admin"""
+    if current_admin.role != "admin":
+        raise HTTPException(status_code=403, detail="Action réservée aux administrateurs")
+    
+    is_active = status_data.get("is_active")
+    if not isinstance(is_active, bool):
+        raise HTTPException(status_code=400, detail="is_active (booléen) requis")
+    
+    if admin_id == current_admin.id and not is_active:
+        raise HTTPException(status_code=400, detail="Impossible de désactiver son propre compte")
+    
+    async def write_admin_status(writer_db: AsyncSession):
+        admin = await writer_db.get(AdminUser, admin_id)
+        if not admin:
+            raise HTTPException(status_code=404, detail="Admin non trouvé")
+        admin.is_active = is_active
+        return admin
+    
+    admin = await booking_writer.submit(write_admin_status)
+    invalidate_admin_tokens(admin.username)
+    
+    return {
+        "message": "Statut de l'admin mis à jour",
+        "admin_id": admin.id,
+        "is_active": admin.is_active
+    }
 
 # ==================== INITIALISATION ====================
 
 @router.post("/setup")
-async def setup_database(db: Session = Depends(get_db)):
+async def setup_database(db: AsyncSession = Depends(get_async_db)):
     """Initialise la base de données"""
-    if db.query(AdminUser).first():
-        return {"message": "Base de données déjà initialisée"}
+    async def write_setup(writer_db: AsyncSession) -> bool:
+        if await writer_db.scalar(select(AdminUser)):
+            return False
+        
+        # Admin
+        admin = AdminUser(
+            username=settings.ADMIN_USERNAME,
+            email=settings.ADMIN_EMAIL, 
+            hashed_password=get_password_hash(settings.ADMIN_PASSWORD),
+            role="admin"
+        )
+        writer_db.add(admin)
+        
+        # Configuration prix
+        pricing_config = PricingConfig(
+            single_supplement=settings.SINGLE_SUPPLEMENT,
+            pool_view_supplement=settings.POOL_VIEW_SUPPLEMENT,
+            child_discount_2_4=settings.CHILD_DISCOUNT_2_4,
+            child_discount_4_12=settings.CHILD_DISCOUNT_4_12,
+            tax_per_night=settings.TAX_PER_NIGHT
+        )
+        writer_db.add(pricing_config)
+        
+        # Chambres
+        rooms = [
+            RoomType(
+                name="Double Standard Vue Jardin", 
+                description="Chambre confortable avec vue sur le jardin", 
+                price_per_night=120.0, 
+                available_rooms=10,
+                amenities=["WiFi", "AC", "TV", "Coffre-fort"]
+            ),
+            RoomType(
+                name="Double Supérieure Vue Piscine", 
+                description="Chambre spacieuse avec vue directe sur la piscine", 
+                price_per_night=150.0, 
+                available_rooms=5,
+                amenities=["WiFi", "AC", "TV", "Coffre-fort", "Mini-bar", "Terrasse"]
+            ),
+        ]
+        writer_db.add_all(rooms)
+        return True
     
-    # Admin
-    admin = AdminUser(
-        username=settings.ADMIN_USERNAME,
-        email=settings.ADMIN_EMAIL, 
-        hashed_password=get_password_hash(settings.ADMIN_PASSWORD),
-        role="admin"
-    )
-    db.add(admin)
-    
-    # Configuration prix
-    pricing_config = PricingConfig(
-        single_supplement=settings.SINGLE_SUPPLEMENT,
-        pool_view_supplement=settings.POOL_VIEW_SUPPLEMENT,
-        child_discount_2_4=settings.CHILD_DISCOUNT_2_4,
-        child_discount_4_12=settings.CHILD_DISCOUNT_4_12,
-        tax_per_night=settings.TAX_PER_NIGHT
-    )
-    db.add(pricing_config)
-    
-    # Chambres
-    rooms = [
-        RoomType(
-            name="Double Standard Vue Jardin", 
-            description="Chambre confortable avec vue sur le jardin", 
-            price_per_night=120.0, 
-            available_rooms=10,
-            amenities=["WiFi", "AC", "TV", "Coffre-fort"]
-        ),
-        RoomType(
-            name="Double Supérieure Vue Piscine", 
-            description="Chambre spacieuse avec vue directe sur la piscine", 
-            price_per_night=150.0, 
-            available_rooms=5,
-            amenities=["WiFi", "AC", "TV", "Coffre-fort", "Mini-bar", "Terrasse"]
-        ),
-    ]
-    db.add_all(rooms)
-    
-    db.commit()
+    if not await booking_writer.submit(write_setup):
+        return {"message": "Base de données déjà initialisée"}
+    await refresh_catalog(db)
     
     return {
         "message": "Base de données initialisée avec succès",
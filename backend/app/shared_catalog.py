@@ -0,0 +1,123 @@
+from typing import Optional, Tuple
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+
+from sqlalchemy.engine import make_url
+
+try:
+    import fcntl
+except ImportError:  # Windows : un seul processus, pas de verrou inter-processus
+    fcntl = None
+
+# En-tête du fichier de données : magie, format, version du catalogue, taille du JSON, empreinte du JSON
+HEADER = struct.Struct("<4sIQQ32s")
+MAGIC = b"HCAT"
+FORMAT_VERSION = 2
+COUNTER = struct.Struct("<Q")
+
+
+def default_snapshot_path(database_url: str) -> Optional[str]:
+    """Fichier partagé à côté de la base SQLite (hotel.db -> hotel.db.catalog)"""
+    url = make_url(database_url)
+    if not url.drivername.startswith("sqlite") or url.database in (None, "", ":memory:"):
+        return None
+    return os.path.abspath(url.database) + ".catalog"
+
+
+class SharedCatalogStore:
+    """
+    Catalogue partagé entre les workers (uvicorn / gunicorn) via deux fichiers mappés en mémoire :
+    - <chemin>.version : compteur de version sur 8 octets, relu à chaque accès sans appel système ;
+    - <chemin> : le catalogue sérialisé, remplacé atomiquement (os.replace) à chaque publication.
+    Un worker ne relit le catalogue que lorsque le compteur a changé, et une publication
+    identique au catalogue déjà publié (même empreinte) ne change pas la version.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.version_path = path + ".version"
+        self._counter: Optional[mmap.mmap] = None
+        self._counter_fd: Optional[int] = None
+
+    def _open_counter(self) -> mmap.mmap:
+        if self._counter is None:
+            fd = os.open(self.version_path, os.O_RDWR | os.O_CREAT, 0o644)
+            if os.fstat(fd).st_size < COUNTER.size:
+                os.ftruncate(fd, COUNTER.size)
+            self._counter_fd = fd
+            self._counter = mmap.mmap(fd, COUNTER.size)
+        return self._counter
+
+    def version(self) -> int:
+        """Version publiée du catalogue (0 : rien n'a encore été publié)"""
+        return COUNTER.unpack_from(self._open_counter(), 0)[0]
+
+    def publish(self, payload: dict) -> int:
+        """
+        Écrit un nouveau catalogue et incrémente le compteur ; retourne la nouvelle version.
+        Si le catalogue publié a la même empreinte, rien n'est écrit et sa version est retournée.
+        """
+        body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        etag = hashlib.sha256(body).hexdigest()[:32].encode("ascii")
+        counter = self._open_counter()
+        if fcntl:
+            fcntl.flock(self._counter_fd, fcntl.LOCK_EX)
+        try:
+            current = COUNTER.unpack_from(counter, 0)[0]
+            if current and self._published_header() == (current, etag):
+                return current
+            version = current + 1
+
+            # Données complètes sur disque avant de publier la nouvelle version
+            directory = os.path.dirname(self.path) or "."
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".catalog-")
+            try:
+                with os.fdopen(fd, "wb") as handle:
+                    handle.write(HEADER.pack(MAGIC, FORMAT_VERSION, version, len(body), etag))
+                    handle.write(body)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+            COUNTER.pack_into(counter, 0, version)
+            counter.flush()
+            return version
+        finally:
+            if fcntl:
+                fcntl.flock(self._counter_fd, fcntl.LOCK_UN)
+
+    def _published_header(self) -> Optional[Tuple[int, bytes]]:
+        """(version, empreinte) du catalogue publié, sans lire son contenu"""
+        try:
+            with open(self.path, "rb") as handle:
+                magic, format_version, version, _, etag = HEADER.unpack(handle.read(HEADER.size))
+        except (OSError, struct.error):
+            return None
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            return None
+        return version, etag
+
+    def read(self) -> Optional[Tuple[int, dict]]:
+        """Catalogue publié (version, contenu), ou None s'il est absent ou illisible"""
+        try:
+            with open(self.path, "rb") as handle:
+                with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    magic, format_version, version, size, _ = HEADER.unpack_from(data, 0)
+                    if magic != MAGIC or format_version != FORMAT_VERSION:
+                        return None
+                    return version, json.loads(data[HEADER.size:HEADER.size + size])
+        except (OSError, ValueError, struct.error):
+            return None
+
+    def close(self):
+        if self._counter is not None:
+            self._counter.close()
+            os.close(self._counter_fd)
+            self._counter = None
+            self._counter_fd = None
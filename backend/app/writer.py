@@ -0,0 +1,115 @@
+import asyncio
+import contextvars
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import settings
+from .database import WriterSessionLocal
+
+# Une écriture : coroutine exécutée dans la session du writer, avant le commit commun
+WriteJob = Callable[[AsyncSession], Awaitable]
+
+
+class BookingWriter:
+    """
+    File d'écriture unique de l'API : réservations, mais aussi prix, plans tarifaires,
+    configuration, comptes admin et initialisation.
+    Les écritures en attente sont regroupées et validées par un seul commit (group commit) ;
+    chaque écriture tourne dans son propre SAVEPOINT pour qu'un échec n'annule pas les autres.
+    Sous SQLite, la transaction du lot prend le verrou d'écriture dès son début (BEGIN IMMEDIATE) :
+    une autre connexion qui valide pendant le lot attend, au lieu de faire échouer tout le lot.
+    Seules exceptions : le démarrage (tables, inventaire, agrégats), avant que l'API ne serve,
+    et les commandes de app.manage, lancées dans un autre processus ; celles-ci écrivent par
+    transactions courtes et attendent le verrou SQLite grâce au busy_timeout.
+    """
+
+    def __init__(self, max_batch: int, max_delay_ms: float):
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.batches = 0
+        self.jobs = 0
+
+    async def submit(self, job: WriteJob):
+        """Ajoute une écriture à la file et attend son commit"""
+        self._ensure_started()
+        future = self._loop.create_future()
+        await self._queue.put((job, future))
+        return await future
+
+    async def stop(self):
+        """Termine les écritures en cours puis arrête le writer"""
+        if self._task and not self._task.done():
+            await self._queue.join()
+            self._task.cancel()
+        self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "jobs": self.jobs,
+            "average_batch_size": round(self.jobs / self.batches, 2) if self.batches else 0
+        }
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            # Contexte vierge : la tâche de fond ne doit pas hériter de celui de la requête qui l'a démarrée
+            self._task = contextvars.Context().run(loop.create_task, self._run())
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+
+            # Regrouper les écritures qui arrivent pendant la fenêtre d'attente
+            deadline = self._loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                timeout = deadline - self._loop.time()
+                try:
+                    batch.append(self._queue.get_nowait() if timeout <= 0 else
+                                 await asyncio.wait_for(self._queue.get(), timeout))
+                except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                    break
+
+            try:
+                await self._write_batch(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _write_batch(self, batch: List[Tuple[WriteJob, asyncio.Future]]):
+        outcomes = []
+        try:
+            async with WriterSessionLocal() as db:
+                for job, future in batch:
+                    try:
+                        async with db.begin_nested():
+                            outcomes.append((future, await job(db), None))
+                    except Exception as e:
+                        outcomes.append((future, None, e))
+                await db.commit()
+        except Exception as e:
+            # Échec du commit commun : aucune écriture du lot n'est validée
+            outcomes = [(future, None, e) for _, future in batch]
+
+        self.batches += 1
+        self.jobs += len(batch)
+        for future, result, error in outcomes:
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+
+# Instance globale du writer
+booking_writer = BookingWriter(
+    max_batch=settings.BOOKING_WRITER_MAX_BATCH,
+    max_delay_ms=settings.BOOKING_WRITER_MAX_DELAY_MS
+)
@@ -0,0 +1,10 @@
+"""Statistiques communes aux benchmarks."""
+
+
+def percentile(values, pct):
+    """Percentile par rang le plus proche (0.0 pour une liste vide)"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
@@ -0,0 +1,238 @@
+"""
+Banc de charge hors ligne de l'API de réservation.
+
+Pilote l'application FastAPI en mémoire (transport ASGI, sans serveur ni réseau)
+contre une base SQLite jetable, rejoue un mélange pondéré de requêtes clients et
+admin, puis affiche le débit et les latences p50 / p95 / p99 par route. Les
+résultats sont enregistrés en JSON pour comparer les campagnes entre elles.
+
+Usage (depuis le dossier backend) :
+    python benchmarks/api_load_test.py --mix saison --concurrency 50 --duration 30
+    python benchmarks/api_load_test.py --mix admin --compare benchmarks/results/precedent.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+from _stats import percentile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(BACKEND_DIR, "benchmarks", "results")
+
+# Poids relatifs des scénarios dans chaque mélange
+MIXES = {
+    # Période creuse : surtout de la consultation
+    "navigation": {"rooms": 80, "booking": 5, "admin_list": 10, "dashboard": 5, "analytics": 0},
+    # Ouverture de saison : beaucoup de réservations, l'équipe suit le dashboard
+    "saison": {"rooms": 45, "booking": 30, "admin_list": 12, "dashboard": 10, "analytics": 3},
+    # Back-office : listes paginées et rapports
+    "admin": {"rooms": 10, "booking": 5, "admin_list": 45, "dashboard": 25, "analytics": 15},
+}
+
+
+def booking_payload(room_ids, horizon_days):
+    check_in = date.today() + timedelta(days=random.randint(1, horizon_days))
+    return {
+        "room_type_id": random.choice(room_ids),
+        "check_in": check_in.isoformat(),
+        "check_out": (check_in + timedelta(days=random.randint(1, 7))).isoformat(),
+        "adults": random.randint(1, 3),
+        "children": random.sample([3, 6, 10, 14], random.randint(0, 2)),
+        "guest_name": "Load",
+        "guest_email": "load@example.com",
+        "guest_phone": "+21600000000"
+    }
+
+
+def summarize(latencies, statuses, elapsed):
+    routes = {}
+    for name, values in sorted(latencies.items()):
+        routes[name] = {
+            "requests": len(values),
+            "throughput_rps": round(len(values) / elapsed, 2),
+            "p50_ms": round(percentile(values, 50) * 1000, 2),
+            "p95_ms": round(percentile(values, 95) * 1000, 2),
+            "p99_ms": round(percentile(values, 99) * 1000, 2),
+            "max_ms": round(max(values) * 1000, 2),
+            "status_codes": {str(code): count for code, count in sorted(statuses[name].items())}
+        }
+    return routes
+
+
+def print_report(result, previous=None):
+    print(f"Mélange: {result['mix']}  Concurrence: {result['concurrency']}  "
+          f"Durée: {result['elapsed_seconds']}s  Total: {result['total_throughput_rps']} req/s")
+    header = f"{'route':<30}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+    print(header + ("   Δp95 vs précédent" if previous else "") + "  codes")
+    for name, stats in result["routes"].items():
+        line = (f"{name:<30}{stats['throughput_rps']:>9.1f}{stats['p50_ms']:>9.1f}"
+                f"{stats['p95_ms']:>9.1f}{stats['p99_ms']:>9.1f}")
+        if previous:
+            before = previous["routes"].get(name)
+            if before and before["p95_ms"]:
+                delta = (stats["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100
+                line += f"{delta:>+18.1f}%  "
+            else:
+                line += f"{'-':>18}   "
+        codes = ", ".join(f"{code}: {count}" for code, count in stats["status_codes"].items())
+        print(f"{line}  {codes}")
+
+
+async def run(args):
+    import httpx
+
+    workdir = tempfile.mkdtemp(prefix="hotel-api-load-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'load.db')}"
+    sys.path.insert(0, BACKEND_DIR)
+    from app.main import app
+    from app.database import async_engine
+    from app.writer import booking_writer
+
+    random.seed(args.seed)
+    weights = MIXES[args.mix]
+    scenarios = [name for name, weight in weights.items() if weight > 0]
+    scenario_weights = [weights[name] for name in scenarios]
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://load", timeout=60) as client:
+        await client.post("/setup")
+        login = await client.post("/admin/login", json={
+            "username": os.getenv("ADMIN_USERNAME", "admin"),
+            "password": os.getenv("ADMIN_PASSWORD", "admin123")
+        })
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        room_ids = [room["id"] for room in (await client.get("/rooms")).json()["rooms"]]
+
+        # Historique initial pour que les listes et les rapports aient du contenu
+        for _ in range(args.seed_bookings):
+            await client.post("/bookings", json=booking_payload(room_ids, args.horizon_days))
+
+        latencies = defaultdict(list)
+        statuses = defaultdict(lambda: defaultdict(int))
+        statuses_lock = asyncio.Lock()
+
+        async def timed(name, send):
+            start = time.perf_counter()
+            response = await send()
+            latencies[name].append(time.perf_counter() - start)
+            async with statuses_lock:
+                statuses[name][response.status_code] += 1
+            return response
+
+        async def admin_list(cursor):
+            params = {"limit": random.choice([20, 50, 100])}
+            if cursor:
+                params["cursor"] = cursor
+            elif random.random() < 0.3:
+                params["status"] = random.choice(["pending", "confirmed", "cancelled"])
+            response = await timed("GET /admin/bookings", lambda: client.get(
+                "/admin/bookings", params=params, headers=headers
+            ))
+            # Un admin sur deux continue vers la page suivante
+            if response.status_code == 200 and random.random() < 0.5:
+                return response.json().get("next_cursor")
+            return None
+
+        async def virtual_user(deadline, budget):
+            cursor = None
+            while time.perf_counter() < deadline and budget():
+                if cursor:
+                    cursor = await admin_list(cursor)
+                    continue
+                scenario = random.choices(scenarios, scenario_weights)[0]
+                if scenario == "rooms":
+                    await timed("GET /rooms", lambda: client.get("/rooms"))
+                elif scenario == "booking":
+                    payload = booking_payload(room_ids, args.horizon_days)
+                    await timed("POST /bookings", lambda: client.post("/bookings", json=payload))
+                elif scenario == "admin_list":
+                    cursor = await admin_list(None)
+                elif scenario == "dashboard":
+                    await timed("GET /admin/dashboard", lambda: client.get("/admin/dashboard", headers=headers))
+                else:
+                    await timed("GET /admin/analytics/advanced", lambda: client.get(
+                        "/admin/analytics/advanced", headers=headers
+                    ))
+
+        remaining = [args.requests] if args.requests else None
+
+        def budget():
+            if remaining is None:
+                return True
+            remaining[0] -= 1
+            return remaining[0] >= 0
+
+        # Échauffement : caches et connexions chauds avant la mesure
+        await asyncio.gather(*(virtual_user(time.perf_counter() + args.warmup, lambda: True)
+                               for _ in range(args.concurrency)))
+        latencies.clear()
+        statuses.clear()
+
+        deadline = time.perf_counter() + (args.duration if not args.requests else float("inf"))
+        started = time.perf_counter()
+        await asyncio.gather(*(virtual_user(deadline, budget) for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+        await booking_writer.stop()
+
+    await async_engine.dispose()
+
+    total = sum(len(values) for values in latencies.values())
+    return {
+        "mix": args.mix,
+        "weights": weights,
+        "concurrency": args.concurrency,
+        "seed": args.seed,
+        "seed_bookings": args.seed_bookings,
+        "started_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "elapsed_seconds": round(elapsed, 2),
+        "total_requests": total,
+        "total_throughput_rps": round(total / elapsed, 2) if elapsed else 0,
+        "routes": summarize(latencies, statuses, elapsed),
+        "writer": booking_writer.stats()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mix", choices=sorted(MIXES), default="saison")
+    parser.add_argument("--concurrency", type=int, default=20, help="nombre d'utilisateurs virtuels")
+    parser.add_argument("--duration", type=float, default=15.0, help="durée de la mesure en secondes")
+    parser.add_argument("--requests", type=int, default=0, help="nombre fixe de requêtes (remplace --duration)")
+    parser.add_argument("--warmup", type=float, default=2.0, help="échauffement non mesuré en secondes")
+    parser.add_argument("--seed-bookings", type=int, default=500, help="réservations créées avant la mesure")
+    parser.add_argument("--horizon-days", type=int, default=365)
+    parser.add_argument("--seed", type=int, default=42, help="graine aléatoire du scénario")
+    parser.add_argument("--output", help="fichier JSON des résultats (défaut: benchmarks/results/)")
+    parser.add_argument("--compare", help="JSON d'une campagne précédente à comparer")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+
+    previous = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as handle:
+            previous = json.load(handle)
+    print_report(result, previous)
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"api-load-{args.mix}-{stamp}.json")
+    with open(output, "w", encoding="utf-8") as handle:
+        json.dump(result, handle, indent=2, ensure_ascii=False)
+    print(f"Résultats enregistrés dans {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Benchmark de concurrence : débit et latences (p50/p99) pendant des écritures SQLite lentes.
+
+Un thread externe verrouille régulièrement la base (BEGIN EXCLUSIVE) pour simuler
+une écriture lente. Avec une session synchrone dans un handler async, la boucle
+d'événements est bloquée pendant l'attente du verrou et toutes les requêtes
+(même /health) attendent ; avec la session asynchrone, seules les requêtes qui
+touchent la base attendent.
+
+Usage (depuis le dossier backend) :
+    python benchmarks/async_db_benchmark.py --concurrency 50 --duration 10
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+from _stats import percentile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def slow_writer(db_path, stop, hold_seconds, pause_seconds):
+    """Garde un verrou exclusif sur la base par intermittence"""
+    connection = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    while not stop.is_set():
+        connection.execute("BEGIN EXCLUSIVE")
+        time.sleep(hold_seconds)
+        connection.execute("COMMIT")
+        time.sleep(pause_seconds)
+    connection.close()
+
+
+async def run(args):
+    import httpx
+
+    workdir = tempfile.mkdtemp(prefix="hotel-bench-")
+    os.chdir(workdir)
+    sys.path.insert(0, BACKEND_DIR)
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.post("/setup")
+        login = await client.post("/admin/login", json={
+            "username": os.getenv("ADMIN_USERNAME", "admin"),
+            "password": os.getenv("ADMIN_PASSWORD", "admin123")
+        })
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        room_ids = [room["id"] for room in (await client.get("/rooms")).json()["rooms"]]
+
+        def booking_payload():
+            check_in = date.today() + timedelta(days=random.randint(30, 3000))
+            return {
+                "room_type_id": random.choice(room_ids),
+                "check_in": check_in.isoformat(),
+                "check_out": (check_in + timedelta(days=random.randint(1, 3))).isoformat(),
+                "adults": 2,
+                "children": [],
+                "guest_name": "Bench",
+                "guest_email": "bench@example.com",
+                "guest_phone": "+21600000000"
+            }
+
+        requests = [
+            ("POST /bookings", lambda: client.post("/bookings", json=booking_payload())),
+            ("GET /admin/dashboard", lambda: client.get("/admin/dashboard", headers=headers)),
+            ("GET /health", lambda: client.get("/health")),
+        ]
+
+        latencies = defaultdict(list)
+        errors = defaultdict(int)
+        deadline = time.perf_counter() + args.duration
+
+        async def worker():
+            while time.perf_counter() < deadline:
+                name, send = random.choice(requests)
+                start = time.perf_counter()
+                response = await send()
+                latencies[name].append(time.perf_counter() - start)
+                if response.status_code >= 500:
+                    errors[name] += 1
+
+        stop = threading.Event()
+        blocker = threading.Thread(
+            target=slow_writer,
+            args=(os.path.join(workdir, "hotel.db"), stop, args.hold_ms / 1000, args.pause_ms / 1000),
+            daemon=True
+        )
+        blocker.start()
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        blocker.join()
+
+    # Fermer les connexions aiosqlite pour que le processus puisse se terminer
+    from app import database
+    if hasattr(database, "async_engine"):
+        await database.async_engine.dispose()
+
+    total = sum(len(values) for values in latencies.values())
+    print(f"Concurrence: {args.concurrency}  Durée: {elapsed:.1f}s  Verrou: {args.hold_ms}ms / {args.pause_ms}ms")
+    print(f"{'route':<24}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'erreurs':>10}")
+    for name, values in sorted(latencies.items()):
+        print(f"{name:<24}{len(values) / elapsed:>10.1f}"
+              f"{percentile(values, 50) * 1000:>10.1f}{percentile(values, 99) * 1000:>10.1f}{errors[name]:>10}")
+    every = [value for values in latencies.values() for value in values]
+    print(f"{'TOTAL':<24}{total / elapsed:>10.1f}"
+          f"{percentile(every, 50) * 1000:>10.1f}{percentile(every, 99) * 1000:>10.1f}{sum(errors.values()):>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--hold-ms", type=int, default=50, help="durée de chaque verrou exclusif")
+    parser.add_argument("--pause-ms", type=int, default=150, help="pause entre deux verrous")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Test de charge des écritures : réservations par seconde soutenues avec lecteurs concurrents.
+
+Lance en parallèle des clients qui créent des réservations (POST /bookings), des
+admins qui changent des statuts et des lecteurs (/availability, /admin/dashboard)
+contre une base SQLite jetable, puis affiche le débit, les latences et la taille
+moyenne des lots validés par le writer.
+
+Usage (depuis le dossier backend) :
+    python benchmarks/booking_load_test.py --writers 40 --readers 10 --duration 10
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+from _stats import percentile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+async def run(args):
+    import httpx
+
+    os.chdir(tempfile.mkdtemp(prefix="hotel-load-"))
+    sys.path.insert(0, BACKEND_DIR)
+    from app.main import app
+    from app.database import async_engine
+    from app.writer import booking_writer
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://load") as client:
+        await client.post("/setup")
+        login = await client.post("/admin/login", json={
+            "username": os.getenv("ADMIN_USERNAME", "admin"),
+            "password": os.getenv("ADMIN_PASSWORD", "admin123")
+        })
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        room_ids = [room["id"] for room in (await client.get("/rooms")).json()["rooms"]]
+
+        latencies = defaultdict(list)
+        statuses = defaultdict(lambda: defaultdict(int))
+        booking_ids = []
+        deadline = time.perf_counter() + args.duration
+
+        async def timed(name, send):
+            start = time.perf_counter()
+            response = await send()
+            latencies[name].append(time.perf_counter() - start)
+            statuses[name][response.status_code] += 1
+            return response
+
+        async def booking_client():
+            while time.perf_counter() < deadline:
+                check_in = date.today() + timedelta(days=random.randint(1, args.horizon_days))
+                response = await timed("POST /bookings", lambda: client.post("/bookings", json={
+                    "room_type_id": random.choice(room_ids),
+                    "check_in": check_in.isoformat(),
+                    "check_out": (check_in + timedelta(days=random.randint(1, 5))).isoformat(),
+                    "adults": random.randint(1, 3),
+                    "children": random.sample([3, 6, 10, 14], random.randint(0, 2)),
+                    "guest_name": "Load",
+                    "guest_email": "load@example.com",
+                    "guest_phone": "+21600000000"
+                }))
+                if response.status_code == 200:
+                    booking_ids.append(response.json()["booking_id"])
+
+        async def admin_client():
+            while time.perf_counter() < deadline:
+                if not booking_ids:
+                    await asyncio.sleep(0.01)
+                    continue
+                booking_id = random.choice(booking_ids)
+                new_status = random.choice(["confirmed", "cancelled", "checked-in"])
+                await timed("PUT /admin/bookings/{id}/status", lambda: client.put(
+                    f"/admin/bookings/{booking_id}/status", json={"status": new_status}, headers=headers
+                ))
+
+        async def reader_client():
+            while time.perf_counter() < deadline:
+                start = date.today() + timedelta(days=random.randint(1, args.horizon_days))
+                if random.random() < 0.5:
+                    await timed("GET /availability", lambda: client.get("/availability", params={
+                        "from": start.isoformat(), "to": (start + timedelta(days=14)).isoformat()
+                    }))
+                else:
+                    await timed("GET /admin/dashboard", lambda: client.get("/admin/dashboard", headers=headers))
+
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(booking_client() for _ in range(args.writers)),
+            *(admin_client() for _ in range(args.admins)),
+            *(reader_client() for _ in range(args.readers))
+        )
+        elapsed = time.perf_counter() - started
+        await booking_writer.stop()
+
+    await async_engine.dispose()
+
+    created = statuses["POST /bookings"][200]
+    print(f"Clients: {args.writers} réservations, {args.admins} admins, {args.readers} lecteurs  Durée: {elapsed:.1f}s")
+    print(f"Réservations créées: {created}  ->  {created / elapsed:.1f} réservations/s")
+    print(f"Writer: {booking_writer.stats()}")
+    print(f"{'route':<34}{'req/s':>8}{'p50 ms':>9}{'p99 ms':>9}  codes")
+    for name, values in sorted(latencies.items()):
+        codes = ", ".join(f"{code}: {count}" for code, count in sorted(statuses[name].items()))
+        print(f"{name:<34}{len(values) / elapsed:>8.1f}"
+              f"{percentile(values, 50) * 1000:>9.1f}{percentile(values, 99) * 1000:>9.1f}  {codes}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, default=40)
+    parser.add_argument("--admins", type=int, default=2)
+    parser.add_argument("--readers", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--horizon-days", type=int, default=365)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
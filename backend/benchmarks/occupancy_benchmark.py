@@ -0,0 +1,126 @@
+"""
+Benchmark du calcul d'occupation (tableau de différences) sur dix ans de réservations.
+
+Génère des séjours synthétiques dans une base SQLite jetable, calcule l'occupation
+nuit par nuit et par type de chambre sur toute la période, affiche la durée de la
+lecture SQL et du calcul, puis vérifie le résultat contre un calcul naïf nuit par
+nuit sur un échantillon de la période.
+
+Usage (depuis le dossier backend) :
+    python benchmarks/occupancy_benchmark.py --rows 200000 --years 10
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import date, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DAY_FORMAT = "%Y-%m-%d 00:00:00.000000"
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+STATUSES = ["pending", "confirmed", "cancelled", "checked-in", "checked-out"]
+CAPACITIES = {
+    "Double Standard Vue Jardin": 120,
+    "Double Supérieure Vue Piscine": 80,
+    "Suite Familiale": 30,
+    "Single Économique": 40,
+}
+
+
+def seed_stays(connection, rows, start, days, chunk_size=50000):
+    statement = (
+        "INSERT INTO bookings (id, guest_name, guest_email, guest_phone, check_in, check_out, "
+        "room_type, guests, total_price, status, special_requests, created_at) "
+        "VALUES (?, 'Guest', 'guest@example.com', '+21600000000', ?, ?, ?, 2, ?, ?, NULL, ?)"
+    )
+    room_types = list(CAPACITIES)
+    for offset in range(0, rows, chunk_size):
+        batch = []
+        for _ in range(min(chunk_size, rows - offset)):
+            check_in = start + timedelta(days=random.randrange(days))
+            check_out = check_in + timedelta(days=random.randint(1, 14))
+            batch.append((
+                str(uuid.uuid4()), check_in.strftime(DAY_FORMAT), check_out.strftime(DAY_FORMAT),
+                random.choice(room_types), round(random.uniform(100, 3000), 2), random.choice(STATUSES),
+                (check_in - timedelta(days=30)).strftime(DATETIME_FORMAT)
+            ))
+        connection.exec_driver_sql(statement, batch)
+        connection.commit()
+
+
+def naive_occupancy(stays, day, start_jd):
+    """Référence : parcours de tous les séjours pour une seule nuit"""
+    night = start_jd + (day - START).days
+    sold = {name: 0 for name in CAPACITIES}
+    for room_type, check_in, check_out, _ in stays:
+        if check_in <= night < check_out:
+            sold[room_type] += 1
+    return sold
+
+
+START = date(2016, 1, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--checks", type=int, default=20, help="nuits vérifiées contre le calcul naïf")
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="hotel-occupancy-"), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    sys.path.insert(0, BACKEND_DIR)
+
+    from app.database import engine, SessionLocal
+    from app.models import Base
+    from app.occupancy import OccupancyService, OCCUPIED_STATUSES, date_to_julian
+
+    Base.metadata.create_all(bind=engine)
+    end = date(START.year + args.years, 1, 1)
+    days = (end - START).days
+    with engine.connect() as connection:
+        started = time.perf_counter()
+        seed_stays(connection, args.rows, START, days)
+        connection.exec_driver_sql("ANALYZE")
+        connection.commit()
+        print(f"{args.rows} séjours générés sur {args.years} ans en {time.perf_counter() - started:.1f}s")
+
+    with SessionLocal() as db:
+        timings = []
+        for _ in range(3):
+            started = time.perf_counter()
+            stays = OccupancyService.load_stays(db, START, end, OCCUPIED_STATUSES)
+            loaded = time.perf_counter()
+            result = OccupancyService.compute(stays, START, end, CAPACITIES)
+            timings.append((loaded - started, time.perf_counter() - loaded))
+
+    load_s, compute_s = min(timings, key=sum)
+    print(f"{len(stays)} séjours occupés, {days} nuits x {len(CAPACITIES)} types de chambre")
+    print(f"Lecture SQL: {load_s * 1000:.0f} ms   Calcul: {compute_s * 1000:.0f} ms   Total: {(load_s + compute_s) * 1000:.0f} ms")
+    print(f"Synthèse: {result['summary']}")
+
+    # Vérification contre le calcul naïf sur quelques nuits
+    start_jd = date_to_julian(START)
+    by_date = {row["date"]: row for row in result["daily"]}
+    errors = 0
+    for _ in range(args.checks):
+        day = START + timedelta(days=random.randrange(days))
+        expected = sum(naive_occupancy(stays, day, start_jd).values())
+        if by_date[day.isoformat()]["rooms_sold"] != expected:
+            errors += 1
+            print(f"ÉCART {day}: {by_date[day.isoformat()]['rooms_sold']} au lieu de {expected}")
+
+    engine.dispose()
+    os.remove(db_path)
+    if errors:
+        sys.exit(1)
+    print(f"{args.checks} nuits vérifiées contre le calcul naïf : OK")
+
+
+if __name__ == "__main__":
+    main()
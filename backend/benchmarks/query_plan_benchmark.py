@@ -0,0 +1,153 @@
+"""
+Benchmark des plans de requêtes sur une grosse table de réservations.
+
+Génère des réservations synthétiques (1M par défaut) dans une base SQLite jetable,
+exécute les requêtes du dashboard, de la liste admin et des analytics, affiche leur
+durée et leur plan (EXPLAIN QUERY PLAN), et se termine en erreur si une requête
+retombe sur un parcours complet des tables bookings / room_inventory ou, pour
+la liste admin, sur un tri temporaire.
+
+Usage (depuis le dossier backend) :
+    python benchmarks/query_plan_benchmark.py --rows 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import date, datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STATUSES = ["pending", "confirmed", "cancelled", "checked-in", "checked-out"]
+# Format de stockage des DateTime de SQLAlchemy pour SQLite
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+DAY_FORMAT = "%Y-%m-%d 00:00:00.000000"
+ROOM_TYPES = ["Double Standard Vue Jardin", "Double Supérieure Vue Piscine", "Suite Familiale", "Single Économique"]
+
+
+def seed_bookings(connection, rows, chunk_size=50000):
+    """Insère des réservations réparties sur cinq ans d'historique"""
+    start = datetime(2021, 1, 1)
+    span_seconds = 5 * 365 * 24 * 3600
+    statement = (
+        "INSERT INTO bookings (id, guest_name, guest_email, guest_phone, check_in, check_out, "
+        "room_type, guests, total_price, status, special_requests, created_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, NULL, ?)"
+    )
+    for offset in range(0, rows, chunk_size):
+        batch = []
+        for _ in range(min(chunk_size, rows - offset)):
+            created_at = start + timedelta(seconds=random.randrange(span_seconds))
+            check_in = created_at + timedelta(days=random.randint(1, 120))
+            check_out = check_in + timedelta(days=random.randint(1, 14))
+            batch.append((
+                str(uuid.uuid4()), "Guest", "guest@example.com", "+21600000000",
+                check_in.strftime(DAY_FORMAT),
+                check_out.strftime(DAY_FORMAT),
+                random.choice(ROOM_TYPES), random.randint(1, 5),
+                round(random.uniform(100, 5000), 2), random.choice(STATUSES),
+                created_at.strftime(DATETIME_FORMAT)
+            ))
+        connection.exec_driver_sql(statement, batch)
+        connection.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--keep", action="store_true", help="conserver la base générée")
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="hotel-plans-"), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    sys.path.insert(0, BACKEND_DIR)
+
+    from sqlalchemy import func, select
+    from app.database import engine, SessionLocal, create_missing_indexes
+    from app.models import Base, Booking
+    from app.inventory import InventoryService
+    from app.rollups import RollupService
+    from app.routes import build_bookings_page_query, build_dashboard_query
+
+    Base.metadata.create_all(bind=engine)
+    with engine.connect() as connection:
+        started = time.perf_counter()
+        seed_bookings(connection, args.rows)
+        print(f"{args.rows} réservations générées en {time.perf_counter() - started:.1f}s ({db_path})")
+        connection.exec_driver_sql("ANALYZE")
+        connection.commit()
+    create_missing_indexes(Base.metadata)
+
+    with SessionLocal() as db:
+        started = time.perf_counter()
+        RollupService.rebuild(db)
+        InventoryService.rebuild(db)
+        print(f"Rollups et calendrier reconstruits en {time.perf_counter() - started:.1f}s")
+
+    with engine.connect() as connection:
+        newest = connection.execute(
+            select(Booking.created_at, Booking.id).order_by(Booking.created_at.desc(), Booking.id.desc())
+            .offset(args.rows // 2).limit(1)
+        ).one()
+    page_columns = [Booking.id, Booking.created_at, Booking.guest_name, Booking.status, Booking.total_price]
+    today = date(2024, 6, 1)
+
+    # (nom, requête, tri temporaire interdit)
+    queries = [
+        ("dashboard overview", build_dashboard_query("2025-12"), False),
+        ("analytics rollups", select(Base.metadata.tables["booking_rollups"]), False),
+        ("liste admin page 1", build_bookings_page_query(page_columns, limit=51), True),
+        ("liste admin page profonde", build_bookings_page_query(page_columns, after=tuple(newest), limit=51), True),
+        ("liste admin par statut", build_bookings_page_query(page_columns, status="pending", limit=51), True),
+        ("liste admin par chambre", build_bookings_page_query(page_columns, room_type=ROOM_TYPES[0], limit=51), True),
+        ("liste admin par arrivée", build_bookings_page_query(
+            page_columns, check_in_from=today, check_in_to=today + timedelta(days=30), limit=51
+        ), False),
+        ("séjours chevauchant une période", select(func.count(Booking.id)).where(
+            Booking.check_in < today + timedelta(days=14),
+            Booking.check_out > today
+        ), False),
+        ("calendrier disponibilités", select(Base.metadata.tables["room_inventory"]).where(
+            Base.metadata.tables["room_inventory"].c.night >= today,
+            Base.metadata.tables["room_inventory"].c.night < today + timedelta(days=31)
+        ), False),
+    ]
+
+    failures = []
+    with engine.connect() as connection:
+        for name, query, forbid_temp_sort in queries:
+            sql = str(query.compile(engine, compile_kwargs={"literal_binds": True}))
+            plan = [row[3] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+
+            started = time.perf_counter()
+            connection.exec_driver_sql(sql).fetchall()
+            elapsed_ms = (time.perf_counter() - started) * 1000
+
+            problems = [
+                step for step in plan
+                if step.split(" ")[:2] in (["SCAN", "bookings"], ["SCAN", "room_inventory"]) and "USING" not in step
+            ]
+            if forbid_temp_sort:
+                problems += [step for step in plan if "TEMP B-TREE" in step]
+
+            print(f"\n{'ÉCHEC' if problems else 'OK':<6}{name}  ({elapsed_ms:.1f} ms)")
+            for step in plan:
+                print(f"        {step}")
+            if problems:
+                failures.append(name)
+
+    if not args.keep:
+        engine.dispose()
+        os.remove(db_path)
+
+    if failures:
+        print(f"\nRégression de plan : {', '.join(failures)}")
+        sys.exit(1)
+    print("\nAucun parcours complet de table détecté")
+
+
+if __name__ == "__main__":
+    main()
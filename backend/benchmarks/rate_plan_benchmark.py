@@ -0,0 +1,166 @@
+"""
+Benchmark des plans tarifaires : compilation des tables de prix par nuit et lecture par séjour.
+
+Génère des types de chambre et des plans saisonniers synthétiques, puis mesure :
+- la compilation complète des tables et la recompilation après la modification d'un plan ;
+- le prix de séjours lu dans la table, contre une recherche des plans nuit par nuit.
+Vérifie que la recompilation partielle donne les mêmes tables qu'une compilation complète,
+que les deux méthodes donnent le même prix, et que les séjours sans plan gardent exactement
+le montant du calcul forfaitaire.
+
+Usage (depuis le dossier backend) :
+    python benchmarks/rate_plan_benchmark.py --room-types 8 --plans 60 --stays 20000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+from dataclasses import replace
+from datetime import date, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from app.catalog import CachedPricingConfig, CachedRoomType  # noqa: E402
+from app.rates import CachedRatePlan, RateChange, compile_rate_tables, weekend_days  # noqa: E402
+from app.routes import PricingService  # noqa: E402
+
+
+def make_rooms(count):
+    return [
+        CachedRoomType(
+            id=str(uuid.uuid4()), name=f"Type {index}", description=None,
+            price_per_night=float(random.randint(80, 300)), available_rooms=20,
+            amenities=None, images=None, is_active=True
+        )
+        for index in range(count)
+    ]
+
+
+def make_plans(rooms, count, today):
+    plans = []
+    for index in range(count):
+        start = today + timedelta(days=random.randrange(700))
+        plans.append(CachedRatePlan(
+            id=str(uuid.uuid4()),
+            room_type_id=random.choice([None] + [room.id for room in rooms]),
+            name=f"Plan {index}",
+            start_date=start,
+            end_date=start + timedelta(days=random.randint(2, 90)),
+            price_per_night=random.choice([None, float(random.randint(60, 400))]),
+            weekend_uplift=random.choice([None, 0.1, 0.25]),
+            min_stay=random.choice([None, 2, 3, 7]),
+            priority=random.randint(0, 5)
+        ))
+    return plans
+
+
+def naive_stay_total(room, plans, check_in, check_out):
+    """Référence : pour chaque nuit, recherche des plans qui la couvrent"""
+    weekend = weekend_days()
+    total = 0.0
+    day = check_in
+    while day < check_out:
+        price, uplift = room.price_per_night, None
+        covering = [plan for plan in plans if plan.applies_to(room.id) and plan.start_date <= day <= plan.end_date]
+        for plan in sorted(covering, key=lambda plan: (plan.priority, plan.start_date, plan.id)):
+            if plan.price_per_night is not None:
+                price = plan.price_per_night
+            if plan.weekend_uplift is not None:
+                uplift = plan.weekend_uplift
+        if uplift and day.weekday() in weekend:
+            price = price * (1 + uplift)
+        total += price
+        day += timedelta(days=1)
+    return total
+
+
+def timed(function, *args):
+    started = time.perf_counter()
+    result = function(*args)
+    return result, (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--room-types", type=int, default=8)
+    parser.add_argument("--plans", type=int, default=60)
+    parser.add_argument("--stays", type=int, default=20000)
+    args = parser.parse_args()
+
+    today = date.today()
+    rooms = make_rooms(args.room_types)
+    plans = make_plans(rooms, args.plans, today)
+    config = CachedPricingConfig(
+        id="bench", single_supplement=50.0, pool_view_supplement=30.0,
+        child_discount_2_4=0.3, child_discount_4_12=0.2, tax_per_night=3.0
+    )
+
+    # Compilation complète, puis modification d'un plan et recompilation de ses seules périodes
+    tables, full_ms = timed(compile_rate_tables, rooms, plans)
+    edited = replace(plans[0], start_date=plans[0].start_date + timedelta(days=5), price_per_night=222.0)
+    changes = [
+        RateChange(plans[0].room_type_id, plans[0].start_date, plans[0].end_date),
+        RateChange(edited.room_type_id, edited.start_date, edited.end_date)
+    ]
+    plans = [edited] + plans[1:]
+    incremental, incremental_ms = timed(compile_rate_tables, rooms, plans, tables, changes)
+    reference = compile_rate_tables(rooms, plans)
+    same_tables = all(
+        (incremental[room.id].rates == reference[room.id].rates).all()
+        and (incremental[room.id].min_stay == reference[room.id].min_stay).all()
+        for room in rooms
+    )
+    print(f"{len(rooms)} types de chambre x {len(plans)} plans x {tables[rooms[0].id].days} jours")
+    print(f"Compilation complète: {full_ms:.2f} ms   Recompilation d'un plan: {incremental_ms:.2f} ms")
+
+    # Séjours aléatoires : table précalculée contre recherche des plans nuit par nuit
+    stays = []
+    for _ in range(args.stays):
+        check_in = today + timedelta(days=random.randrange(720))
+        stays.append((random.choice(rooms), check_in, check_in + timedelta(days=random.randint(1, 14))))
+
+    def from_tables():
+        return [incremental[room.id].stay_total(check_in, check_out) for room, check_in, check_out in stays]
+
+    def from_plans():
+        return [naive_stay_total(room, plans, check_in, check_out) for room, check_in, check_out in stays]
+
+    table_totals, table_ms = timed(from_tables)
+    naive_totals, naive_ms = timed(from_plans)
+    print(f"{args.stays} séjours   Table: {table_ms:.0f} ms   Recherche nuit par nuit: {naive_ms:.0f} ms")
+
+    errors = 0
+    for (room, check_in, check_out), total, expected in zip(stays, table_totals, naive_totals):
+        nights = (check_out - check_in).days
+        if total is None:
+            total = room.price_per_night * nights
+        if abs(total - expected) > 1e-6:
+            errors += 1
+
+    # Séjours sans plan : montant identique au calcul forfaitaire
+    flat_errors = 0
+    for room, check_in, check_out in stays[:2000]:
+        if incremental[room.id].stay_total(check_in, check_out) is not None:
+            continue
+        try:
+            rated = PricingService.calculate_booking_price(
+                room, check_in, check_out, 2, [3, 8], config, rate_table=incremental[room.id]
+            )
+        except ValueError:  # séjour minimum non respecté
+            continue
+        flat = PricingService.calculate_booking_price(room, check_in, check_out, 2, [3, 8], config)
+        if rated != flat:
+            flat_errors += 1
+
+    print(f"Recompilation partielle = compilation complète : {'OK' if same_tables else 'ÉCART'}")
+    print(f"Prix table = recherche nuit par nuit : {'OK' if not errors else f'{errors} écarts'}")
+    print(f"Séjours sans plan = calcul forfaitaire : {'OK' if not flat_errors else f'{flat_errors} écarts'}")
+    if errors or flat_errors or not same_tables:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
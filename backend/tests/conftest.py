@@ -0,0 +1,40 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Base jetable, fixée avant le premier import de app (les paramètres sont lus à l'import)
+TEST_DIR = tempfile.mkdtemp(prefix="hotel-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(TEST_DIR, 'hotel.db')}"
+
+
+@pytest.fixture(scope="session")
+def client():
+    """API initialisée par /setup (admin, configuration des prix, deux types de chambre)"""
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as client:
+        assert client.post("/setup").status_code == 200
+        yield client
+
+
+@pytest.fixture(scope="session")
+def admin_headers(client):
+    from app.config import settings
+
+    response = client.post(
+        "/admin/login", json={"username": settings.ADMIN_USERNAME, "password": settings.ADMIN_PASSWORD}
+    )
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture(scope="session")
+def rooms(client):
+    """Types de chambre par nom"""
+    return {room["name"]: room for room in client.get("/rooms").json()["rooms"]}
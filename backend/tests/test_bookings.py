@@ -0,0 +1,46 @@
+import asyncio
+
+import httpx
+
+from app.main import app
+from app.writer import booking_writer
+
+ROOM_NAME = "Double Supérieure Vue Piscine"
+
+
+def booking(room_id, index, check_in="2031-05-10", check_out="2031-05-13"):
+    return {
+        "room_type_id": room_id,
+        "check_in": check_in,
+        "check_out": check_out,
+        "adults": 2,
+        "guest_name": f"Client {index}",
+        "guest_email": f"client{index}@example.com",
+        "guest_phone": "+216 00 000 000"
+    }
+
+
+def test_reservations_simultanees_refusees_en_409_une_fois_complet(client, rooms):
+    room = rooms[ROOM_NAME]
+    demandes = room["available_rooms"] + 4
+
+    async def reserver():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as async_client:
+            # Envoyées ensemble : regroupées par le writer dans les mêmes commits
+            return await asyncio.gather(*(
+                async_client.post("/bookings", json=booking(room["id"], i)) for i in range(demandes)
+            ))
+
+    batches_before = booking_writer.batches
+    statuses = sorted(response.status_code for response in asyncio.run(reserver()))
+    assert statuses == [200] * room["available_rooms"] + [409] * 4
+    assert booking_writer.batches - batches_before < demandes
+
+    availability = client.get("/availability", params={"from": "2031-05-10", "to": "2031-05-13"}).json()
+    nights = next(r for r in availability["room_types"] if r["name"] == ROOM_NAME)["nights"]
+    assert [night["available"] for night in nights] == [0, 0, 0]
+
+    # Un séjour qui chevauche une nuit complète est refusé aussi
+    response = client.post("/bookings", json=booking(room["id"], 99, "2031-05-12", "2031-05-15"))
+    assert response.status_code == 409
@@ -0,0 +1,63 @@
+ROOM_NAME = "Double Supérieure Vue Piscine"
+
+
+def rows(count, check_in, check_out):
+    return [{
+        "room_type": ROOM_NAME,
+        "check_in": check_in,
+        "check_out": check_out,
+        "adults": 2,
+        "children": [5],
+        "guest_name": f"Tour-opérateur {i}",
+        "guest_email": f"to{i}@example.com",
+        "guest_phone": "+216 00 000 000"
+    } for i in range(count)]
+
+
+def available(client, start, end):
+    availability = client.get("/availability", params={"from": start, "to": end}).json()
+    room = next(room for room in availability["room_types"] if room["name"] == ROOM_NAME)
+    return [night["available"] for night in room["nights"]]
+
+
+def bookings_in(client, admin_headers, start, end):
+    params = {"check_in_from": start, "check_in_to": end, "room_type": ROOM_NAME, "limit": 500}
+    return client.get("/admin/bookings", headers=admin_headers, params=params).json()["bookings"]
+
+
+def test_all_or_nothing_annule_tout_le_lot(client, admin_headers, rooms):
+    capacity = rooms[ROOM_NAME]["available_rooms"]
+    response = client.post(
+        "/admin/bookings/bulk", headers=admin_headers, params={"all_or_nothing": "true"},
+        json=rows(capacity + 2, "2033-03-01", "2033-03-04")
+    ).json()
+
+    assert response["created"] == 0
+    statuses = sorted(result["status"] for result in response["results"])
+    assert statuses == ["rejected"] * 2 + ["skipped"] * capacity
+    assert available(client, "2033-03-01", "2033-03-04") == [capacity] * 3
+    assert bookings_in(client, admin_headers, "2033-03-01", "2033-03-02") == []
+
+
+def test_all_or_nothing_annule_le_lot_sur_une_ligne_invalide(client, admin_headers, rooms):
+    batch = rows(3, "2033-04-01", "2033-04-03")
+    del batch[1]["guest_email"]
+    response = client.post(
+        "/admin/bookings/bulk", headers=admin_headers, params={"all_or_nothing": "true"}, json=batch
+    ).json()
+
+    assert response["created"] == 0
+    assert [result["status"] for result in response["results"]] == ["skipped", "rejected", "skipped"]
+    assert available(client, "2033-04-01", "2033-04-03") == [rooms[ROOM_NAME]["available_rooms"]] * 2
+
+
+def test_import_partiel_sans_surreservation(client, admin_headers, rooms):
+    capacity = rooms[ROOM_NAME]["available_rooms"]
+    response = client.post(
+        "/admin/bookings/bulk", headers=admin_headers, json=rows(capacity + 2, "2033-05-01", "2033-05-04")
+    ).json()
+
+    assert response["created"] == capacity
+    assert response["rejected"] == 2
+    assert available(client, "2033-05-01", "2033-05-04") == [0, 0, 0]
+    assert len(bookings_in(client, admin_headers, "2033-05-01", "2033-05-02")) == capacity
@@ -0,0 +1,32 @@
+import sqlite3
+from datetime import datetime
+
+from app.database import engine
+
+DATABASE_PATH = engine.url.database
+
+
+def test_dashboard_voit_les_ecritures_d_un_autre_worker(client, admin_headers):
+    before = client.get("/admin/dashboard", headers=admin_headers).json()["overview"]
+
+    # Réservation écrite par un autre processus, agrégat et journal commités séparément ici
+    connection = sqlite3.connect(DATABASE_PATH)
+    with connection:
+        connection.execute(
+            "INSERT INTO booking_rollups (month, room_type, status, booking_count, revenue) "
+            "VALUES ('2031-01', 'Autre worker', 'pending', 1, 250.0)"
+        )
+    # Sans nouvel événement, la clé ne change pas : la vue en cache est encore servie
+    assert client.get("/admin/dashboard", headers=admin_headers).json()["overview"] == before
+
+    with connection:
+        connection.execute(
+            "INSERT INTO booking_events (event_type, payload, created_at) VALUES (?, ?, ?)",
+            ("booking.created", "{}", datetime.utcnow())
+        )
+    connection.close()
+
+    after = client.get("/admin/dashboard", headers=admin_headers).json()["overview"]
+    assert after["total_bookings"] == before["total_bookings"] + 1
+    assert after["pending_bookings"] == before["pending_bookings"] + 1
+    assert after["total_revenue"] == round(before["total_revenue"] + 250.0, 2)
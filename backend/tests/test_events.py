@@ -0,0 +1,86 @@
+import asyncio
+import json
+import sqlite3
+from datetime import datetime
+
+import httpx
+
+from app.database import engine
+from app.main import app
+
+DATABASE_PATH = engine.url.database
+ROOM_NAME = "Double Standard Vue Jardin"
+
+
+async def read_stream(headers: dict, until: str, timeout: float = 5) -> str:
+    """Appel ASGI direct de /admin/events : le flux est lu jusqu'à contenir `until`"""
+    chunks = []
+    done = asyncio.Event()
+    scope = {
+        "type": "http", "method": "GET", "path": "/admin/events", "raw_path": b"/admin/events",
+        "query_string": b"", "root_path": "", "scheme": "http", "http_version": "1.1",
+        "headers": [(key.lower().encode(), value.encode()) for key, value in headers.items()],
+        "server": ("test", 80), "client": ("test", 1), "app": app
+    }
+
+    async def receive():
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body" and message.get("body"):
+            chunks.append(message["body"].decode())
+            if until in "".join(chunks):
+                done.set()
+
+    task = asyncio.create_task(app(scope, receive, send))
+    try:
+        await asyncio.wait_for(done.wait(), timeout)
+    finally:
+        done.set()
+        await asyncio.wait_for(task, 2)
+    return "".join(chunks)
+
+
+def test_flux_recoit_les_evenements_ecrits_par_un_autre_worker(client, admin_headers, rooms):
+    room = rooms[ROOM_NAME]
+
+    def autre_worker():
+        # Écriture directe dans le journal, comme le writer d'un autre processus
+        connection = sqlite3.connect(DATABASE_PATH)
+        with connection:
+            cursor = connection.execute(
+                "INSERT INTO booking_events (event_type, payload, created_at) VALUES (?, ?, ?)",
+                ("booking.status_changed", json.dumps({"booking_id": "autre-worker"}), datetime.utcnow())
+            )
+        connection.close()
+        return cursor.lastrowid
+
+    async def scenario():
+        stream = asyncio.create_task(read_stream(admin_headers, until="event: booking.created"))
+        await asyncio.sleep(0.2)
+        external_seq = await asyncio.to_thread(autre_worker)
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as async_client:
+            await asyncio.sleep(1)
+            response = await async_client.post("/bookings", json={
+                "room_type_id": room["id"],
+                "check_in": "2031-09-01",
+                "check_out": "2031-09-03",
+                "adults": 2,
+                "guest_name": "Client flux",
+                "guest_email": "flux@example.com",
+                "guest_phone": "+216 00 000 000"
+            })
+        assert response.status_code == 200
+        return external_seq, response.json()["booking_id"], await stream
+
+    external_seq, booking_id, body = asyncio.run(scenario())
+
+    assert f"id: {external_seq}\nevent: booking.status_changed\ndata: {{\"booking_id\": \"autre-worker\"}}" in body
+    created = body.split("event: booking.created\n", 1)[1]
+    assert json.loads(created.split("\n", 1)[0][len("data: "):])["booking_id"] == booking_id
+    # Numéros du journal croissants : la reprise (Last-Event-ID) vaut pour tous les workers
+    ids = [int(line[len("id: "):]) for line in body.splitlines() if line.startswith("id: ")]
+    assert ids == sorted(ids) and ids[0] == external_seq
@@ -0,0 +1,51 @@
+import sqlite3
+from datetime import date, timedelta
+
+from sqlalchemy import event
+
+from app.database import SessionLocal, engine
+from app.inventory import InventoryService
+from app.models import Base, RoomNight
+
+DATABASE_PATH = engine.url.database
+ROOM_TYPE = "Test verrou"
+
+
+def test_reserve_many_verrouille_avant_de_lire_le_calendrier():
+    Base.metadata.create_all(bind=engine)
+    night = date(2031, 3, 1)
+    with SessionLocal() as db:
+        db.query(RoomNight).filter(RoomNight.room_type == ROOM_TYPE).delete()
+        db.add(RoomNight(room_type=ROOM_TYPE, night=night, sold=1))
+        db.commit()
+
+    ventes_externes = []
+
+    def vente_externe(conn, cursor, statement, parameters, context, executemany):
+        # Un autre worker tente de vendre la dernière chambre pendant la lecture du calendrier
+        if statement.lstrip().upper().startswith("SELECT") and "room_inventory" in statement:
+            connection = sqlite3.connect(DATABASE_PATH, timeout=0.1)
+            try:
+                connection.execute(
+                    "UPDATE room_inventory SET sold = sold + 1 WHERE room_type = ? AND night = ?",
+                    (ROOM_TYPE, night.isoformat())
+                )
+                connection.commit()
+                ventes_externes.append("validée")
+            except sqlite3.OperationalError:
+                ventes_externes.append("en attente du verrou")
+            finally:
+                connection.close()
+
+    event.listen(engine, "before_cursor_execute", vente_externe)
+    try:
+        with SessionLocal() as db:
+            errors = InventoryService.reserve_many(db, [(ROOM_TYPE, 2, night, night + timedelta(days=1))])
+            db.commit()
+    finally:
+        event.remove(engine, "before_cursor_execute", vente_externe)
+
+    assert ventes_externes == ["en attente du verrou"]
+    assert errors == [None]
+    with SessionLocal() as db:
+        assert db.query(RoomNight.sold).filter(RoomNight.room_type == ROOM_TYPE).scalar() == 2
@@ -0,0 +1,46 @@
+from datetime import date, timedelta
+
+ROOM_NAME = "Double Standard Vue Jardin"
+WINDOW = {"check_in_from": "2032-01-01", "check_in_to": "2033-01-01"}
+
+
+def allotment(count, first_day):
+    rows = []
+    for i in range(count):
+        check_in = first_day + timedelta(days=3 * i)
+        rows.append({
+            "room_type": ROOM_NAME,
+            "check_in": check_in.isoformat(),
+            "check_out": (check_in + timedelta(days=2)).isoformat(),
+            "adults": 2,
+            "guest_name": f"Groupe {first_day.month}-{i}",
+            "guest_email": f"groupe{i}@example.com",
+            "guest_phone": "+216 00 000 000"
+        })
+    return rows
+
+
+def test_pages_sans_doublon_ni_trou_quand_created_at_est_identique(client, admin_headers):
+    # Un import groupé donne le même created_at à toutes ses réservations
+    created = set()
+    for first_day in (date(2032, 1, 1), date(2032, 6, 1)):
+        response = client.post("/admin/bookings/bulk", headers=admin_headers, json=allotment(25, first_day))
+        assert response.json()["created"] == 25
+        created.update(row["booking_id"] for row in response.json()["results"])
+
+    seen = []
+    cursor = None
+    while True:
+        params = dict(WINDOW, limit=7, fields="status")
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get("/admin/bookings", headers=admin_headers, params=params).json()
+        seen.extend((row["created_at"], row["id"]) for row in page["bookings"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    ids = [booking_id for _, booking_id in seen]
+    assert len(ids) == len(set(ids))
+    assert set(ids) == created
+    assert seen == sorted(seen, reverse=True)
@@ -0,0 +1,85 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from app.catalog import catalog
+from app.database import SessionLocal
+from app.routes import PricingService
+
+STAYS = 300
+
+
+@pytest.fixture(scope="module")
+def snapshot(client, admin_headers, rooms):
+    # Haute saison sur une chambre : prix par nuit, majoration week-end et séjour minimum
+    room = rooms["Double Supérieure Vue Piscine"]
+    response = client.post("/admin/rate-plans", headers=admin_headers, json={
+        "name": "Été test", "room_type_id": room["id"],
+        "start_date": "2030-07-01", "end_date": "2030-08-31",
+        "price_per_night": 210.0, "weekend_uplift": 0.15, "min_stay": 2, "priority": 1
+    })
+    assert response.status_code == 200
+    with SessionLocal() as db:
+        return catalog.load(db)
+
+
+def random_stay(rng, room_ids):
+    check_in = date(2030, 6, 1) + timedelta(days=rng.randint(0, 120))
+    return {
+        "room_type_id": rng.choice(room_ids),
+        "check_in": check_in.isoformat(),
+        "check_out": (check_in + timedelta(days=rng.randint(1, 14))).isoformat(),
+        "adults": rng.randint(1, 4),
+        "children": [rng.choice([1, 2, 3, 5, 8, 11, 12, 15]) for _ in range(rng.randint(0, 3))],
+        "is_single": rng.random() < 0.3,
+        "has_pool_view": rng.random() < 0.3
+    }
+
+
+def scalar_price(snapshot, stay):
+    room = snapshot.get_room(stay["room_type_id"])
+    try:
+        return PricingService.calculate_booking_price(
+            room_type=room,
+            check_in=date.fromisoformat(stay["check_in"]),
+            check_out=date.fromisoformat(stay["check_out"]),
+            adults=stay["adults"],
+            children=stay["children"],
+            pricing_config=snapshot.pricing_config,
+            is_single=stay["is_single"],
+            has_pool_view=stay["has_pool_view"],
+            rate_table=snapshot.rates.get(room.id)
+        )
+    except ValueError as e:
+        return {"error": str(e)}
+
+
+def test_prix_par_lot_identiques_au_calcul_unitaire(snapshot):
+    rng = random.Random(2030)
+    stays = [random_stay(rng, list(snapshot.rooms)) for _ in range(STAYS)]
+    quotes = PricingService.calculate_batch_prices(snapshot.rooms, stays, snapshot.pricing_config, snapshot.rates)
+
+    refused = 0
+    for stay, quote in zip(stays, quotes):
+        expected = scalar_price(snapshot, stay)
+        if "error" in expected:
+            refused += 1
+            assert quote["error"] == expected["error"]
+        else:
+            assert quote["price_breakdown"] == expected
+    # Le jeu couvre les deux chemins : séjours refusés (séjour minimum) et calculés
+    assert 0 < refused < STAYS
+
+
+@pytest.mark.parametrize("field, value", [
+    ("adults", 0), ("adults", True), ("adults", "2"),
+    ("children", [3, "8"]), ("children", [-1]), ("children", "3;8")
+])
+def test_ligne_invalide_refusee_sans_bloquer_le_lot(snapshot, field, value):
+    valid = random_stay(random.Random(1), list(snapshot.rooms))
+    quotes = PricingService.calculate_batch_prices(
+        snapshot.rooms, [dict(valid, **{field: value}), valid], snapshot.pricing_config, snapshot.rates
+    )
+    assert "error" in quotes[0]
+    assert quotes[1]["price_breakdown"] == scalar_price(snapshot, valid)
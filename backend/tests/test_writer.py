@@ -0,0 +1,49 @@
+import asyncio
+import sqlite3
+import threading
+
+from sqlalchemy import text
+
+from app.database import engine
+from app.writer import BookingWriter
+
+DATABASE_PATH = engine.url.database
+
+
+def ecriture_externe():
+    """Autre worker ou app.manage : une transaction courte sur sa propre connexion"""
+    connection = sqlite3.connect(DATABASE_PATH, timeout=10)
+    connection.execute("INSERT INTO writer_test (source) VALUES ('externe')")
+    connection.commit()
+    connection.close()
+
+
+def test_lot_lecture_puis_ecriture_pendant_un_commit_externe():
+    with engine.begin() as connection:
+        connection.exec_driver_sql("CREATE TABLE IF NOT EXISTS writer_test (source TEXT)")
+        connection.exec_driver_sql("DELETE FROM writer_test")
+    externe = threading.Thread(target=ecriture_externe)
+
+    async def lit_puis_ecrit(db):
+        await db.execute(text("SELECT COUNT(*) FROM writer_test"))
+        # Une autre connexion valide entre la lecture et la première écriture du lot
+        externe.start()
+        await asyncio.sleep(0.3)
+        await db.execute(text("INSERT INTO writer_test (source) VALUES ('lecture')"))
+
+    async def ecrit(db):
+        await db.execute(text("INSERT INTO writer_test (source) VALUES ('ecriture')"))
+
+    async def soumettre():
+        writer = BookingWriter(max_batch=64, max_delay_ms=20)
+        try:
+            return await asyncio.gather(writer.submit(lit_puis_ecrit), writer.submit(ecrit))
+        finally:
+            await writer.stop()
+
+    assert asyncio.run(soumettre()) == [None, None]
+    externe.join()
+    with engine.connect() as connection:
+        sources = [ligne[0] for ligne in connection.exec_driver_sql("SELECT source FROM writer_test ORDER BY rowid")]
+    # L'écriture externe a attendu le commit du lot au lieu de le faire échouer
+    assert sources == ["lecture", "ecriture", "externe"]
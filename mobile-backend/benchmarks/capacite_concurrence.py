@@ -0,0 +1,176 @@
+"""
+Réservations simultanées sur un même créneau El Sofra : aucune surréservation.
+
+Crée une base SQLite jetable (fichier, plusieurs connexions), fixe la capacité d'un créneau
+puis lance des demandes de réservation en parallèle, d'abord comme avant (vérification du
+nombre de réservations puis insertion), ensuite par ReservationService.creer_reservation qui
+prend sa place par un UPDATE conditionnel sur capacites_creneaux. Vérifie aussi qu'une
+annulation rend sa place et qu'une réactivation sur un créneau plein est refusée.
+
+Le script échoue si le compteur laisse passer plus de réservations que la capacité.
+
+Usage (depuis le dossier mobile-backend) :
+    python benchmarks/capacite_concurrence.py --demandes 200 --capacite 20
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, time as heure_fixe, timedelta
+
+MOBILE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, MOBILE_DIR)
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from database import Base  # noqa: E402
+from models import CapaciteCreneau, HoraireSofra, ReservationMobile, StatutReservation  # noqa: E402
+from services.capacite_service import CapaciteService, CreneauComplet  # noqa: E402
+from services.horaire_service import JOURS_SEMAINE, horaire_cache  # noqa: E402
+from services.reservation_service import ReservationService  # noqa: E402
+from services.validation_service import ValidationService  # noqa: E402
+
+
+def creer_base(chemin):
+    engine = create_engine(f"sqlite:///{chemin}", connect_args={"timeout": 60, "check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with Session() as db:
+        for nom in JOURS_SEMAINE:
+            db.add(HoraireSofra(
+                jour_semaine=nom, est_ouvert=True,
+                heure_ouverture=heure_fixe(19, 30), heure_fermeture=heure_fixe(22, 0)
+            ))
+        db.commit()
+        horaire_cache.charger(db)
+    return engine, Session
+
+
+def reservation_sans_compteur(Session, chambre, jour, heure):
+    """Ancien enchaînement : vérification de la capacité, puis insertion séparée"""
+    with Session() as db:
+        if not ValidationService(db).peut_reserver_sofra(chambre, jour, heure)["peut_reserver"]:
+            return False
+        time.sleep(0.001)  # QR code, aller-retour réseau...
+        db.add(ReservationMobile(
+            chambre=chambre, date_reservation=jour, heure=heure,
+            nombre_personnes=2, statut=StatutReservation.en_attente
+        ))
+        db.commit()
+        return True
+
+
+def reservation_avec_compteur(Session, chambre, jour, heure):
+    """Enchaînement de POST /reserver : validation, puis place prise dans la transaction"""
+    with Session() as db:
+        if not ValidationService(db).peut_reserver_sofra(chambre, jour, heure)["peut_reserver"]:
+            return False
+        try:
+            ReservationService(db).creer_reservation(chambre, jour, heure, 2)
+        except CreneauComplet:
+            return False
+        return True
+
+
+def en_parallele(fonction, Session, jour, heure, demandes, premiere_chambre):
+    acceptees = []
+    depart = threading.Barrier(demandes)
+
+    def demande(i):
+        depart.wait()
+        if fonction(Session, str(premiere_chambre + i), jour, heure):
+            acceptees.append(i)
+
+    fils = [threading.Thread(target=demande, args=(i,)) for i in range(demandes)]
+    debut = time.perf_counter()
+    for fil in fils:
+        fil.start()
+    for fil in fils:
+        fil.join()
+    return len(acceptees), (time.perf_counter() - debut) * 1000
+
+
+def compter(Session, jour, heure):
+    with Session() as db:
+        return db.query(ReservationMobile).filter(
+            ReservationMobile.date_reservation == jour,
+            ReservationMobile.heure == heure,
+            ReservationMobile.statut != StatutReservation.annule
+        ).count()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--demandes", type=int, default=200)
+    parser.add_argument("--capacite", type=int, default=20)
+    args = parser.parse_args()
+
+    jour = date.today() + timedelta(days=10)
+    erreurs = []
+    with tempfile.TemporaryDirectory() as dossier:
+        engine, Session = creer_base(os.path.join(dossier, "sofra.db"))
+        with Session() as db:
+            for heure in ("19h30", "20h00"):
+                CapaciteService(db).definir_capacite(jour, heure, args.capacite)
+            db.commit()
+
+        acceptees, duree = en_parallele(
+            reservation_sans_compteur, Session, jour, "19h30", args.demandes, 1000
+        )
+        print(f"Sans compteur : {acceptees} acceptées, {compter(Session, jour, '19h30')} en base "
+              f"pour {args.capacite} places ({duree:.0f} ms)")
+
+        acceptees, duree = en_parallele(
+            reservation_avec_compteur, Session, jour, "20h00", args.demandes, 5000
+        )
+        en_base = compter(Session, jour, "20h00")
+        print(f"Avec compteur : {acceptees} acceptées, {en_base} en base "
+              f"pour {args.capacite} places ({duree:.0f} ms)")
+        if en_base > args.capacite or acceptees != en_base:
+            erreurs.append(f"surréservation : {en_base} réservations pour {args.capacite} places")
+        if en_base < args.capacite:
+            erreurs.append(f"places perdues : {en_base} réservations pour {args.capacite} places")
+
+        # Créneau sans ligne préalable : compteur créé par les demandes concurrentes elles-mêmes
+        acceptees, _ = en_parallele(
+            reservation_avec_compteur, Session, jour + timedelta(days=1), "20h00", args.demandes, 9000
+        )
+        if acceptees != min(args.demandes, ValidationService.CAPACITE_MAX):
+            erreurs.append(f"créneau non initialisé : {acceptees} acceptées")
+
+        # Annulation puis réactivation d'une réservation du créneau plein
+        with Session() as db:
+            capacite_service = CapaciteService(db)
+            reservation = db.query(ReservationMobile).filter(
+                ReservationMobile.date_reservation == jour, ReservationMobile.heure == "20h00"
+            ).first()
+            capacite_service.liberer_place(jour, "20h00")
+            reservation.statut = StatutReservation.annule
+            db.commit()
+        if not reservation_avec_compteur(Session, "7777", jour, "20h00"):
+            erreurs.append("place rendue par l'annulation non disponible")
+        with Session() as db:
+            try:
+                CapaciteService(db).reserver_place(jour, "20h00")
+                erreurs.append("réactivation acceptée sur un créneau plein")
+            except CreneauComplet:
+                db.rollback()
+            creneau = db.query(CapaciteCreneau).filter(
+                CapaciteCreneau.date_creneau == jour, CapaciteCreneau.heure == "20h00"
+            ).one()
+            if creneau.reservations != compter(Session, jour, "20h00"):
+                erreurs.append(f"compteur {creneau.reservations} différent des réservations en base")
+        engine.dispose()
+
+    for erreur in erreurs:
+        print(f"ÉCHEC {erreur}")
+    if erreurs:
+        sys.exit(1)
+    print("Aucune surréservation : OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Recherche d'une chambre dans l'historique reservation_elsofra : LIKE contre clé normalisée.
+
+Crée une base SQLite jetable avec un historique OCR volumineux (numéros simples, multiples
+comme "505-506" ou "409/420/525", zéros en tête), mesure le remplissage de
+reservation_elsofra_chambres, puis compare la durée de la recherche d'une chambre sur un
+mois (calendrier mobile) par LIKE '%chambre%' et par clé indexée, avec le plan de chaque requête.
+Vérifie que "12" ne trouve plus "112" et que "505" trouve toujours "505-506".
+
+Usage (depuis le dossier mobile-backend) :
+    python benchmarks/room_key_benchmark.py --passages 200000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+MOBILE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, MOBILE_DIR)
+
+from sqlalchemy import bindparam, create_engine, insert, text  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from database import Base  # noqa: E402
+from data_cleaning.room_keys import room_keys  # noqa: E402
+from models.historique import reservation_elsofra  # noqa: E402
+from services.historique_service import HistoriqueService  # noqa: E402
+
+RECHERCHE_LIKE = text("""
+    SELECT COUNT(*) FROM reservation_elsofra
+    WHERE date_passage >= :debut AND date_passage < :fin AND statut = 'confirmé'
+    AND numero_chambre LIKE :motif_chambre
+""")
+
+RECHERCHE_CLE = text("""
+    SELECT COUNT(*) FROM reservation_elsofra_chambres
+    WHERE room_key IN :cles_chambre AND date_passage >= :debut AND date_passage < :fin AND statut = 'confirmé'
+""").bindparams(bindparam("cles_chambre", expanding=True))
+
+
+def numero_ocr():
+    """Numéro de chambre tel que lu sur les feuilles de passage"""
+    tirage = random.random()
+    if tirage < 0.75:
+        return str(random.randint(100, 600))
+    if tirage < 0.95:
+        separateur = random.choice(["-", "/", "+"])
+        return separateur.join(str(random.randint(100, 600)) for _ in range(random.randint(2, 3)))
+    return random.choice(["0312", " 54A", "3MA", "Non spécifié"])
+
+
+def creer_base(nb_passages, jour_test):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    premier_jour = jour_test - timedelta(days=365)
+    with engine.begin() as connection:
+        connection.execute(insert(reservation_elsofra), [
+            {"date_passage": premier_jour + timedelta(days=random.randrange(365)),
+             "numero_chambre": numero_ocr(), "nombre_pax": 2,
+             "heure_passage": random.choice(["19:30", "20:00"]), "statut": "confirmé"}
+            for _ in range(nb_passages)
+        ])
+        connection.execute(insert(reservation_elsofra), [
+            {"date_passage": jour_test, "numero_chambre": numero, "nombre_pax": 2,
+             "heure_passage": "19:30", "statut": "confirmé"}
+            for numero in ["505-506", "112", "409/420/525"]
+        ])
+    return engine, sessionmaker(bind=engine)
+
+
+def chronometrer(connection, requete, parametres, repetitions):
+    debut = time.perf_counter()
+    for _ in range(repetitions):
+        resultat = connection.execute(requete, parametres).scalar()
+    return resultat, (time.perf_counter() - debut) * 1000 / repetitions
+
+
+def plan(connection, requete_sql):
+    return " | ".join(ligne[-1] for ligne in connection.execute(text("EXPLAIN QUERY PLAN " + requete_sql)).all())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--passages", type=int, default=200000)
+    parser.add_argument("--repetitions", type=int, default=200)
+    args = parser.parse_args()
+
+    jour_test = date(2025, 6, 15)
+    engine, Session = creer_base(args.passages, jour_test)
+
+    debut = time.perf_counter()
+    with Session() as db:
+        nb_cles = HistoriqueService(db).remplir_cles_chambre()
+    print(f"{args.passages} passages : {nb_cles} clés de chambre en {(time.perf_counter() - debut) * 1000:.0f} ms")
+
+    erreurs = []
+    jour_seul = {"debut": jour_test, "fin": jour_test + timedelta(days=1)}
+    with engine.connect() as connection:
+        def trouve_like(chambre):
+            return connection.execute(RECHERCHE_LIKE, dict(jour_seul, motif_chambre=f"%{chambre}%")).scalar() > 0
+
+        def trouve_cle(chambre):
+            return connection.execute(RECHERCHE_CLE, dict(jour_seul, cles_chambre=room_keys(chambre))).scalar() > 0
+
+        if not trouve_like("12"):
+            erreurs.append("référence : LIKE '%12%' devrait trouver 112")
+        if trouve_cle("12"):
+            erreurs.append("la chambre 12 trouve le passage de la chambre 112")
+        for chambre in ["505", "506", "112", "420", "0420"]:
+            if not trouve_cle(chambre):
+                erreurs.append(f"la chambre {chambre} n'est pas trouvée")
+
+        # Recherche sur un mois, comme le calendrier mobile
+        fin = jour_test + timedelta(days=1)
+        periode = {"debut": fin - timedelta(days=31), "fin": fin}
+        parametres_like = dict(periode, motif_chambre="%506%")
+        parametres_cle = dict(periode, cles_chambre=["506"])
+        explain_like = ("SELECT COUNT(*) FROM reservation_elsofra WHERE date_passage >= '2025-05-16' "
+                        "AND date_passage < '2025-06-16' AND statut = 'confirmé' AND numero_chambre LIKE '%506%'")
+        explain_cle = ("SELECT COUNT(*) FROM reservation_elsofra_chambres WHERE room_key IN ('506') "
+                       "AND date_passage >= '2025-05-16' AND date_passage < '2025-06-16' AND statut = 'confirmé'")
+
+        connection.execute(text("DROP INDEX ix_reservation_elsofra_date"))
+        _, duree_sans_index = chronometrer(connection, RECHERCHE_LIKE, parametres_like, args.repetitions)
+        plan_sans_index = plan(connection, explain_like)
+        connection.execute(text(
+            "CREATE INDEX ix_reservation_elsofra_date ON reservation_elsofra (date_passage, statut, heure_passage)"
+        ))
+        _, duree_like = chronometrer(connection, RECHERCHE_LIKE, parametres_like, args.repetitions)
+        _, duree_cle = chronometrer(connection, RECHERCHE_CLE, parametres_cle, args.repetitions)
+        print(f"LIKE sans index : {duree_sans_index:.3f} ms   LIKE + index date : {duree_like:.3f} ms   "
+              f"clé normalisée : {duree_cle:.3f} ms par recherche sur 31 jours")
+        print(f"Plan LIKE sans index : {plan_sans_index}")
+        print(f"Plan LIKE + index    : {plan(connection, explain_like)}")
+        print(f"Plan clé             : {plan(connection, explain_cle)}")
+
+    for erreur in erreurs:
+        print(f"ÉCHEC {erreur}")
+    if erreurs:
+        sys.exit(1)
+    print("Correspondance des chambres : OK")
+
+
+if __name__ == "__main__":
+    main()
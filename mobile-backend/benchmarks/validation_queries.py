@@ -0,0 +1,160 @@
+"""
+Nombre de requêtes SQL et durée d'une validation de réservation El Sofra.
+
+Crée une base SQLite jetable avec les tables de l'application et la table historique
+reservation_elsofra, la remplit (clés de chambre comprises), charge les horaires en mémoire comme au démarrage, puis compte les requêtes envoyées par
+ValidationService.peut_reserver_sofra, get_heures_disponibles et calendrier. Le script échoue si
+une validation dépasse le nombre de requêtes attendu ou si une règle donne un mauvais
+résultat.
+
+Usage (depuis le dossier mobile-backend) :
+    python benchmarks/validation_queries.py --reservations 5000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, time as heure_fixe, timedelta
+
+MOBILE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, MOBILE_DIR)
+
+from sqlalchemy import create_engine, event, text  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from database import Base  # noqa: E402
+from models import HoraireSofra, ReservationMobile, StatutReservation  # noqa: E402
+from services.historique_service import HistoriqueService  # noqa: E402
+from services.horaire_service import JOURS_SEMAINE, horaire_cache  # noqa: E402
+from services.validation_service import ValidationService  # noqa: E402
+
+# Requêtes attendues : réservations de la date (horaires en mémoire)
+REQUETES_PAR_VALIDATION = 1
+
+
+class CompteurRequetes:
+    def __init__(self, engine):
+        self.total = 0
+        event.listen(engine, "before_cursor_execute", self._compter)
+
+    def _compter(self, *args):
+        self.total += 1
+
+
+def autre_jour(jour_test):
+    """Date proche du jour de test, jamais le jour de test lui-même"""
+    return jour_test + timedelta(days=random.choice([-1, 1]) * random.randint(1, 30))
+
+
+def creer_base(nb_reservations, jour_test):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(
+            text("INSERT INTO reservation_elsofra (date_passage, numero_chambre, nombre_pax, heure_passage, statut) "
+                 "VALUES (:date, :chambre, 2, :heure, 'confirmé')"),
+            [
+                {"date": autre_jour(jour_test),
+                 "chambre": str(random.randint(100, 600)), "heure": random.choice(["19:30", "20:00"])}
+                for _ in range(nb_reservations)
+            ]
+        )
+        # Jour de test : 30 historiques à 19h30 (dont la chambre 505-506), 25 mobiles à 19h30
+        connection.execute(
+            text("INSERT INTO reservation_elsofra (date_passage, numero_chambre, nombre_pax, heure_passage, statut) "
+                 "VALUES (:date, :chambre, 2, '19:30', 'confirmé')"),
+            [{"date": jour_test, "chambre": "505-506" if i == 0 else f"9{i:02d}"} for i in range(30)]
+        )
+
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        HistoriqueService(db).remplir_cles_chambre()
+        for nom in JOURS_SEMAINE:
+            db.add(HoraireSofra(
+                jour_semaine=nom, est_ouvert=nom != "lundi",
+                heure_ouverture=heure_fixe(19, 30), heure_fermeture=heure_fixe(22, 0)
+            ))
+        for i in range(nb_reservations):
+            db.add(ReservationMobile(
+                chambre=str(random.randint(100, 600)),
+                date_reservation=autre_jour(jour_test),
+                heure=random.choice(["19h30", "20h00"]), nombre_personnes=2,
+                statut=random.choice(list(StatutReservation))
+            ))
+        for i in range(25):
+            db.add(ReservationMobile(
+                chambre="312" if i == 0 else f"8{i:02d}", date_reservation=jour_test, heure="19h30",
+                nombre_personnes=2, statut=StatutReservation.confirme
+            ))
+        db.commit()
+    return engine, Session
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reservations", type=int, default=5000)
+    parser.add_argument("--repetitions", type=int, default=200)
+    args = parser.parse_args()
+
+    # Un mardi dans le futur (le lundi est fermé dans ce jeu de données)
+    jour_test = date.today() + timedelta(days=30)
+    jour_test += timedelta(days=(1 - jour_test.weekday()) % 7)
+    engine, Session = creer_base(args.reservations, jour_test)
+    compteur = CompteurRequetes(engine)
+
+    erreurs = []
+    with Session() as db:
+        # Version des horaires relue au plus une fois par seconde : hors du comptage ici
+        horaire_cache.intervalle_verification = float("inf")
+        horaire_cache.charger(db)
+        service = ValidationService(db)
+
+        compteur.total = 0
+        resultat = service.peut_reserver_sofra("312", jour_test, "20h00")
+        if compteur.total > REQUETES_PAR_VALIDATION:
+            erreurs.append(f"peut_reserver_sofra : {compteur.total} requêtes")
+        if resultat["validations"]["premiere_reservation"]:
+            erreurs.append("chambre 312 déjà réservée non détectée")
+        if resultat["heures_disponibles"] != ["20h00", "20h30", "21h00", "21h30"]:
+            erreurs.append(f"19h30 complet (55 réservations) non détecté : {resultat['heures_disponibles']}")
+
+        if service.peut_reserver_sofra("505", jour_test)["validations"]["premiere_reservation"]:
+            erreurs.append("chambre 505 (historique 505-506) non détectée")
+        if not service.peut_reserver_sofra("777", jour_test, "20h00")["peut_reserver"]:
+            erreurs.append("chambre 777 à 20h00 refusée")
+        lundi = jour_test - timedelta(days=1)
+        if service.peut_reserver_sofra("777", lundi)["validations"]["jour_ouvert"]:
+            erreurs.append("lundi fermé non détecté")
+
+        compteur.total = 0
+        service.get_heures_disponibles(jour_test)
+        if compteur.total > REQUETES_PAR_VALIDATION:
+            erreurs.append(f"get_heures_disponibles : {compteur.total} requêtes")
+
+        # Calendrier de deux semaines : mêmes requêtes qu'un seul jour, et mêmes réponses
+        compteur.total = 0
+        calendrier = service.calendrier("312", jour_test - timedelta(days=7), jour_test + timedelta(days=7))
+        if compteur.total > REQUETES_PAR_VALIDATION:
+            erreurs.append(f"calendrier : {compteur.total} requêtes")
+        for jour in calendrier:
+            attendu = service.peut_reserver_sofra("312", date.fromisoformat(jour["date"]))
+            if jour["chambre_eligible"] != (attendu["peut_reserver"] and bool(attendu["heures_disponibles"])):
+                erreurs.append(f"calendrier {jour['date']} différent de la validation du jour")
+
+        compteur.total = 0
+        debut = time.perf_counter()
+        for _ in range(args.repetitions):
+            service.peut_reserver_sofra(str(random.randint(100, 600)), jour_test, "19h30")
+        duree_ms = (time.perf_counter() - debut) * 1000 / args.repetitions
+        print(f"peut_reserver_sofra : {compteur.total / args.repetitions:.1f} requêtes, {duree_ms:.2f} ms par appel")
+
+    for erreur in erreurs:
+        print(f"ÉCHEC {erreur}")
+    if erreurs:
+        sys.exit(1)
+    print("Règles et nombre de requêtes : OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+import os
+
+# ==================== CRÉNEAUX EL SOFRA ====================
+# Intervalle entre deux créneaux d'arrivée, à partir de l'heure d'ouverture
+INTERVALLE_CRENEAU_MINUTES = int(os.getenv("SOFRA_INTERVALLE_CRENEAU_MINUTES", "30"))
+# Plus d'arrivée dans les N dernières minutes avant la fermeture (0 : jusqu'à la fermeture)
+DERNIERE_ARRIVEE_AVANT_FERMETURE_MINUTES = int(os.getenv("SOFRA_DERNIERE_ARRIVEE_AVANT_FERMETURE_MINUTES", "0"))
+# Intervalle de comparaison avec la version des horaires en base (secondes)
+HORAIRES_VERIFICATION_SECONDES = float(os.getenv("SOFRA_HORAIRES_VERIFICATION_SECONDES", "1"))
@@ -0,0 +1,21 @@
+"""
+Remplit reservation_elsofra_chambres à partir des numéros de chambre déjà importés.
+À lancer une fois après la mise à jour (data_cleaning.py tient ensuite la table à jour).
+
+Usage (depuis le dossier mobile-backend) :
+    python data_cleaning/backfill_room_keys.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database  # noqa: E402
+from services.historique_service import HistoriqueService  # noqa: E402
+
+if __name__ == "__main__":
+    debut = time.perf_counter()
+    with database.SessionLocal() as db:
+        total = HistoriqueService(db).remplir_cles_chambre()
+    print(f"{total} clés de chambre insérées en {time.perf_counter() - debut:.1f} s")
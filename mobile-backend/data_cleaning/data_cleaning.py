@@ -1,8 +1,14 @@
+import os
+import sys
 import pandas as pd
 import re
 import mysql.connector
 from mysql.connector import Error
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_cleaning.room_keys import room_keys  # noqa: E402
+
 class DataCleaner:
     def __init__(self, csv_file_path):
         self.csv_file_path = csv_file_path
@@ -81,6 +87,11 @@ class DataCleaner:
         
         self.df['numero_chambre'] = self.df['numero_chambre'].apply(format_chambre)
         self.cleaning_report.append(f"numero_chambre: {problem_count} formats normalisés")
+        
+        # Clés de chambre normalisées ('505-506' -> 505 et 506) pour la table reservation_elsofra_chambres
+        self.df['room_keys'] = self.df['numero_chambre'].apply(lambda x: '-'.join(room_keys(x)))
+        multi_count = self.df['room_keys'].str.contains('-').sum()
+        self.cleaning_report.append(f"room_keys: {multi_count} passages sur plusieurs chambres")
 
     def clean_statut(self):
         """Uniformiser les statuts"""
@@ -123,9 +134,35 @@ class DataCleaner:
             
             cursor = connection.cursor()
             
-            # Vider la table existante
+            # Table des clés de chambre (une ligne par chambre de chaque passage)
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS reservation_elsofra_chambres (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                reservation_id INT NOT NULL,
+                room_key VARCHAR(20) NOT NULL,
+                date_passage DATE NOT NULL,
+                statut VARCHAR(20) NOT NULL,
+                INDEX ix_reservation_elsofra_chambres_reservation_id (reservation_id),
+                INDEX ix_reservation_elsofra_chambres_cle (room_key, date_passage, statut)
+            )
+            """)
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS reservation_elsofra_chambres_etat (
+                id INT PRIMARY KEY,
+                dernier_id INT NOT NULL,
+                rempli_le TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """)
+            
+            # Vider les tables existantes
+            cursor.execute("DELETE FROM reservation_elsofra_chambres")
             cursor.execute("DELETE FROM reservation_elsofra")
-            print("   Table vidée")
+            print("   Tables vidées")
+            
+            insert_keys_query = """
+            INSERT INTO reservation_elsofra_chambres (reservation_id, room_key, date_passage, statut)
+            VALUES (%s, %s, %s, %s)
+            """
             
             # Insérer les données nettoyées
             for index, row in self.df.iterrows():
@@ -146,6 +183,38 @@ class DataCleaner:
                     row.get('ligne_source', ''), 
                     row['statut']
                 ))
+                
+                # date_passage et statut sont NOT NULL dans la table des clés
+                if row['room_keys'] and pd.notna(row['date_passage']) and pd.notna(row['statut']):
+                    reservation_id = cursor.lastrowid
+                    cursor.executemany(insert_keys_query, [
+                        (reservation_id, key, row['date_passage'], row['statut'])
+                        for key in row['room_keys'].split('-')
+                    ])
+            
+            # Clés complètes jusqu'au dernier passage inséré, dans la même transaction
+            cursor.execute("""
+            REPLACE INTO reservation_elsofra_chambres_etat (id, dernier_id)
+            SELECT 1, COALESCE(MAX(id), 0) FROM reservation_elsofra
+            """)
+            
+            # Compteurs des créneaux à venir recalculés : les passages importés occupent des places
+            cursor.execute("SHOW TABLES LIKE 'capacites_creneaux'")
+            if cursor.fetchone():
+                cursor.execute("""
+                UPDATE capacites_creneaux c
+                SET reservations = (
+                    SELECT COUNT(*) FROM reservations_mobile m
+                    WHERE m.date_reservation = c.date_creneau AND m.heure IN (c.heure, REPLACE(c.heure, 'h', ':'))
+                    AND m.statut IN ('en_attente', 'confirme')
+                ) + (
+                    SELECT COUNT(*) FROM reservation_elsofra r
+                    WHERE r.date_passage = c.date_creneau AND r.heure_passage IN (c.heure, REPLACE(c.heure, 'h', ':'))
+                    AND r.statut = 'confirmé'
+                )
+                WHERE c.date_creneau >= CURDATE()
+                """)
+                self.cleaning_report.append(f"capacites_creneaux: {cursor.rowcount} compteurs recalculés")
             
             connection.commit()
             print(f"{len(self.df)} enregistrements insérés")
@@ -0,0 +1,20 @@
+import re
+from typing import List
+
+# Un numéro de chambre : chiffres, éventuellement suivis d'une aile (54A, 3MA)
+ROOM_TOKEN = re.compile(r'\d+[A-Z]*')
+
+def room_keys(numero_chambre) -> List[str]:
+    """
+    Clés de chambre normalisées d'un numero_chambre saisi ou lu par OCR.
+    '505-506' -> ['505', '506'], '409/420/525' -> ['409', '420', '525'], ' 0312 ' -> ['312'].
+    Sert aussi bien au nettoyage de l'historique qu'à la recherche d'une chambre.
+    """
+    if numero_chambre is None:
+        return []
+    keys = []
+    for token in ROOM_TOKEN.findall(str(numero_chambre).upper()):
+        key = token.lstrip('0') or '0'
+        if key not in keys:
+            keys.append(key)
+    return keys
@@ -4,6 +4,9 @@ from sqlalchemy.orm import Session
 from datetime import datetime  
 import database
 from routes import reservations, disponibilite, admin
+from services.horaire_service import horaire_cache
+from services.capacite_service import CapaciteService
+from services.historique_service import HistoriqueService
 
 app = FastAPI(title="El Sofra Mobile API", version="1.0.0")
 
@@ -20,6 +23,40 @@ app.include_router(reservations.router, prefix="/api/mobile", tags=["reservation
 app.include_router(disponibilite.router, prefix="/api/mobile", tags=["disponibilite"])
 app.include_router(admin.router, prefix="/api/mobile/admin", tags=["admin"])
 
+@app.on_event("startup")
+def charger_horaires():
+    """Horaires de la semaine en mémoire dès le démarrage (sinon chargés à la première demande)"""
+    db = database.SessionLocal()
+    try:
+        horaire_cache.creer_table(db)
+        horaire_cache.charger(db)
+    except Exception as e:
+        print(f"Horaires non chargés au démarrage: {str(e)}")
+    finally:
+        db.close()
+
+@app.on_event("startup")
+def creer_compteurs_creneaux():
+    """Table des compteurs de places, lue par chaque vérification de disponibilité"""
+    db = database.SessionLocal()
+    try:
+        CapaciteService(db).creer_table()
+    except Exception as e:
+        print(f"Table capacites_creneaux non créée: {str(e)}")
+    finally:
+        db.close()
+
+@app.on_event("startup")
+def creer_tables_historique():
+    """Clés de chambre et leur état : sans état, la recherche de chambre reste sur LIKE"""
+    db = database.SessionLocal()
+    try:
+        HistoriqueService(db).creer_tables()
+    except Exception as e:
+        print(f"Tables des clés de chambre non créées: {str(e)}")
+    finally:
+        db.close()
+
 @app.get("/")
 async def root():
     return {"message": "El Sofra Mobile API - Prêt pour les réservations"}
@@ -1,4 +1,6 @@
-from .horaire import HoraireSofra
+from .horaire import HoraireSofra, VersionHoraires
 from .reservation import ReservationMobile, StatutReservation
 from .restriction import RestrictionSejour
-from .admin import AdminUser
\ No newline at end of file
+from .admin import AdminUser
+from .historique import ChambreHistorique, EtatClesChambre, chambres_en_preparation, reservation_elsofra
+from .capacite import CapaciteCreneau
\ No newline at end of file
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, Date, TIMESTAMP, UniqueConstraint
+from sqlalchemy.sql import func
+from database import Base
+
+class CapaciteCreneau(Base):
+    """Compteur de places d'un créneau, incrémenté dans la transaction de chaque réservation"""
+    __tablename__ = "capacites_creneaux"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    date_creneau = Column(Date, nullable=False)
+    heure = Column(String(10), nullable=False)
+    # NULL : capacité par défaut du restaurant
+    capacite = Column(Integer)
+    reservations = Column(Integer, nullable=False, default=0)
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (UniqueConstraint('date_creneau', 'heure', name='unique_date_heure'),)
@@ -0,0 +1,56 @@
+from sqlalchemy import Column, Integer, String, Date, Table, Index, TIMESTAMP
+from sqlalchemy.sql import func
+from database import Base
+
+# Historique des passages lus par OCR (table remplie par data_cleaning, sans modèle ORM)
+reservation_elsofra = Table(
+    "reservation_elsofra",
+    Base.metadata,
+    Column("id", Integer, primary_key=True),
+    Column("date_passage", Date),
+    Column("numero_chambre", String(50)),
+    Column("nombre_pax", Integer),
+    Column("heure_passage", String(10)),
+    Column("restaurant", String(100)),
+    Column("type_service", String(50)),
+    Column("nom_fichier_source", String(255)),
+    Column("ligne_source", Integer),
+    Column("statut", String(20)),
+    Column("date_import", TIMESTAMP),
+    # Comptes par jour et par heure des vérifications de disponibilité
+    Index("ix_reservation_elsofra_date", "date_passage", "statut", "heure_passage"),
+)
+
+class ChambreHistorique(Base):
+    """Une ligne par chambre d'un passage historique : '505-506' donne 505 et 506"""
+    __tablename__ = "reservation_elsofra_chambres"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    reservation_id = Column(Integer, nullable=False, index=True)
+    room_key = Column(String(20), nullable=False)
+    date_passage = Column(Date, nullable=False)
+    statut = Column(String(20), nullable=False)
+    
+    __table_args__ = (Index("ix_reservation_elsofra_chambres_cle", "room_key", "date_passage", "statut"),)
+
+
+# Clés en cours de reconstruction, recopiées d'un bloc dans reservation_elsofra_chambres
+chambres_en_preparation = Table(
+    "reservation_elsofra_chambres_preparation",
+    Base.metadata,
+    Column("reservation_id", Integer, nullable=False),
+    Column("room_key", String(20), nullable=False),
+    Column("date_passage", Date, nullable=False),
+    Column("statut", String(20), nullable=False),
+)
+
+class EtatClesChambre(Base):
+    """
+    Ligne unique (id = 1) : reservation_elsofra_chambres couvre tous les passages jusqu'à
+    dernier_id. Sans elle, ou si un passage plus récent existe, la recherche reste sur LIKE.
+    """
+    __tablename__ = "reservation_elsofra_chambres_etat"
+    
+    id = Column(Integer, primary_key=True)
+    dernier_id = Column(Integer, nullable=False)
+    rempli_le = Column(TIMESTAMP, server_default=func.now())
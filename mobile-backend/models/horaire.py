@@ -10,4 +10,13 @@ class HoraireSofra(Base):
     est_ouvert = Column(Boolean, default=False)
     heure_ouverture = Column(Time)
     heure_fermeture = Column(Time)
-    created_at = Column(TIMESTAMP, server_default=func.now())
\ No newline at end of file
+    created_at = Column(TIMESTAMP, server_default=func.now())
+
+
+class VersionHoraires(Base):
+    """Ligne unique (id = 1) incrémentée à chaque modification des horaires, lue par tous les workers"""
+    __tablename__ = "horaires_sofra_version"
+    
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
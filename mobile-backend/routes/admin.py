@@ -1,11 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 from sqlalchemy.orm import Session
-from datetime import date, datetime, timedelta
+from datetime import date, datetime, time, timedelta
+from typing import Optional
 import secrets
 import database
 from models.reservation import ReservationMobile, StatutReservation
 from models.admin import AdminUser
+from models.horaire import HoraireSofra
+from models.capacite import CapaciteCreneau
+from services.capacite_service import CapaciteService, CreneauComplet
+from services.horaire_service import JOURS_SEMAINE, HoraireJour, horaire_cache
 
 router = APIRouter()
 security = HTTPBasic()
@@ -98,7 +103,17 @@ async def update_statut_reservation(
         if not reservation:
             raise HTTPException(status_code=404, detail="Réservation non trouvée")
         
-        reservation.statut = StatutReservation(nouveau_statut)
+        statut = StatutReservation(nouveau_statut)
+        
+        # Une annulation rend sa place au créneau, une réactivation la reprend
+        capacite_service = CapaciteService(db)
+        etait_annulee = reservation.statut == StatutReservation.annule
+        if statut == StatutReservation.annule and not etait_annulee:
+            capacite_service.liberer_place(reservation.date_reservation, reservation.heure)
+        elif statut != StatutReservation.annule and etait_annulee:
+            capacite_service.reserver_place(reservation.date_reservation, reservation.heure)
+        
+        reservation.statut = statut
         reservation.updated_at = datetime.now()
         
         db.commit()
@@ -111,8 +126,101 @@ async def update_statut_reservation(
                 "statut": reservation.statut.value
             }
         }
+    except HTTPException:
+        raise
     except ValueError:
         raise HTTPException(status_code=400, detail="Statut invalide")
+    except CreneauComplet:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Heure complète, réservation non réactivée")
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Erreur de mise à jour: {str(e)}")
+
+@router.put("/horaires/{jour_semaine}")
+async def update_horaire(
+    jour_semaine: str,
+    est_ouvert: bool,
+    heure_ouverture: Optional[time] = None,
+    heure_fermeture: Optional[time] = None,
+    db: Session = Depends(database.get_db),
+    admin: str = Depends(authenticate_admin)
+):
+    """Modifie les horaires d'un jour ; ce worker recharge aussitôt, les autres à la version suivante"""
+    if jour_semaine not in JOURS_SEMAINE:
+        raise HTTPException(status_code=400, detail="Jour invalide")
+    
+    try:
+        horaire = db.query(HoraireSofra).filter(
+            HoraireSofra.jour_semaine == jour_semaine
+        ).first()
+        if not horaire:
+            horaire = HoraireSofra(jour_semaine=jour_semaine)
+            db.add(horaire)
+        
+        horaire.est_ouvert = est_ouvert
+        if heure_ouverture is not None:
+            horaire.heure_ouverture = heure_ouverture
+        if heure_fermeture is not None:
+            horaire.heure_fermeture = heure_fermeture
+        
+        horaire_cache.incrementer_version(db)
+        db.commit()
+        horaire_cache.charger(db)
+        
+        return {
+            "success": True,
+            "message": f"Horaires mis à jour: {jour_semaine}",
+            "horaire": HoraireJour.depuis_modele(horaire).to_dict()
+        }
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Erreur de mise à jour: {str(e)}")
+
+@router.get("/capacites")
+async def get_capacites(
+    date_filter: date,
+    db: Session = Depends(database.get_db),
+    admin: str = Depends(authenticate_admin)
+):
+    """Compteurs de places des créneaux d'une date"""
+    try:
+        capacite_service = CapaciteService(db)
+        creneaux = db.query(CapaciteCreneau).filter(
+            CapaciteCreneau.date_creneau == date_filter
+        ).order_by(CapaciteCreneau.heure).all()
+        
+        return {
+            "success": True,
+            "date": date_filter.isoformat(),
+            "capacite_par_defaut": capacite_service.capacite_par_defaut(),
+            "creneaux": [capacite_service.to_dict(c) for c in creneaux]
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur de récupération: {str(e)}")
+
+@router.put("/capacites/{date_creneau}/{heure}")
+async def update_capacite(
+    date_creneau: date,
+    heure: str,
+    capacite: Optional[int] = None,
+    db: Session = Depends(database.get_db),
+    admin: str = Depends(authenticate_admin)
+):
+    """Fixe la capacité d'un créneau ; sans capacité, le créneau revient à la valeur par défaut"""
+    if capacite is not None and capacite < 0:
+        raise HTTPException(status_code=400, detail="Capacité invalide")
+    
+    try:
+        capacite_service = CapaciteService(db)
+        creneau = capacite_service.definir_capacite(date_creneau, heure, capacite)
+        db.commit()
+        
+        return {
+            "success": True,
+            "message": f"Capacité mise à jour: {date_creneau.isoformat()} {creneau.heure}",
+            "creneau": capacite_service.to_dict(creneau)
+        }
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Erreur de mise à jour: {str(e)}")
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from datetime import date
 import database
 from services.validation_service import ValidationService
+from services.horaire_service import JOURS_SEMAINE, horaire_cache
 
 router = APIRouter()
 
@@ -26,6 +27,39 @@ async def verifier_disponibilite(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur de vérification: {str(e)}")
 
+@router.get("/disponibilite/{chambre}")
+async def calendrier_disponibilite(
+    chambre: str,
+    date_debut: date = Query(..., alias="from"),
+    date_fin: date = Query(..., alias="to"),
+    db: Session = Depends(database.get_db)
+):
+    """Disponibilités jour par jour sur [from, to) pour le calendrier de l'application"""
+    nb_jours = (date_fin - date_debut).days
+    if nb_jours <= 0:
+        raise HTTPException(status_code=400, detail="La date de fin doit être après la date de début")
+    if nb_jours > ValidationService.MAX_JOURS_CALENDRIER:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Période limitée à {ValidationService.MAX_JOURS_CALENDRIER} jours"
+        )
+    
+    try:
+        validation_service = ValidationService(db)
+        jours = validation_service.calendrier(chambre, date_debut, date_fin)
+        
+        return {
+            "success": True,
+            "chambre": chambre,
+            "from": date_debut.isoformat(),
+            "to": date_fin.isoformat(),
+            # Capacité des créneaux sans capacité propre ; chaque créneau donne la sienne et ses places restantes
+            "capacite_par_defaut": ValidationService.CAPACITE_MAX,
+            "jours": jours
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur de vérification: {str(e)}")
+
 @router.get("/heures-disponibles/{date_souhaitee}")
 async def get_heures_disponibles(
     date_souhaitee: date,
@@ -42,4 +76,17 @@ async def get_heures_disponibles(
             "heures_disponibles": heures
         }
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Erreur de récupération: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Erreur de récupération: {str(e)}")
+
+@router.get("/horaires")
+async def get_horaires(db: Session = Depends(database.get_db)):
+    """Horaires d'ouverture de la semaine et créneaux de réservation de chaque jour"""
+    try:
+        semaine = horaire_cache.semaine(db)
+        return {
+            "success": True,
+            "version": horaire_cache.version,
+            "horaires": [semaine[jour].to_dict() for jour in JOURS_SEMAINE if jour in semaine]
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur de récupération: {str(e)}")
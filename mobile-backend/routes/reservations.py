@@ -5,6 +5,7 @@ import database
 from services.validation_service import ValidationService
 from models.reservation import ReservationMobile, StatutReservation
 from services.reservation_service import ReservationService
+from services.capacite_service import CreneauComplet
 import json
 
 router = APIRouter()
@@ -51,6 +52,9 @@ async def creer_reservation(
         
     except HTTPException:
         raise
+    except CreneauComplet:
+        # Dernière place prise par une réservation simultanée
+        raise HTTPException(status_code=400, detail="Heure non disponible")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur de réservation: {str(e)}")
 
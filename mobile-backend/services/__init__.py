@@ -1,2 +1,4 @@
 from .reservation_service import ReservationService
-from .validation_service import ValidationService
\ No newline at end of file
+from .validation_service import ValidationService
+from .historique_service import HistoriqueService
+from .capacite_service import CapaciteService
\ No newline at end of file
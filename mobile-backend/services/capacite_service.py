@@ -0,0 +1,125 @@
+from datetime import date
+from typing import Optional
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from sqlalchemy import func, text, update
+from models.capacite import CapaciteCreneau
+from services.validation_service import ValidationService, normaliser_heure, table_absente
+
+# Réservations déjà enregistrées sur le créneau, au format de l'application ("19h30") ou de l'OCR ("19:30")
+BRANCHE_AMORCE_MOBILE = """
+    SELECT id FROM reservations_mobile
+    WHERE date_reservation = :jour AND heure IN (:heure, :heure_ocr) AND statut IN ('en_attente', 'confirme')
+"""
+
+BRANCHE_AMORCE_HISTORIQUE = """
+    SELECT id FROM reservation_elsofra
+    WHERE date_passage = :jour AND heure_passage IN (:heure, :heure_ocr) AND statut = 'confirmé'
+"""
+
+# Insertion ignorée si le compteur existe déjà (créé par une réservation concurrente)
+INSERTION_SANS_DOUBLON = {"mysql": "INSERT IGNORE", "sqlite": "INSERT OR IGNORE"}
+
+def requete_amorce(insertion: str, *branches: str):
+    """Crée le compteur et le compte des réservations existantes en une seule instruction"""
+    return text(f"""
+        {insertion} INTO capacites_creneaux (date_creneau, heure, reservations)
+        SELECT :jour, :heure, COUNT(*)
+        FROM ({" UNION ALL ".join(branches)}) reservations_creneau
+    """)
+
+# Par dialecte : avec la table historique, puis sans (absente de certaines installations)
+REQUETES_AMORCE = {
+    dialecte: (
+        requete_amorce(insertion, BRANCHE_AMORCE_MOBILE, BRANCHE_AMORCE_HISTORIQUE),
+        requete_amorce(insertion, BRANCHE_AMORCE_MOBILE)
+    )
+    for dialecte, insertion in INSERTION_SANS_DOUBLON.items()
+}
+
+class CreneauComplet(Exception):
+    """Plus aucune place sur le créneau demandé"""
+
+class CapaciteService:
+    """
+    Places par créneau (date, heure). La réservation prend sa place par un UPDATE conditionnel
+    (reservations < capacite) dans sa propre transaction : deux demandes simultanées ne peuvent
+    pas obtenir la dernière place, la seconde attend le verrou de ligne puis échoue.
+    Les méthodes ne valident pas : c'est la transaction de l'appelant qui le fait.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def creer_table(self):
+        CapaciteCreneau.__table__.create(bind=self.db.get_bind(), checkfirst=True)
+
+    def _filtre(self, jour: date, heure: str):
+        return (CapaciteCreneau.date_creneau == jour) & (CapaciteCreneau.heure == heure)
+
+    def _assurer_creneau(self, jour: date, heure: str) -> None:
+        """
+        Crée le compteur du créneau à partir des réservations déjà enregistrées, dans la
+        transaction de l'appelant. Le comptage est fait par l'INSERT lui-même (lecture
+        verrouillante sous MySQL, verrou d'écriture sous SQLite), l'UPDATE conditionnel suit.
+        """
+        if self.db.query(CapaciteCreneau.id).filter(self._filtre(jour, heure)).first():
+            return
+        parametres = {"jour": jour, "heure": heure, "heure_ocr": heure.replace('h', ':')}
+        avec_historique, sans_historique = REQUETES_AMORCE.get(
+            self.db.get_bind().dialect.name, REQUETES_AMORCE["mysql"]
+        )
+        try:
+            with self.db.begin_nested():
+                self.db.execute(avec_historique, parametres)
+        except (ProgrammingError, OperationalError) as e:
+            if not table_absente(e):
+                raise
+            self.db.execute(sans_historique, parametres)
+
+    def reserver_place(self, jour: date, heure: str) -> None:
+        """Prend une place sur le créneau ou lève CreneauComplet"""
+        heure = normaliser_heure(heure)
+        self._assurer_creneau(jour, heure)
+        resultat = self.db.execute(
+            update(CapaciteCreneau)
+            .where(self._filtre(jour, heure))
+            .where(CapaciteCreneau.reservations
+                   < func.coalesce(CapaciteCreneau.capacite, self.capacite_par_defaut()))
+            .values(reservations=CapaciteCreneau.reservations + 1)
+            .execution_options(synchronize_session=False)
+        )
+        if resultat.rowcount != 1:
+            raise CreneauComplet(f"Créneau complet: {jour.isoformat()} {heure}")
+
+    def liberer_place(self, jour: date, heure: str) -> None:
+        """Rend la place d'une réservation annulée"""
+        self.db.execute(
+            update(CapaciteCreneau)
+            .where(self._filtre(jour, normaliser_heure(heure)))
+            .where(CapaciteCreneau.reservations > 0)
+            .values(reservations=CapaciteCreneau.reservations - 1)
+            .execution_options(synchronize_session=False)
+        )
+
+    def definir_capacite(self, jour: date, heure: str, capacite: Optional[int]) -> CapaciteCreneau:
+        """Fixe la capacité d'un créneau (None : capacité par défaut)"""
+        heure = normaliser_heure(heure)
+        self._assurer_creneau(jour, heure)
+        creneau = self.db.query(CapaciteCreneau).filter(self._filtre(jour, heure)).with_for_update().one()
+        creneau.capacite = capacite
+        return creneau
+
+    def capacite_par_defaut(self) -> int:
+        return ValidationService.CAPACITE_MAX
+
+    def to_dict(self, creneau: CapaciteCreneau) -> dict:
+        capacite = creneau.capacite if creneau.capacite is not None else self.capacite_par_defaut()
+        return {
+            "date": creneau.date_creneau.isoformat(),
+            "heure": creneau.heure,
+            "capacite": capacite,
+            "capacite_personnalisee": creneau.capacite is not None,
+            "reservations": creneau.reservations,
+            "places_restantes": max(capacite - creneau.reservations, 0)
+        }
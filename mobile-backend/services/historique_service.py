@@ -0,0 +1,67 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import delete, func, insert, select
+from data_cleaning.room_keys import room_keys
+from models.historique import ChambreHistorique, EtatClesChambre, chambres_en_preparation, reservation_elsofra
+
+class HistoriqueService:
+    """Entretien de la table des clés de chambre de l'historique OCR (reservation_elsofra)"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def creer_tables(self):
+        """Crée reservation_elsofra_chambres, son état et les index de recherche s'ils manquent"""
+        bind = self.db.get_bind()
+        ChambreHistorique.__table__.create(bind=bind, checkfirst=True)
+        EtatClesChambre.__table__.create(bind=bind, checkfirst=True)
+        for index in reservation_elsofra.indexes:
+            index.create(bind=bind, checkfirst=True)
+
+    def remplir_cles_chambre(self, taille_lot: int = 5000) -> int:
+        """
+        Reconstruit reservation_elsofra_chambres à partir de numero_chambre : les clés sont
+        préparées par lots d'identifiants croissants dans une table à part, puis remplacent
+        l'ancien contenu et l'état en une seule transaction. Retourne le nombre de clés insérées.
+        """
+        self.creer_tables()
+        bind = self.db.get_bind()
+        chambres_en_preparation.drop(bind=bind, checkfirst=True)
+        chambres_en_preparation.create(bind=bind)
+
+        colonnes = reservation_elsofra.c
+        dernier_id = 0
+        total = 0
+        while True:
+            lignes = self.db.execute(
+                select(colonnes.id, colonnes.numero_chambre, colonnes.date_passage, colonnes.statut)
+                .where(colonnes.id > dernier_id)
+                .order_by(colonnes.id)
+                .limit(taille_lot)
+            ).all()
+            if not lignes:
+                break
+            cles = [
+                {"reservation_id": id_passage, "room_key": cle, "date_passage": date_passage, "statut": statut}
+                for id_passage, numero_chambre, date_passage, statut in lignes
+                if date_passage is not None and statut is not None
+                for cle in room_keys(numero_chambre)
+            ]
+            if cles:
+                self.db.execute(chambres_en_preparation.insert(), cles)
+            self.db.commit()
+            dernier_id = lignes[-1][0]
+            total += len(cles)
+
+        # Bascule : les recherches voient l'ancien contenu ou le nouveau, jamais une table partielle
+        colonnes_cles = ("reservation_id", "room_key", "date_passage", "statut")
+        self.db.execute(delete(ChambreHistorique))
+        self.db.execute(
+            insert(ChambreHistorique).from_select(
+                colonnes_cles, select(*(chambres_en_preparation.c[nom] for nom in colonnes_cles))
+            )
+        )
+        self.db.execute(delete(EtatClesChambre))
+        self.db.add(EtatClesChambre(id=1, dernier_id=dernier_id, rempli_le=func.now()))
+        self.db.commit()
+        chambres_en_preparation.drop(bind=bind)
+        return total
@@ -0,0 +1,124 @@
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Optional, Tuple
+import time as horloge
+from sqlalchemy.orm import Session
+from sqlalchemy import update
+import config
+from models.horaire import HoraireSofra, VersionHoraires
+
+JOURS_SEMAINE = ['lundi', 'mardi', 'mercredi', 'jeudi', 'vendredi', 'samedi', 'dimanche']
+
+# Créneaux de réservation : à intervalle régulier depuis l'ouverture, jusqu'à la dernière arrivée
+INTERVALLE_CRENEAU = timedelta(minutes=config.INTERVALLE_CRENEAU_MINUTES)
+DERNIERE_ARRIVEE_AVANT_FERMETURE = timedelta(minutes=config.DERNIERE_ARRIVEE_AVANT_FERMETURE_MINUTES)
+# Créneaux historiques, utilisés quand un jour ouvert n'a pas d'heures renseignées
+CRENEAUX_PAR_DEFAUT = ("19h30", "20h00")
+
+def formater_heure(valeur: time) -> str:
+    return f"{valeur.hour:02d}h{valeur.minute:02d}"
+
+def calculer_creneaux(heure_ouverture: Optional[time], heure_fermeture: Optional[time]) -> Tuple[str, ...]:
+    """Créneaux d'arrivée entre l'ouverture et la fermeture (ex. 19h30-21h00 -> 19h30, 20h00, 20h30)"""
+    if not heure_ouverture or not heure_fermeture:
+        return CRENEAUX_PAR_DEFAUT
+    jour = date.min
+    creneau = datetime.combine(jour, heure_ouverture)
+    fermeture = datetime.combine(jour, heure_fermeture)
+    if fermeture <= creneau:  # fermeture après minuit
+        fermeture += timedelta(days=1)
+    creneaux = []
+    derniere_arrivee = fermeture - DERNIERE_ARRIVEE_AVANT_FERMETURE
+    while creneau < derniere_arrivee:
+        creneaux.append(formater_heure(creneau.time()))
+        creneau += INTERVALLE_CRENEAU
+    return tuple(creneaux)
+
+@dataclass(frozen=True)
+class HoraireJour:
+    """Copie figée d'une ligne de horaires_sofra, avec ses créneaux calculés"""
+    jour_semaine: str
+    est_ouvert: bool
+    heure_ouverture: Optional[time]
+    heure_fermeture: Optional[time]
+    creneaux: Tuple[str, ...]
+
+    @classmethod
+    def depuis_modele(cls, horaire: HoraireSofra) -> "HoraireJour":
+        return cls(
+            jour_semaine=horaire.jour_semaine,
+            est_ouvert=bool(horaire.est_ouvert),
+            heure_ouverture=horaire.heure_ouverture,
+            heure_fermeture=horaire.heure_fermeture,
+            creneaux=calculer_creneaux(horaire.heure_ouverture, horaire.heure_fermeture) if horaire.est_ouvert else ()
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "jour_semaine": self.jour_semaine,
+            "est_ouvert": self.est_ouvert,
+            "heure_ouverture": formater_heure(self.heure_ouverture) if self.heure_ouverture else None,
+            "heure_fermeture": formater_heure(self.heure_fermeture) if self.heure_fermeture else None,
+            "creneaux": list(self.creneaux)
+        }
+
+class HoraireCache:
+    """
+    Semaine d'ouverture d'El Sofra en mémoire : sept lignes qui ne changent presque jamais.
+    Chargée au démarrage et rechargée dès que la version en base (horaires_sofra_version,
+    incrémentée par chaque modification admin) diffère de celle chargée ; cette version est
+    relue au plus toutes les intervalle_verification secondes.
+    """
+
+    def __init__(self, intervalle_verification: float = config.HORAIRES_VERIFICATION_SECONDES):
+        self.intervalle_verification = intervalle_verification
+        self._semaine: Optional[Dict[str, HoraireJour]] = None
+        self._verifie_le = 0.0
+        self.version = 0
+        self.chargements = 0
+
+    def creer_table(self, db: Session):
+        VersionHoraires.__table__.create(bind=db.get_bind(), checkfirst=True)
+
+    def lire_version(self, db: Session) -> int:
+        return db.query(VersionHoraires.version).filter(VersionHoraires.id == 1).scalar() or 0
+
+    def incrementer_version(self, db: Session) -> None:
+        """À appeler dans la transaction qui modifie les horaires"""
+        resultat = db.execute(
+            update(VersionHoraires)
+            .where(VersionHoraires.id == 1)
+            .values(version=VersionHoraires.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        if resultat.rowcount == 0:
+            db.add(VersionHoraires(id=1, version=1))
+
+    def charger(self, db: Session) -> Dict[str, HoraireJour]:
+        """Relit les horaires et leur version en base"""
+        self.version = self.lire_version(db)
+        self._semaine = {
+            horaire.jour_semaine: HoraireJour.depuis_modele(horaire)
+            for horaire in db.query(HoraireSofra).all()
+        }
+        self._verifie_le = horloge.monotonic()
+        self.chargements += 1
+        return self._semaine
+
+    def semaine(self, db: Session) -> Dict[str, HoraireJour]:
+        if self._semaine is None:
+            return self.charger(db)
+        if horloge.monotonic() - self._verifie_le > self.intervalle_verification:
+            self._verifie_le = horloge.monotonic()
+            if self.lire_version(db) != self.version:
+                return self.charger(db)
+        return self._semaine
+
+    def jour(self, db: Session, date_souhaitee: date) -> Optional[HoraireJour]:
+        return self.semaine(db).get(JOURS_SEMAINE[date_souhaitee.weekday()])
+
+    def invalider(self):
+        self._semaine = None
+
+# Instance globale des horaires
+horaire_cache = HoraireCache()
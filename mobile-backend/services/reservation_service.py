@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 from models.reservation import ReservationMobile, StatutReservation
 from models.restriction import RestrictionSejour
+from services.capacite_service import CapaciteService
 from datetime import timedelta
 import qrcode
 import json
@@ -10,7 +11,14 @@ class ReservationService:
         self.db = db
     
     def creer_reservation(self, chambre: str, date_reservation, heure: str, nombre_personnes: int):
-        """Crée une nouvelle réservation avec QR code"""
+        """Crée une nouvelle réservation avec QR code (lève CreneauComplet si l'heure est pleine)"""
+        
+        # Prendre la place du créneau : verrou de ligne jusqu'au commit de la réservation
+        try:
+            CapaciteService(self.db).reserver_place(date_reservation, heure)
+        except Exception:
+            self.db.rollback()
+            raise
         
         # Créer la réservation
         reservation = ReservationMobile(
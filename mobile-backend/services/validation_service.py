@@ -1,142 +1,286 @@
+from dataclasses import dataclass, field
 from datetime import datetime, date, timedelta
+from typing import Dict, List, Optional, Tuple
+import logging
 from sqlalchemy.orm import Session
-from sqlalchemy import text
-from models.horaire import HoraireSofra
-from models.restriction import RestrictionSejour
-from models.reservation import ReservationMobile
+from sqlalchemy import bindparam, text
+from sqlalchemy.exc import DBAPIError, OperationalError, ProgrammingError
+from data_cleaning.room_keys import room_keys
+from services.horaire_service import HoraireJour, JOURS_SEMAINE, horaire_cache
+
+logger = logging.getLogger(__name__)
+
+def normaliser_heure(heure: str) -> str:
+    """Les données OCR notent "19:30", l'application "19h30" """
+    return heure.strip().replace(':', 'h') if heure else heure
+
+@dataclass
+class SnapshotJour:
+    """Tout ce qu'il faut pour valider une date, chargé en une seule fois"""
+    date_souhaitee: date
+    horaire: Optional[HoraireJour]
+    # Réservations confirmées ou en attente par heure (historiques + mobiles)
+    reservations_par_heure: Dict[str, int] = field(default_factory=dict)
+    # La chambre a déjà une réservation ce jour-là
+    chambre_a_reserve: bool = False
+    # Capacités fixées par l'administration (les autres créneaux ont CAPACITE_MAX)
+    capacites_par_heure: Dict[str, int] = field(default_factory=dict)
+    # Places prises selon capacites_creneaux, pour les créneaux qui ont déjà un compteur
+    compteurs_par_heure: Dict[str, int] = field(default_factory=dict)
+
+# Sous-requêtes par (date, heure) sur [debut, fin) : nb compte les réservations, chambre_trouvee
+# signale la chambre demandée, capacite la capacité propre au créneau (NULL : par défaut),
+# compteur les places prises selon capacites_creneaux (NULL : pas encore de compteur)
+BRANCHE_HISTORIQUE = """
+    SELECT date_passage AS jour, heure_passage AS heure, COUNT(*) AS nb,
+           0 AS chambre_trouvee, NULL AS capacite, NULL AS compteur
+    FROM reservation_elsofra
+    WHERE date_passage >= :debut AND date_passage < :fin AND statut = 'confirmé'
+    GROUP BY date_passage, heure_passage
+"""
+
+# reservation_elsofra_chambres couvre tout l'historique : rebâtie jusqu'au dernier passage importé
+CLES_COMPLETES = """
+    EXISTS (
+        SELECT 1 FROM reservation_elsofra_chambres_etat etat
+        WHERE etat.id = 1
+        AND NOT EXISTS (SELECT 1 FROM reservation_elsofra r WHERE r.id > etat.dernier_id)
+    )
+"""
+
+# Présence de la chambre dans l'historique, lue sur la clé normalisée indexée
+# (lignes sans heure, ignorées au comptage)
+BRANCHE_CLES_CHAMBRE = f"""
+    SELECT date_passage AS jour, NULL AS heure, 0 AS nb, 1 AS chambre_trouvee, NULL AS capacite, NULL AS compteur
+    FROM reservation_elsofra_chambres
+    WHERE room_key IN :cles_chambre
+    AND date_passage >= :debut AND date_passage < :fin AND statut = 'confirmé'
+    AND {CLES_COMPLETES}
+    GROUP BY date_passage
+"""
+
+# Ancienne recherche par LIKE, tant que reservation_elsofra_chambres n'est pas complète
+BRANCHE_CHAMBRE_LIKE = """
+    SELECT date_passage AS jour, NULL AS heure, 0 AS nb, 1 AS chambre_trouvee, NULL AS capacite, NULL AS compteur
+    FROM reservation_elsofra
+    WHERE numero_chambre LIKE :motif_chambre
+    AND date_passage >= :debut AND date_passage < :fin AND statut = 'confirmé'
+    {condition}
+    GROUP BY date_passage
+"""
+
+BRANCHE_MOBILE = """
+    SELECT date_reservation AS jour, heure, COUNT(*) AS nb,
+           MAX(CASE WHEN chambre = :chambre THEN 1 ELSE 0 END) AS chambre_trouvee, NULL AS capacite,
+           NULL AS compteur
+    FROM reservations_mobile
+    WHERE date_reservation >= :debut AND date_reservation < :fin
+    AND statut IN ('en_attente', 'confirme')
+    GROUP BY date_reservation, heure
+"""
+
+BRANCHE_CAPACITES = """
+    SELECT date_creneau AS jour, heure, 0 AS nb, 0 AS chambre_trouvee, capacite, reservations AS compteur
+    FROM capacites_creneaux
+    WHERE date_creneau >= :debut AND date_creneau < :fin
+"""
+
+def requete_periode(*branches: str):
+    return text(f"""
+        SELECT jour, heure, SUM(nb) AS nb, MAX(chambre_trouvee) AS chambre_trouvee, MAX(capacite) AS capacite,
+               MAX(compteur) AS compteur
+        FROM ({" UNION ALL ".join(branches)}) reservations_periode
+        GROUP BY jour, heure
+    """)
+
+REQUETE_PERIODE = requete_periode(
+    BRANCHE_HISTORIQUE, BRANCHE_CLES_CHAMBRE,
+    BRANCHE_CHAMBRE_LIKE.format(condition=f"AND NOT {CLES_COMPLETES}"),
+    BRANCHE_MOBILE, BRANCHE_CAPACITES
+).bindparams(bindparam("cles_chambre", expanding=True))
+REQUETE_PERIODE_SANS_CLES = requete_periode(
+    BRANCHE_HISTORIQUE, BRANCHE_CHAMBRE_LIKE.format(condition=""), BRANCHE_MOBILE, BRANCHE_CAPACITES
+)
+# Sans la table historique (absente de certaines installations)
+REQUETE_PERIODE_MOBILE = requete_periode(BRANCHE_MOBILE, BRANCHE_CAPACITES)
+
+def table_absente(erreur: DBAPIError) -> bool:
+    """Erreur due à une table inexistante : MySQL 1146, SQLite "no such table" """
+    origine = erreur.orig
+    code = origine.args[0] if origine is not None and origine.args else None
+    return code == 1146 or "no such table" in str(origine)
+
+def lire_date(valeur) -> date:
+    """MySQL renvoie des dates, SQLite des chaînes"""
+    if isinstance(valeur, datetime):
+        return valeur.date()
+    if isinstance(valeur, date):
+        return valeur
+    return date.fromisoformat(str(valeur)[:10])
 
 class ValidationService:
+    # Capacité estimée du restaurant (à ajuster)
+    CAPACITE_MAX = 50
+    # Longueur maximale d'un calendrier de disponibilités
+    MAX_JOURS_CALENDRIER = 62
+
     def __init__(self, db: Session):
         self.db = db
-    
-    def est_jour_ouvert(self, date_souhaitee: date) -> bool:
-        """Vérifie si le restaurant est ouvert ce jour"""
-        jour_semaine = date_souhaitee.strftime('%A').lower()
-        
-        # Conversion pour les noms français
-        jours_francais = {
-            'monday': 'lundi',
-            'tuesday': 'mardi', 
-            'wednesday': 'mercredi',
-            'thursday': 'jeudi',
-            'friday': 'vendredi',
-            'saturday': 'samedi',
-            'sunday': 'dimanche'
+
+    def charger_snapshot(self, date_souhaitee: date, chambre: Optional[str] = None) -> SnapshotJour:
+        """Charge les réservations de la date en une requête (horaires pris dans le cache)"""
+        return self.charger_snapshots(date_souhaitee, date_souhaitee + timedelta(days=1), chambre)[date_souhaitee]
+
+    def charger_snapshots(
+        self, date_debut: date, date_fin: date, chambre: Optional[str] = None
+    ) -> Dict[date, SnapshotJour]:
+        """
+        Snapshots de chaque jour de [date_debut, date_fin) : horaires de la semaine en mémoire,
+        une requête groupée par (date, heure) pour les réservations.
+        """
+        horaires = horaire_cache.semaine(self.db)
+        nb_jours = (date_fin - date_debut).days
+        snapshots = {}
+        for i in range(nb_jours):
+            jour = date_debut + timedelta(days=i)
+            snapshots[jour] = SnapshotJour(date_souhaitee=jour, horaire=horaires.get(JOURS_SEMAINE[jour.weekday()]))
+
+        parametres = {
+            "debut": date_debut,
+            "fin": date_fin,
+            "chambre": chambre or "",
+            "motif_chambre": f"%{chambre}%" if chambre else "",
+            # Liste jamais vide : une clé impossible quand aucune chambre n'est demandée
+            "cles_chambre": room_keys(chambre) or [""]
         }
-        
-        jour_francais = jours_francais.get(jour_semaine, jour_semaine)
-        horaire = self.db.query(HoraireSofra).filter(
-            HoraireSofra.jour_semaine == jour_francais
-        ).first()
-        
-        return horaire and horaire.est_ouvert
-    
+        for requete in (REQUETE_PERIODE, REQUETE_PERIODE_SANS_CLES, REQUETE_PERIODE_MOBILE):
+            try:
+                lignes = self.db.execute(requete, parametres).all()
+                break
+            except (ProgrammingError, OperationalError) as e:
+                # Seule une table absente justifie une requête réduite ; le reste remonte
+                if requete is REQUETE_PERIODE_MOBILE or not table_absente(e):
+                    raise
+                logger.warning("Table absente, requête de disponibilités réduite: %s", e.orig)
+
+        for jour, heure, nb, chambre_trouvee, capacite, compteur in lignes:
+            snapshot = snapshots.get(lire_date(jour))
+            if snapshot is None:
+                continue
+            if heure is not None:
+                heure = normaliser_heure(heure)
+                snapshot.reservations_par_heure[heure] = snapshot.reservations_par_heure.get(heure, 0) + int(nb)
+                if capacite is not None:
+                    snapshot.capacites_par_heure[heure] = int(capacite)
+                if compteur is not None:
+                    snapshot.compteurs_par_heure[heure] = int(compteur)
+            snapshot.chambre_a_reserve = snapshot.chambre_a_reserve or bool(chambre and chambre_trouvee)
+        return snapshots
+
+    def est_jour_ouvert(self, date_souhaitee: date, snapshot: SnapshotJour = None) -> bool:
+        """Vérifie si le restaurant est ouvert ce jour"""
+        snapshot = snapshot or self.charger_snapshot(date_souhaitee)
+        return bool(snapshot.horaire and snapshot.horaire.est_ouvert)
+
     def est_24h_a_l_avance(self, date_souhaitee: date) -> bool:
         """Vérifie la règle des 24h à l'avance"""
         maintenant = datetime.now().date()
         difference = date_souhaitee - maintenant
         return difference.days >= 1
-    
-    def a_deja_reserve_ce_sejour(self, chambre: str, date_souhaitee: date) -> bool:
-        """Vérifie si la chambre a déjà réservé pendant ce séjour"""
-        # 1. Vérifier dans les réservations historiques (reservation_elsofra)
-        try:
-            # Recherche dans reservation_elsofra (données OCR)
-            query_historique = text("""
-                SELECT COUNT(*) 
-                FROM reservation_elsofra 
-                WHERE numero_chambre LIKE :chambre 
-                AND date_passage = :date
-                AND statut = 'confirmé'
-            """)
-            result_historique = self.db.execute(
-                query_historique, 
-                {"chambre": f"%{chambre}%", "date": date_souhaitee}
-            ).scalar()
-            
-            historique_trouve = result_historique > 0
-        except Exception:
-            historique_trouve = False
-        
-        # 2. Vérifier dans les nouvelles réservations (reservations_mobile)
-        reservation_nouvelle = self.db.query(ReservationMobile).filter(
-            ReservationMobile.chambre == chambre,
-            ReservationMobile.date_reservation == date_souhaitee,
-            ReservationMobile.statut.in_(["en_attente", "confirme"])
-        ).first()
-        
-        nouvelle_trouvee = reservation_nouvelle is not None
-        
-        return historique_trouve or nouvelle_trouvee
-    
-    def get_heures_disponibles(self, date_souhaitee: date) -> list:
+
+    def a_deja_reserve_ce_sejour(self, chambre: str, date_souhaitee: date, snapshot: SnapshotJour = None) -> bool:
+        """Vérifie si la chambre a déjà réservé (historique OCR ou application) à cette date"""
+        snapshot = snapshot or self.charger_snapshot(date_souhaitee, chambre)
+        return snapshot.chambre_a_reserve
+
+    def creneaux(self, snapshot: SnapshotJour) -> Tuple[str, ...]:
+        """Créneaux du jour, calculés à partir des heures d'ouverture (aucun si fermé)"""
+        return snapshot.horaire.creneaux if snapshot.horaire else ()
+
+    def capacite(self, snapshot: SnapshotJour, heure: str) -> int:
+        """Capacité du créneau : celle fixée par l'administration, sinon CAPACITE_MAX"""
+        return snapshot.capacites_par_heure.get(heure, self.CAPACITE_MAX)
+
+    def reservations(self, snapshot: SnapshotJour, heure: str) -> int:
+        """Places prises : le compteur du créneau s'il existe, sinon le comptage des réservations"""
+        if heure in snapshot.compteurs_par_heure:
+            return snapshot.compteurs_par_heure[heure]
+        return snapshot.reservations_par_heure.get(heure, 0)
+
+    def places_restantes(self, snapshot: SnapshotJour, heure: str) -> int:
+        return max(self.capacite(snapshot, heure) - self.reservations(snapshot, heure), 0)
+
+    def get_heures_disponibles(self, date_souhaitee: date, snapshot: SnapshotJour = None) -> list:
         """Retourne les heures disponibles pour une date"""
-        heures_possibles = ["19h30", "20h00"]
-        
-        # Vérifier la capacité pour chaque heure
-        heures_disponibles = []
-        for heure in heures_possibles:
-            if self._heure_est_disponible(date_souhaitee, heure):
-                heures_disponibles.append(heure)
-        
-        return heures_disponibles
-    
-    def _heure_est_disponible(self, date_souhaitee: date, heure: str) -> bool:
-        """Vérifie si une heure spécifique est disponible"""
-        # Compter les réservations existantes pour cette date/heure
-        try:
-            # Réservations historiques
-            query_historique = text("""
-                SELECT COUNT(*) 
-                FROM reservation_elsofra 
-                WHERE date_passage = :date 
-                AND heure_passage = :heure
-                AND statut = 'confirmé'
-            """)
-            count_historique = self.db.execute(
-                query_historique, 
-                {"date": date_souhaitee, "heure": heure}
-            ).scalar()
-            
-            # Réservations nouvelles
-            count_nouvelles = self.db.query(ReservationMobile).filter(
-                ReservationMobile.date_reservation == date_souhaitee,
-                ReservationMobile.heure == heure,
-                ReservationMobile.statut.in_(["en_attente", "confirme"])
-            ).count()
-            
-            total_reservations = count_historique + count_nouvelles
-            
-            # Capacité estimée du restaurant (à ajuster)
-            capacite_max = 50  # Exemple
-            return total_reservations < capacite_max
-            
-        except Exception:
-            return True  # En cas d'erreur, on suppose disponible
-    
+        snapshot = snapshot or self.charger_snapshot(date_souhaitee)
+        return [
+            heure for heure in self.creneaux(snapshot)
+            if self._heure_est_disponible(date_souhaitee, heure, snapshot)
+        ]
+
+    def _heure_est_disponible(self, date_souhaitee: date, heure: str, snapshot: SnapshotJour = None) -> bool:
+        """Vérifie si une heure spécifique est un créneau du jour et n'est pas complète"""
+        snapshot = snapshot or self.charger_snapshot(date_souhaitee)
+        heure = normaliser_heure(heure)
+        if heure not in self.creneaux(snapshot):
+            return False
+        return self.places_restantes(snapshot, heure) > 0
+
     def peut_reserver_sofra(self, chambre: str, date_souhaitee: date, heure: str = None) -> dict:
-        """Vérifie toutes les règles métier"""
+        """Vérifie toutes les règles métier sur un seul chargement de la date"""
+        snapshot = self.charger_snapshot(date_souhaitee, chambre)
         validations = {
-            "jour_ouvert": self.est_jour_ouvert(date_souhaitee),
+            "jour_ouvert": self.est_jour_ouvert(date_souhaitee, snapshot),
             "24h_avance": self.est_24h_a_l_avance(date_souhaitee),
-            "premiere_reservation": not self.a_deja_reserve_ce_sejour(chambre, date_souhaitee)
+            "premiere_reservation": not self.a_deja_reserve_ce_sejour(chambre, date_souhaitee, snapshot)
         }
-        
+
         # Vérifier l'heure si fournie
         if heure:
-            validations["heure_disponible"] = self._heure_est_disponible(date_souhaitee, heure)
-        
+            validations["heure_disponible"] = self._heure_est_disponible(date_souhaitee, heure, snapshot)
+
         return {
             "peut_reserver": all(validations.values()),
             "validations": validations,
-            "heures_disponibles": self.get_heures_disponibles(date_souhaitee),
+            "heures_disponibles": self.get_heures_disponibles(date_souhaitee, snapshot),
+            "places_restantes": {heure: self.places_restantes(snapshot, heure) for heure in self.creneaux(snapshot)},
             "message": self._generer_message_erreur(validations)
         }
-    
+
+    def calendrier(self, chambre: str, date_debut: date, date_fin: date) -> List[dict]:
+        """Disponibilités jour par jour sur [date_debut, date_fin), à partir d'un seul chargement"""
+        snapshots = self.charger_snapshots(date_debut, date_fin, chambre)
+        jours = []
+        for jour, snapshot in snapshots.items():
+            jour_ouvert = self.est_jour_ouvert(jour, snapshot)
+            creneaux = [
+                {
+                    "heure": heure,
+                    "reservations": self.reservations(snapshot, heure),
+                    "capacite": self.capacite(snapshot, heure),
+                    "places_restantes": self.places_restantes(snapshot, heure),
+                    "disponible": jour_ouvert and self._heure_est_disponible(jour, heure, snapshot)
+                }
+                for heure in self.creneaux(snapshot)
+            ]
+            validations = {
+                "jour_ouvert": jour_ouvert,
+                "24h_avance": self.est_24h_a_l_avance(jour),
+                "premiere_reservation": not snapshot.chambre_a_reserve
+            }
+            jours.append({
+                "date": jour.isoformat(),
+                "jour_ouvert": jour_ouvert,
+                "chambre_eligible": all(validations.values()) and any(c["disponible"] for c in creneaux),
+                "creneaux": creneaux,
+                "message": self._generer_message_erreur(validations)
+            })
+        return jours
+
     def _generer_message_erreur(self, validations: dict) -> str:
         if all(validations.values()):
             return "Réservation possible"
-        
+
         messages = []
         if not validations.get("jour_ouvert", True):
             messages.append("Le restaurant est fermé ce jour")
@@ -146,5 +290,5 @@ class ValidationService:
             messages.append("Une réservation par séjour maximum")
         if not validations.get("heure_disponible", True):
             messages.append("Heure non disponible")
-        
-        return "; ".join(messages) if messages else "Réservation impossible"
\ No newline at end of file
+
+        return "; ".join(messages) if messages else "Réservation impossible"
@@ -0,0 +1,21 @@
+import os
+import sys
+
+import pytest
+
+MOBILE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, MOBILE_DIR)
+# Les tests réutilisent les jeux de données des scripts de mesure
+sys.path.insert(0, os.path.join(MOBILE_DIR, "benchmarks"))
+
+from services.horaire_service import horaire_cache  # noqa: E402
+
+
+@pytest.fixture
+def horaires_fixes():
+    """Version des horaires jamais relue : seules les requêtes de validation sont comptées"""
+    intervalle = horaire_cache.intervalle_verification
+    horaire_cache.intervalle_verification = float("inf")
+    yield horaire_cache
+    horaire_cache.intervalle_verification = intervalle
+    horaire_cache.invalider()
@@ -0,0 +1,100 @@
+from datetime import date, timedelta
+
+import pytest
+
+from capacite_concurrence import compter, creer_base, en_parallele, reservation_avec_compteur
+from models import CapaciteCreneau, ReservationMobile, StatutReservation
+from services.capacite_service import CapaciteService, CreneauComplet
+from services.validation_service import ValidationService
+
+CAPACITE = 10
+DEMANDES = 40
+
+
+@pytest.fixture
+def base(tmp_path, horaires_fixes):
+    engine, Session = creer_base(str(tmp_path / "sofra.db"))
+    jour = date.today() + timedelta(days=10)
+    with Session() as db:
+        CapaciteService(db).definir_capacite(jour, "20h00", CAPACITE)
+        db.commit()
+    yield Session, jour
+    engine.dispose()
+
+
+def test_aucune_surreservation(base):
+    Session, jour = base
+    acceptees, _ = en_parallele(reservation_avec_compteur, Session, jour, "20h00", DEMANDES, 5000)
+    assert acceptees == compter(Session, jour, "20h00") == CAPACITE
+
+
+def test_creneau_sans_compteur_cree_par_les_demandes(base):
+    Session, jour = base
+    lendemain = jour + timedelta(days=1)
+    acceptees, _ = en_parallele(reservation_avec_compteur, Session, lendemain, "20h00", DEMANDES, 9000)
+    assert acceptees == compter(Session, lendemain, "20h00") == min(DEMANDES, ValidationService.CAPACITE_MAX)
+
+
+def test_annulation_rend_sa_place(base):
+    Session, jour = base
+    en_parallele(reservation_avec_compteur, Session, jour, "20h00", DEMANDES, 5000)
+    with Session() as db:
+        reservation = db.query(ReservationMobile).filter(
+            ReservationMobile.date_reservation == jour, ReservationMobile.heure == "20h00"
+        ).first()
+        CapaciteService(db).liberer_place(jour, "20h00")
+        reservation.statut = StatutReservation.annule
+        db.commit()
+    assert reservation_avec_compteur(Session, "7777", jour, "20h00")
+
+    with Session() as db:
+        with pytest.raises(CreneauComplet):
+            CapaciteService(db).reserver_place(jour, "20h00")
+        db.rollback()
+        creneau = db.query(CapaciteCreneau).filter(
+            CapaciteCreneau.date_creneau == jour, CapaciteCreneau.heure == "20h00"
+        ).one()
+        assert creneau.reservations == compter(Session, jour, "20h00")
+
+
+def test_compteur_amorce_avec_les_reservations_existantes(base):
+    Session, jour = base
+    with Session() as db:
+        for i in range(3):
+            db.add(ReservationMobile(
+                chambre=str(i), date_reservation=jour, heure="19h30",
+                nombre_personnes=2, statut=StatutReservation.en_attente
+            ))
+        db.commit()
+        creneau = CapaciteService(db).definir_capacite(jour, "19h30", 4)
+        db.commit()
+        assert creneau.reservations == 3
+        assert ValidationService(db).peut_reserver_sofra("77", jour)["places_restantes"]["19h30"] == 1
+
+
+def test_places_restantes_lues_sur_le_compteur(base):
+    Session, jour = base
+    with Session() as db:
+        db.query(CapaciteCreneau).filter(CapaciteCreneau.date_creneau == jour).update(
+            {CapaciteCreneau.reservations: CAPACITE}
+        )
+        db.commit()
+        # Aucune réservation en base, mais le compteur du créneau est plein
+        assert "20h00" not in ValidationService(db).get_heures_disponibles(jour)
+
+
+def test_compteur_amorce_apres_une_ecriture_de_l_appelant(base):
+    Session, jour = base
+    with Session() as db:
+        # L'appelant a déjà écrit : l'amorce reste dans sa transaction, sans attendre son propre verrou
+        db.add(ReservationMobile(
+            chambre="42", date_reservation=jour, heure="21h00",
+            nombre_personnes=2, statut=StatutReservation.en_attente
+        ))
+        db.flush()
+        CapaciteService(db).reserver_place(jour, "21h00")
+        db.commit()
+        creneau = db.query(CapaciteCreneau).filter(
+            CapaciteCreneau.date_creneau == jour, CapaciteCreneau.heure == "21h00"
+        ).one()
+        assert creneau.reservations == 2
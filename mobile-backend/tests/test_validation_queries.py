@@ -0,0 +1,67 @@
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import text
+
+from validation_queries import REQUETES_PAR_VALIDATION, CompteurRequetes, creer_base
+from services.validation_service import ValidationService
+
+
+@pytest.fixture
+def base(horaires_fixes):
+    # Un mardi dans le futur (le lundi est fermé dans ce jeu de données)
+    jour_test = date.today() + timedelta(days=30)
+    jour_test += timedelta(days=(1 - jour_test.weekday()) % 7)
+    engine, Session = creer_base(500, jour_test)
+    compteur = CompteurRequetes(engine)
+    with Session() as db:
+        horaires_fixes.charger(db)
+        yield db, ValidationService(db), compteur, jour_test
+    engine.dispose()
+
+
+def test_une_requete_par_validation(base):
+    db, service, compteur, jour_test = base
+    compteur.total = 0
+    service.peut_reserver_sofra("312", jour_test, "20h00")
+    assert compteur.total == REQUETES_PAR_VALIDATION
+
+    compteur.total = 0
+    service.get_heures_disponibles(jour_test)
+    assert compteur.total == REQUETES_PAR_VALIDATION
+
+    compteur.total = 0
+    service.calendrier("312", jour_test - timedelta(days=7), jour_test + timedelta(days=7))
+    assert compteur.total == REQUETES_PAR_VALIDATION
+
+
+def test_regles_de_reservation(base):
+    db, service, compteur, jour_test = base
+    resultat = service.peut_reserver_sofra("312", jour_test, "20h00")
+    assert not resultat["validations"]["premiere_reservation"]
+    # 19h30 complet : 30 passages historiques et 25 réservations mobiles
+    assert resultat["heures_disponibles"] == ["20h00", "20h30", "21h00", "21h30"]
+    assert resultat["places_restantes"]["19h30"] == 0
+
+    assert not service.peut_reserver_sofra("505", jour_test)["validations"]["premiere_reservation"]
+    assert service.peut_reserver_sofra("777", jour_test, "20h00")["peut_reserver"]
+    lundi = jour_test - timedelta(days=1)
+    assert not service.peut_reserver_sofra("777", lundi)["validations"]["jour_ouvert"]
+
+
+def test_calendrier_identique_a_la_validation_du_jour(base):
+    db, service, compteur, jour_test = base
+    for jour in service.calendrier("312", jour_test - timedelta(days=7), jour_test + timedelta(days=7)):
+        attendu = service.peut_reserver_sofra("312", date.fromisoformat(jour["date"]))
+        assert jour["chambre_eligible"] == (attendu["peut_reserver"] and bool(attendu["heures_disponibles"]))
+
+
+def test_passage_importe_apres_les_cles_trouve_par_like(base):
+    db, service, compteur, jour_test = base
+    db.execute(
+        text("INSERT INTO reservation_elsofra (date_passage, numero_chambre, nombre_pax, heure_passage, statut) "
+             "VALUES (:date, '4242', 2, '20:00', 'confirmé')"),
+        {"date": jour_test}
+    )
+    db.commit()
+    assert service.charger_snapshot(jour_test, "4242").chambre_a_reserve